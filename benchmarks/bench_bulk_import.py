@@ -0,0 +1,72 @@
+"""
+Ledger loading throughput: one add_transaction call per row against the
+chunked bulk_import_transactions path, plus streaming export speed and its
+peak Python memory.
+
+Run from the repository root:
+    python -m benchmarks.bench_bulk_import --rows 1000000 --format jsonl
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from src.database.bulk_io import write_rows
+from src.database.db_manager import DatabaseManager
+
+
+def ledger_rows(count, users):
+    for _ in range(count):
+        yield {'username': f"user{random.randint(1, users)}",
+               'transaction_type': random.choice(('deposit', 'withdrawal')),
+               'amount': f"{random.randint(1, 5000) / 100:.2f}"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000, help="Ledger rows to import")
+    parser.add_argument("--users", type=int, default=1000, help="Accounts the rows are spread over")
+    parser.add_argument("--per-row-sample", type=int, default=2000, help="Rows timed through add_transaction")
+    parser.add_argument("--format", choices=('csv', 'jsonl'), default='csv')
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    random.seed(3)
+    with tempfile.TemporaryDirectory() as scratch:
+        source = os.path.join(scratch, f"ledger.{args.format}")
+        write_rows(source, ledger_rows(args.rows, args.users),
+                   ['username', 'transaction_type', 'amount'], args.format)
+        users = os.path.join(scratch, f"users.{args.format}")
+        write_rows(users, ({'username': f"user{i}", 'balance': "1000000.00"} for i in range(1, args.users + 1)),
+                   ['username', 'balance'], args.format)
+
+        db = DatabaseManager(os.path.join(scratch, "bench.db"))
+        db.bulk_import_users(users)
+
+        sample = list(ledger_rows(args.per_row_sample, args.users))
+        ids = {f"user{i}": db.get_user_id(f"user{i}") for i in range(1, args.users + 1)}
+        start = time.perf_counter()
+        for row in sample:
+            db.add_transaction(ids[row['username']], row['transaction_type'], float(row['amount']))
+        per_row = len(sample) / (time.perf_counter() - start)
+
+        report = db.bulk_import_transactions(source, chunk_size=args.chunk_size)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        exported = db.export_transactions(os.path.join(scratch, f"export.{args.format}"), chunk_size=args.chunk_size)
+        export_rate = exported / (time.perf_counter() - start)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        db.close()
+
+    print(f"per-row add_transaction:  {per_row:>10,.0f} rows/s")
+    print(f"bulk import ({args.format}):      {report['rows_per_sec']:>10,.0f} rows/s "
+          f"({report['rows']:,} rows in {report['seconds']:.1f} s, {report['skipped']} skipped)")
+    print(f"streaming export:         {export_rate:>10,.0f} rows/s ({exported:,} rows, "
+          f"peak {peak / 1024 / 1024:.1f} MiB Python memory)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Command dispatch throughput: the old linear substring scan over
+VoiceBot.commands against the compiled CommandMatcher.
+
+Run from the repository root:
+    python -m benchmarks.bench_command_matcher --iterations 20000
+"""
+import argparse
+import time
+from src.nlp_processing.command_matcher import CommandMatcher
+
+COMMANDS = ['change user', 'this is', 'balance', 'transaction', 'help', 'deposit',
+            'withdraw', 'create', 'transfer', 'send']
+
+CORPUS = [
+    "What's my balance?",
+    "Show my transactions",
+    "Deposit $100 into my account",
+    "Withdraw 50 dollars",
+    "Transfer $100 to John",
+    "Send twenty dollars to Priya please",
+    "This is Rahul",
+    "Change user to Meera",
+    "Create user Dev",
+    "Show help",
+    "Hello, how are you doing today?",
+    "Can you tell me a little bit about the weather in Mumbai this weekend",
+    # Inputs where the old scan picked the wrong handler
+    "Transfer my whole balance to John",
+    "Tell me what this is for",
+]
+
+
+def linear_scan(text):
+    """Previous dispatch: first keyword in dict order that is a substring"""
+    text_lower = text.lower()
+    for cmd in COMMANDS:
+        if cmd in text_lower:
+            return cmd
+    return None
+
+
+def run(resolve, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in CORPUS:
+            resolve(text)
+    elapsed = time.perf_counter() - start
+    return iterations * len(CORPUS) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10000, help="Passes over the corpus")
+    args = parser.parse_args()
+
+    matcher = CommandMatcher.from_sources(COMMANDS)
+    results = {
+        "linear substring scan": run(linear_scan, args.iterations),
+        "compiled matcher": run(matcher.match, args.iterations),
+    }
+    for name, per_second in results.items():
+        print(f"{name:<24}{per_second:>14,.0f} utterances/s{1e6 / per_second:>10.2f} us each")
+
+    resolved = sum(1 for text in CORPUS if matcher.match(text))
+    print(f"\nResolved without the zero-shot model: {resolved}/{len(CORPUS)} utterances")
+
+    print("\nDisagreements (old -> new):")
+    for text in CORPUS:
+        old = linear_scan(text)
+        match = matcher.match(text)
+        new = match.command if match else None
+        if old != new:
+            print(f"  {text!r}: {old} -> {new}")
+
+
+if __name__ == "__main__":
+    main()
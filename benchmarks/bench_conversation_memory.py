@@ -0,0 +1,93 @@
+"""
+Prompt size and completion latency over scripted 50-turn sessions:
+the old "last 10 messages" history against the token-budgeted
+ConversationMemory. Replies come from a local fake OpenAI endpoint whose
+time to first token grows with the prompt, and alternate between short
+answers and long explanations, as real sessions do.
+
+Run from the repository root:
+    python -m benchmarks.bench_conversation_memory --sessions 3 --turns 50
+"""
+import argparse
+import statistics
+import time
+from src.response_gen.conversation_memory import ConversationMemory, count_tokens, MESSAGE_OVERHEAD_TOKENS
+from src.response_gen.response_cache import ResponseCache
+from src.response_gen.response_generator import ResponseGenerator
+from src.utils.fake_llm_server import FakeLLMServer
+
+QUESTIONS = [
+    "what's the difference between checking and savings",
+    "ok thanks",
+    "how do wire transfers work and how long do they take to arrive",
+    "cool",
+    "can you explain overdraft fees in detail",
+    "got it",
+    "what should I know about interest rates on savings accounts",
+    "and what about certificates of deposit",
+]
+SHORT_REPLY = "Sure, happy to help with that."
+LONG_REPLY = " ".join([
+    "Here is how that works in practice.",
+    "Money moves between accounts through the payment network, which settles transfers in batches.",
+    "Fees depend on the account type, the amount and whether the transfer is domestic or international.",
+    "Most transfers arrive the same business day, but international ones can take two to five days.",
+    "Interest is calculated daily on the closing balance and paid into the account at the end of the month.",
+    "Let me know if you would like me to walk through an example with your own numbers.",
+])
+
+
+def reply_for(messages):
+    # Long explanations for long questions, short acknowledgements otherwise
+    return LONG_REPLY if len(messages[-1]["content"].split()) > 3 else SHORT_REPLY
+
+
+def prompt_tokens(messages):
+    return sum(count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+
+def run_sessions(server, make_history, sessions, turns):
+    generator = ResponseGenerator(client=server.client(), cache=ResponseCache(max_size=0, template_intents=()))
+    generator.client.openai    # Build the SDK client before timing
+    tokens, latencies = [], []
+    for session in range(sessions):
+        history = make_history()
+        for turn in range(turns):
+            question = f"{QUESTIONS[turn % len(QUESTIONS)]} ({session}.{turn})"
+            start = time.perf_counter()
+            generator.generate_response(question, "unknown", 0.9, history=history)
+            latencies.append(time.perf_counter() - start)
+            tokens.append(prompt_tokens(server.requests[-1]["messages"]))
+    return tokens, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=3)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--first-token-ms", type=float, default=20, help="Fake model base time to first token")
+    parser.add_argument("--prompt-token-us", type=float, default=200,
+                        help="Fake model time per prompt token before the first output token")
+    parser.add_argument("--budget", type=int, default=None, help="Token budget (default: MEMORY_TOKEN_BUDGET)")
+    args = parser.parse_args()
+
+    def last_ten():
+        return []
+
+    def memory():
+        return ConversationMemory() if args.budget is None else ConversationMemory(max_tokens=args.budget)
+
+    with FakeLLMServer(reply_for, first_token_s=args.first_token_ms / 1000,
+                       prompt_token_s=args.prompt_token_us / 1e6) as server:
+        print(f"{args.sessions} sessions x {args.turns} turns")
+        print(f"{'history':<22}{'prompt tok mean':>16}{'max':>7}{'total':>9}{'latency p50':>14}{'p95':>10}")
+        for label, make_history in (("last 10 messages", last_ten), ("token-budget memory", memory)):
+            tokens, latencies = run_sessions(server, make_history, args.sessions, args.turns)
+            ordered = sorted(latencies)
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            print(f"{label:<22}{statistics.mean(tokens):>16.0f}{max(tokens):>7}{sum(tokens):>9}"
+                  f"{statistics.median(latencies) * 1000:>11.1f} ms{p95 * 1000:>7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Accuracy and latency of local transfer extraction (recipient + amount) on a
+corpus of transfer phrasings, including ASR-style misspellings.
+
+Run from the repository root:
+    python -m benchmarks.bench_entity_extractor
+    python -m benchmarks.bench_entity_extractor --with-llm   # also time the OpenAI path
+"""
+import argparse
+import json
+import time
+from config.config import ENTITY_CONFIDENCE_THRESHOLD
+from src.nlp_processing.entity_extractor import EntityExtractor, UserIndex
+
+USERS = ['john', 'priya', 'rahul', 'meera', 'demo_user', 'arjun', 'anand', 'ana', 'kavya', 'sanjay',
+         'deepak', 'fatima', 'vikram', 'neha', 'rohan', 'aditi']
+
+# (phrase, expected recipient, expected amount)
+CORPUS = [
+    ("Transfer $100 to John", 'john', 100.0),
+    ("Send $100 to John", 'john', 100.0),
+    ("send 250 dollars to priya", 'priya', 250.0),
+    ("please transfer fifty dollars to rahul", 'rahul', 50.0),
+    ("send two hundred rupees to meera", 'meera', 200.0),
+    ("give arjun twenty bucks", 'arjun', 20.0),
+    ("pay kavya 1,500", 'kavya', 1500.0),
+    ("transfer one thousand two hundred and fifty dollars to sanjay", 'sanjay', 1250.0),
+    ("send 2.5k to deepak", 'deepak', 2500.0),
+    ("move 75 dollars and 50 cents to fatima", 'fatima', 75.5),
+    ("can you send vikram a hundred dollars", 'vikram', 100.0),
+    ("transfer 40 to neha please", 'neha', 40.0),
+    ("I want to send rohan three hundred", 'rohan', 300.0),
+    ("send aditi 15 dollars", 'aditi', 15.0),
+    ("transfer 10 dollars to demo user", 'demo_user', 10.0),
+    ("send ₹500 to anand", 'anand', 500.0),
+    ("transfer Rs 60 to ana", 'ana', 60.0),
+    ("pay 1.5 lakh to john", 'john', 150000.0),
+    ("send twelve point five dollars to priya", 'priya', 12.5),
+    ("transfer seventy five cents to rahul", 'rahul', 0.75),
+    # ASR misspellings of the recipient
+    ("send 30 dollars to jon", 'john', 30.0),
+    ("transfer 20 to preeya", 'priya', 20.0),
+    ("send 5 dollars to raahul", 'rahul', 5.0),
+    ("give meara ten dollars", 'meera', 10.0),
+    ("send 100 to arjoon", 'arjun', 100.0),
+    ("transfer 45 dollars to kavia", 'kavya', 45.0),
+    ("send 60 to sanjai", 'sanjay', 60.0),
+    ("transfer 90 dollars to deepack", 'deepak', 90.0),
+    ("send 25 to fathima", 'fatima', 25.0),
+    ("send 8 dollars to vickram", 'vikram', 8.0),
+    # Hard cases that should fall back to the LLM
+    ("send 2 payments of 50 to neha", 'neha', 50.0),
+    ("transfer some money to my brother", None, None),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="Passes over the corpus for timing")
+    parser.add_argument("--with-llm", action="store_true", help="Also time the OpenAI extraction prompt")
+    args = parser.parse_args()
+
+    extractor = EntityExtractor(UserIndex(USERS))
+    correct_user = correct_amount = correct_both = confident = confident_correct = 0
+    for text, username, amount in CORPUS:
+        result = extractor.extract_transfer(text)
+        user_ok = result['username'] == username
+        amount_ok = result['amount'] == amount
+        correct_user += user_ok
+        correct_amount += amount_ok
+        correct_both += user_ok and amount_ok
+        if result['confidence'] >= ENTITY_CONFIDENCE_THRESHOLD:
+            confident += 1
+            confident_correct += user_ok and amount_ok
+        elif not (user_ok and amount_ok):
+            print(f"  fallback: {text!r} -> {result}")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for text, _, _ in CORPUS:
+            extractor.extract_transfer(text)
+    local_us = (time.perf_counter() - start) / (args.repeat * len(CORPUS)) * 1e6
+
+    total = len(CORPUS)
+    print(f"\nphrases:                    {total}")
+    print(f"recipient accuracy:         {correct_user / total:.1%}")
+    print(f"amount accuracy:            {correct_amount / total:.1%}")
+    print(f"both correct:               {correct_both / total:.1%}")
+    print(f"handled locally (>= {ENTITY_CONFIDENCE_THRESHOLD}):  {confident / total:.1%} "
+          f"(precision {confident_correct / max(confident, 1):.1%})")
+    print(f"local latency:              {local_us:.1f} us per phrase")
+
+    if args.with_llm:
+        from src.llm.client import get_client
+        latencies = []
+        for text, _, _ in CORPUS[:10]:
+            prompt = (f"Extract the amount and recipient username from this text: '{text}'. Return a valid JSON in "
+                      f"this format: {{\"username\": \"<recipient>\", \"amount\": <amount>}}.")
+            start = time.perf_counter()
+            content = get_client().complete_text([{"role": "user", "content": prompt}])
+            latencies.append(time.perf_counter() - start)
+            json.loads(content)
+        print(f"LLM latency:                {sum(latencies) / len(latencies) * 1000:.0f} ms per phrase")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Per-utterance latency of intent classification, before and after the
+cached-hypothesis batched engine.
+
+Run from the repository root:
+    python -m benchmarks.bench_intent_classifier --repeat 20
+"""
+import argparse
+import statistics
+import time
+from config.config import CANDIDATE_INTENTS, INTENT_DESCRIPTIONS, INTENT_MODEL, INTENT_HYPOTHESIS_TEMPLATE
+
+UTTERANCES = [
+    "what's my balance",
+    "show my transactions",
+    "hello there",
+    "who is the current user",
+    "list all the users in the bank",
+    "I need some help with my account",
+    "thanks, that's all for today",
+    "can you tell me how much money I have left after last week's purchases",
+]
+
+
+class PipelineClassifier:
+    """The previous implementation: one zero-shot pipeline call per utterance"""
+    def __init__(self, model_name):
+        from transformers import pipeline
+        self.classifier = pipeline("zero-shot-classification", model=model_name)
+
+    def classify_intent(self, text):
+        return self.classifier(
+            text,
+            candidate_labels=[INTENT_DESCRIPTIONS[intent] for intent in CANDIDATE_INTENTS],
+            hypothesis_template=INTENT_HYPOTHESIS_TEMPLATE
+        )
+
+
+def measure(classifier, repeat):
+    classifier.classify_intent(UTTERANCES[0])  # warm-up
+    latencies = []
+    for _ in range(repeat):
+        for text in UTTERANCES:
+            start = time.perf_counter()
+            classifier.classify_intent(text)
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "mean": statistics.mean(latencies),
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=INTENT_MODEL)
+    parser.add_argument("--repeat", type=int, default=5, help="Passes over the utterance set")
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0 = default)")
+    args = parser.parse_args()
+
+    from src.nlp_processing.intent_classifier import IntentClassifier
+
+    results = {}
+    results["before (pipeline)"] = measure(PipelineClassifier(args.model), args.repeat)
+    results["after (batched engine)"] = measure(IntentClassifier(args.model, num_threads=args.threads), args.repeat)
+
+    print(f"{'variant':<26}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, stats in results.items():
+        print(f"{name:<26}{stats['mean']:>10.1f}{stats['p50']:>10.1f}{stats['p95']:>10.1f}")
+    before, after = results["before (pipeline)"], results["after (batched engine)"]
+    print(f"\nspeed-up (mean): {before['mean'] / after['mean']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+"""
+End-to-end turn latency of VoiceBot.process_user_input, with the
+microphone, OpenAI and the speaker replaced by stand-ins so it runs
+anywhere and repeatably:
+
+  recorder       replays WAV fixtures (test_recording.wav by default)
+  transcriber    the real Transcriber over the stub ASR backend, which
+                 reads each fixture's sidecar .txt transcript
+                 (--asr local runs the local Whisper model instead)
+  intent         the real IntentClassifier (--classifier stand-in skips
+                 the model when its weights are not available)
+  LLM            a local fake OpenAI endpoint, also behind the shared client
+  TTS            a null speaker that just consumes the sentences
+  database       a scratch SQLite file
+
+Reports per-stage and total latency percentiles, turns/sec and peak RSS,
+and compares them with the stored baseline for the same configuration.
+Exits with status 1 when a metric regressed by more than --tolerance.
+
+Run from the repository root:
+    python -m benchmarks.bench_pipeline --rounds 5
+    python -m benchmarks.bench_pipeline --classifier stand-in --sessions 4
+    python -m benchmarks.bench_pipeline --update-baseline    # after an intended change
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+import main as voicebot
+from main import VoiceBot
+from src.database.db_manager import DatabaseManager
+from src.llm import client as llm_client
+from src.response_gen.response_cache import ResponseCache
+from src.response_gen.response_generator import ResponseGenerator
+from src.server.session_server import percentile
+from src.speech_to_text.asr_backends import create_backend
+from src.speech_to_text.transcriber import Transcriber
+from src.utils.fake_llm_server import FakeLLMServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_RECORDING = os.path.join(ROOT, "test_recording.wav")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baselines", "bench_pipeline.json")
+
+# One caller's session: commands answered from the database and questions for the LLM
+SCRIPT = [
+    "this is demo user",
+    "what's my balance",
+    "deposit 20 dollars",
+    "show my transactions",
+    "which account should I use for my savings",
+    "how much did I spend this month",
+    "withdraw 5 dollars",
+    "how long do international payments take to arrive",
+    "thanks, that's all for today",
+]
+REPLY = ("Good question. A savings account earns interest each month, so it suits money you won't need soon. "
+         "Your checking account is better for everyday spending. Would you like me to move some funds?")
+
+
+def reply_for(messages):
+    # Username extraction (for names the local index can't resolve) gets a bare name
+    if "Extract the username" in messages[-1]["content"]:
+        return "demo_user"
+    return REPLY
+
+
+# Streamed replies have no "reply" time of their own: they arrive during "speak"
+STAGES = ["transcribe", "intent", "command", "reply", "first_audio", "speak", "log", "total"]
+PERCENTILES = [("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)]
+# p99 of a few dozen turns is just the slowest one, so it is reported but not gated
+GATED_PERCENTILES = ["p50_ms", "p95_ms"]
+# Stages this fast are all noise; changes below this are never regressions
+NOISE_FLOOR_MS = 1.0
+
+
+class ReplayRecorder:
+    """Hands out the fixtures in order, one per turn and per session thread"""
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+        self._local = threading.local()
+
+    def record_utterance(self, on_speech_start=None):
+        position = getattr(self._local, 'position', 0)
+        self._local.position = position + 1
+        path = self.fixtures[position % len(self.fixtures)]
+        with open(path, "rb") as f:
+            self._local.audio = io.BytesIO(f.read())
+        self._local.audio.name = path    # The stub backend finds the transcript next to it
+        return True
+
+    def get_audio(self):
+        self._local.audio.seek(0)
+        return self._local.audio
+
+    def reset(self):
+        self._local.position = 0
+
+
+class StandInClassifier:
+    """For machines without the model weights; only reached when no keyword matches"""
+    def classify_intent(self, text):
+        return {'intent': 'unknown', 'confidence': 0.5}
+
+
+class NullSpeaker:
+    def speak_sentences(self, sentences, cancel_event=None):
+        for _ in sentences:
+            pass
+        return True
+
+    def speak_text(self, text, cancel_event=None):
+        return True
+
+    def prerender(self, texts):
+        return 0
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class StageTimer:
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def record(self, stage, seconds):
+        self.samples[stage].append(seconds)
+
+    def wrap(self, stage, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+        return timed
+
+    def summary(self):
+        return {stage: {name: round(percentile(self.samples[stage], fraction) * 1000, 2)
+                        for name, fraction in PERCENTILES}
+                for stage in STAGES if self.samples[stage]}
+
+
+def make_fixtures(directory, recordings):
+    """
+    One WAV plus sidecar transcript per scripted line. With a directory of
+    recordings, its *.wav files and their .txt sidecars are used as they are.
+    """
+    if os.path.isdir(recordings):
+        fixtures = sorted(os.path.join(recordings, name) for name in os.listdir(recordings) if name.endswith(".wav"))
+        if not fixtures:
+            raise SystemExit(f"No .wav files in {recordings}")
+        return fixtures
+    fixtures = []
+    for number, text in enumerate(SCRIPT):
+        path = os.path.join(directory, f"turn_{number:02}.wav")
+        shutil.copyfile(recordings, path)
+        with open(os.path.splitext(path)[0] + ".txt", "w") as f:
+            f.write(text)
+        fixtures.append(path)
+    return fixtures
+
+
+def build_bot(args, scratch, server, timer):
+    if args.classifier == "model":
+        from src.nlp_processing.intent_classifier import IntentClassifier
+        classifier = IntentClassifier()
+    else:
+        classifier = StandInClassifier()
+    transcriber = Transcriber(create_backend(args.asr))
+    transcriber.transcribe_audio = timer.wrap("transcribe", transcriber.transcribe_audio)
+    speaker = NullSpeaker()
+    speaker.speak_sentences = timer.wrap("speak", speaker.speak_sentences)
+    bot = VoiceBot(components={
+        'db': DatabaseManager(os.path.join(scratch, "bench.db")),
+        'recorder': ReplayRecorder(make_fixtures(scratch, args.recordings)),
+        'transcriber': transcriber,
+        'intent_classifier': classifier,
+        # Every round replays the same questions, so keep the response cache out of the way
+        'response_generator': ResponseGenerator(client=server.client(),
+                                                cache=ResponseCache(max_size=0, template_intents=())),
+        'tts_generator': speaker,
+    })
+    bot.warm_up(background=False, components=['db', 'intent_classifier', 'response_generator'])
+    return bot
+
+
+def instrument(session, timer):
+    """Time this session's stages; the wrappers shadow the methods on the instance only"""
+    for stage, name in (("intent", "resolve_intent"), ("command", "run_command"),
+                        ("reply", "generate_reply"), ("log", "log_turn")):
+        setattr(session, name, timer.wrap(stage, getattr(session, name)))
+    return session
+
+
+def run_session(bot, timer, rounds, turns_per_round, errors):
+    session = instrument(bot.spawn_session(), timer)
+    bot.recorder.reset()
+    for _ in range(rounds * turns_per_round):
+        start = time.perf_counter()
+        session.process_user_input()
+        timer.record("total", time.perf_counter() - start)
+        first_audio = session.last_turn_metrics.get('time_to_first_audio_s')
+        if first_audio is None:
+            errors.append(session.last_turn_metrics)
+        else:
+            timer.record("first_audio", first_audio)
+
+
+def run(args):
+    voicebot.LLM_STREAMING = not args.blocking
+    scratch = tempfile.mkdtemp(prefix="bench_pipeline_")
+    shared_client = llm_client._shared
+    try:
+        with FakeLLMServer(reply_for, first_token_s=args.first_token_ms / 1000, token_s=args.token_ms / 1000) as server:
+            # Username and transfer extraction fall back to the shared client
+            llm_client._shared = server.client()
+            timer = StageTimer()
+            bot = build_bot(args, scratch, server, timer)
+            turns_per_round = len(bot.recorder.fixtures)
+            # One untimed round so every code path has run once
+            with contextlib.redirect_stdout(io.StringIO()):
+                run_session(bot, timer, 1, turns_per_round, [])
+            timer.samples.clear()
+            errors = []
+            threads = [threading.Thread(target=run_session, args=(bot, timer, args.rounds, turns_per_round, errors))
+                       for _ in range(args.sessions)]
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            elapsed = time.perf_counter() - start
+            bot.db.flush_conversations()
+            bot.cleanup()
+    finally:
+        llm_client._shared = shared_client
+        shutil.rmtree(scratch, ignore_errors=True)
+    return {
+        'stages': timer.summary(),
+        'turns': len(timer.samples["total"]),
+        'failed_turns': len(errors),
+        'turns_per_s': round(len(timer.samples["total"]) / elapsed, 2),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def config_of(args):
+    """What a baseline must match to be comparable"""
+    return {
+        'classifier': args.classifier,
+        'asr': args.asr,
+        'streaming': not args.blocking,
+        'sessions': args.sessions,
+        'first_token_ms': args.first_token_ms,
+        'token_ms': args.token_ms,
+        'recordings': os.path.relpath(args.recordings, ROOT),
+    }
+
+
+def config_label(config):
+    return ",".join(f"{key}={value}" for key, value in sorted(config.items()))
+
+
+def load_baselines(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, config, results):
+    baselines = load_baselines(path)
+    baselines[config_label(config)] = {
+        'config': config,
+        'results': results,
+        'recorded_at': datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(baseline, results, tolerance):
+    """
+    Rows of (metric, baseline, current, change, regressed). Latency and RSS
+    regress by growing, throughput by shrinking.
+    """
+    rows = []
+    for stage, values in baseline['stages'].items():
+        for name, _ in PERCENTILES:
+            if name not in values or stage not in results['stages']:
+                continue
+            old, new = values[name], results['stages'][stage][name]
+            regressed = (name in GATED_PERCENTILES and new > old * (1 + tolerance)
+                         and new - old > NOISE_FLOOR_MS)
+            rows.append((f"{stage} {name}", old, new, regressed))
+    old, new = baseline['turns_per_s'], results['turns_per_s']
+    rows.append(("turns_per_s", old, new, new < old * (1 - tolerance)))
+    old, new = baseline['peak_rss_mb'], results['peak_rss_mb']
+    rows.append(("peak_rss_mb", old, new, new > old * (1 + tolerance)))
+    return [(metric, old, new, (new - old) / old if old else 0.0, regressed) for metric, old, new, regressed in rows]
+
+
+def print_results(results):
+    print(f"{'stage':<14}" + "".join(f"{name:>10}" for name, _ in PERCENTILES))
+    for stage, values in results['stages'].items():
+        print(f"{stage:<14}" + "".join(f"{values[name]:>10.2f}" for name, _ in PERCENTILES))
+    print(f"\nturns:       {results['turns']} ({results['failed_turns']} without a reply)")
+    print(f"turns/sec:   {results['turns_per_s']:.1f}")
+    print(f"peak RSS:    {results['peak_rss_mb']:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5, help="Times each session runs through the fixtures")
+    parser.add_argument("--sessions", type=int, default=1, help="Concurrent callers sharing the components")
+    parser.add_argument("--recordings", default=DEFAULT_RECORDING,
+                        help="A WAV replayed for every scripted line, or a directory of WAVs with .txt transcripts")
+    parser.add_argument("--asr", choices=["stub", "local"], default="stub")
+    parser.add_argument("--classifier", choices=["model", "stand-in"], default="model")
+    parser.add_argument("--blocking", action="store_true", help="Wait for whole LLM replies instead of streaming")
+    parser.add_argument("--first-token-ms", type=float, default=150, help="Fake model time to first token")
+    parser.add_argument("--token-ms", type=float, default=5, help="Fake model delay between tokens")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before a metric counts as regressed")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    config = config_of(args)
+    results = run(args)
+    if args.json:
+        print(json.dumps({'config': config, 'results': results}, indent=2))
+    else:
+        print(config_label(config) + "\n")
+        print_results(results)
+
+    if args.update_baseline:
+        save_baseline(args.baseline, config, results)
+        print(f"\nBaseline updated: {args.baseline}")
+        return
+    baseline = load_baselines(args.baseline).get(config_label(config))
+    if baseline is None:
+        print("\nNo baseline for this configuration; store one with --update-baseline")
+        return
+    rows = compare(baseline['results'], results, args.tolerance)
+    print(f"\nAgainst the baseline of {baseline['recorded_at']}:")
+    print(f"{'metric':<22}{'baseline':>10}{'now':>10}{'change':>9}")
+    for metric, old, new, change, regressed in rows:
+        print(f"{metric:<22}{old:>10.2f}{new:>10.2f}{change:>+9.0%}{'  REGRESSED' if regressed else ''}")
+    if any(row[-1] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Time to a playable WAV for templated replies ("Your current balance is
+$1,234.56"), synthesized whole against segmented: the pre-rendered fixed
+wording joined with freshly synthesized slots (TTS_SEGMENTED). Whether
+segmenting wins depends on the engine: each slot still pays a full
+save_to_file + runAndWait, plus the WAV read, join and write, so it only
+pays off when synthesis time grows with the length of the text.
+
+Uses the real pyttsx3 engine by default. Where none is installed,
+--engine stand-in models one with a fixed cost per call and a cost per
+character; those numbers show the trade-off, not the deployed engine.
+
+Run from the repository root:
+    python -m benchmarks.bench_segmented_tts --sentences 20
+    python -m benchmarks.bench_segmented_tts --engine stand-in --call-ms 40 --char-ms 2
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import wave
+from types import SimpleNamespace
+import numpy as np
+from main import TEMPLATE_PHRASES
+from src.server.session_server import percentile
+from src.text_to_speech.audio_segments import write_wav
+from src.text_to_speech.speech_cache import SpeechCache
+from src.text_to_speech.tts_generator import TTSGenerator
+
+TEMPLATES = [
+    "Your current balance is ${amount:,.2f}",
+    "Successfully deposited ${amount:,.2f}",
+    "Successfully withdrew ${amount:,.2f}",
+    "You spent ${amount:,.2f} this month across {count} transactions.",
+]
+
+
+class StandInEngine:
+    """pyttsx3 stand-in: runAndWait takes call_s + char_s per character and writes a tone WAV"""
+    def __init__(self, call_s, char_s, framerate=22050):
+        self.call_s = call_s
+        self.char_s = char_s
+        self.framerate = framerate
+        self.properties = {'voice': 'stand-in', 'rate': 150, 'volume': 1.0, 'voices': []}
+        self.pending = []
+
+    def getProperty(self, name):
+        return self.properties[name]
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def save_to_file(self, text, path):
+        self.pending.append((text, path))
+
+    def runAndWait(self):
+        for text, path in self.pending:
+            time.sleep(self.call_s + self.char_s * len(text))
+            silence = np.zeros((self.framerate // 10, 1), dtype=np.int16)
+            # About 12 characters of speech per second
+            tone = (np.sin(np.arange(self.framerate * len(text) // 12) / 8) * 8000).astype(np.int16)[:, None]
+            write_wav(path, SimpleNamespace(nchannels=1, sampwidth=2, framerate=self.framerate),
+                      np.concatenate([silence, tone, silence]))
+        self.pending = []
+
+    def stop(self):
+        pass
+
+
+class NoPlayer:
+    available = False
+
+
+def sentences(count, seed=1):
+    rng = random.Random(seed)
+    return [rng.choice(TEMPLATES).format(amount=rng.uniform(1, 5000), count=rng.randint(2, 60))
+            for _ in range(count)]
+
+
+def measure(generator, texts, segmented):
+    """Seconds from text to a playable file, per sentence"""
+    times = []
+    for text in texts:
+        start = time.perf_counter()
+        if segmented:
+            path, temporary = generator.render_utterance(text)
+            if not temporary:
+                raise RuntimeError(f"{text!r} was not segmented")
+        else:
+            handle, path = tempfile.mkstemp(suffix=".wav")
+            os.close(handle)
+            generator._synthesize(text, path)
+        times.append(time.perf_counter() - start)
+        with wave.open(path) as f:
+            if not f.getnframes():
+                raise RuntimeError(f"{text!r} rendered no audio")
+        os.remove(path)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, default=20)
+    parser.add_argument("--engine", choices=["pyttsx3", "stand-in"], default="pyttsx3")
+    parser.add_argument("--call-ms", type=float, default=40, help="Stand-in engine cost per runAndWait")
+    parser.add_argument("--char-ms", type=float, default=2, help="Stand-in engine cost per character")
+    args = parser.parse_args()
+
+    engine = StandInEngine(args.call_ms / 1000, args.char_ms / 1000) if args.engine == "stand-in" else None
+    with tempfile.TemporaryDirectory() as cache_dir:
+        generator = TTSGenerator(engine=engine, cache=SpeechCache(cache_dir), player=NoPlayer(), segmented=True)
+        generator.prerender(TEMPLATE_PHRASES)
+        texts = sentences(args.sentences)
+        results = [(label, measure(generator, texts, segmented)) for label, segmented in
+                   (("whole", False), ("segmented", True))]
+
+    print(f"{args.sentences} templated sentences, {args.engine} engine")
+    print(f"{'rendering':<12}{'mean':>10}{'p50':>10}{'p95':>10}")
+    for label, times in results:
+        print(f"{label:<12}{statistics.mean(times) * 1000:>7.1f} ms{percentile(times, 0.5) * 1000:>7.1f} ms"
+              f"{percentile(times, 0.95) * 1000:>7.1f} ms")
+    whole, segmented = (statistics.mean(times) for _, times in results)
+    print(f"\nsegmented takes {segmented / whole:.0%} of the whole-sentence time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Load generator for the conversation server. Opens many concurrent
+sessions, each running a short banking script, and reports sessions/sec
+and p50/p99 turn latency as seen by the client.
+
+By default it starts an in-process server with a scratch database and
+stand-ins for the model and OpenAI (a fixed delay), so it measures the
+server itself. Point it at a running server instead with --port.
+
+Run from the repository root:
+    python -m benchmarks.bench_session_server --sessions 200 --concurrency 50
+    python -m benchmarks.bench_session_server --port 8765     # real server
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from main import VoiceBot
+from src.database.db_manager import DatabaseManager
+from src.server.client import ConversationClient
+from src.server.session_server import ConversationServer, percentile
+
+SCRIPT = [
+    "this is demo user",
+    "what's my balance",
+    "hello, how are you today",
+    "show my transactions",
+    "how much did I spend this month",
+    "deposit 5 dollars",
+]
+
+
+class StandInClassifier:
+    def classify_intent(self, text):
+        return {'intent': 'greeting', 'confidence': 0.9}
+
+
+class StandInResponder:
+    """Blocks a worker thread for a fixed time, like an OpenAI round trip"""
+    def __init__(self, delay_s):
+        self.delay_s = delay_s
+
+    def generate_response(self, user_input, intent, confidence, history=None):
+        time.sleep(self.delay_s)
+        return "Happy to help with your banking today."
+
+
+async def run_session(host, port, latencies):
+    client = await ConversationClient.connect(host, port)
+    try:
+        for text in SCRIPT:
+            start = time.perf_counter()
+            reply = await client.say(text)
+            latencies.append(time.perf_counter() - start)
+            if reply.get('type') != 'reply':
+                raise RuntimeError(f"unexpected reply {reply}")
+    finally:
+        await client.close()
+
+
+async def generate_load(host, port, sessions, concurrency):
+    latencies = []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with gate:
+            await run_session(host, port, latencies)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(sessions)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    failures = [result for result in results if isinstance(result, Exception)]
+    return elapsed, latencies, failures
+
+
+async def main_async(args):
+    server = None
+    host, port = args.host, args.port
+    if port is None:
+        scratch = tempfile.mkdtemp()
+        db = DatabaseManager(os.path.join(scratch, "bench.db"))
+        bot = VoiceBot(components={'db': db, 'intent_classifier': StandInClassifier(),
+                                   'response_generator': StandInResponder(args.llm_ms / 1000)})
+        server = await ConversationServer(bot, host=host, port=0).start()
+        port = server.port
+    try:
+        elapsed, latencies, failures = await generate_load(host, port, args.sessions, args.concurrency)
+    finally:
+        if server is not None:
+            await server.close()
+            bot.cleanup()
+
+    print(f"sessions:        {args.sessions} ({args.concurrency} concurrent), {len(failures)} failed")
+    print(f"turns:           {len(latencies)}")
+    print(f"sessions/sec:    {(args.sessions - len(failures)) / elapsed:.1f}")
+    print(f"turns/sec:       {len(latencies) / elapsed:.1f}")
+    print(f"turn latency:    p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms")
+    if failures:
+        print(f"first failure:   {failures[0]!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="Existing server to load (default: start one in-process)")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50, help="Sessions connected at once")
+    parser.add_argument("--llm-ms", type=float, default=300, help="Stand-in OpenAI latency for the in-process server")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
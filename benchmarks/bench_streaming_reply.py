@@ -0,0 +1,99 @@
+"""
+Time from end of speech to the first sentence handed to TTS, blocking vs
+streamed LLM replies. Runs VoiceBot.process_user_input against a local
+fake OpenAI endpoint with a configurable time-to-first-token and
+per-token delay, and a stand-in speaker that takes a fixed time per word.
+
+Run from the repository root:
+    python -m benchmarks.bench_streaming_reply --turns 20 --first-token-ms 300 --token-ms 30
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import time
+import main as voicebot
+from main import VoiceBot
+from src.response_gen.response_cache import ResponseCache
+from src.response_gen.response_generator import ResponseGenerator
+from src.utils.fake_llm_server import FakeLLMServer
+
+REPLY = ("Of course. Your checking account is the best place for everyday spending. "
+         "Savings earns interest each month, so it suits money you won't need soon. "
+         "Would you like me to move some funds between them?")
+
+
+class StandInRecorder:
+    def record_utterance(self, on_speech_start=None):
+        return True
+
+    def get_audio(self):
+        return io.BytesIO(b"which account should I use")
+
+
+class StandInTranscriber:
+    def transcribe_audio(self, audio):
+        return audio.getvalue().decode()
+
+
+class StandInClassifier:
+    def classify_intent(self, text):
+        return {'intent': 'unknown', 'confidence': 0.5}
+
+
+class StandInSpeaker:
+    """Takes `word_s` per word, like a TTS engine speaking in real time"""
+    def __init__(self, word_s):
+        self.word_s = word_s
+
+    def speak_sentences(self, sentences, cancel_event=None):
+        for sentence in sentences:
+            time.sleep(self.word_s * len(sentence.split()))
+        return True
+
+
+class StandInDB:
+    def log_conversation(self, *args):
+        pass
+
+    def close(self):
+        pass
+
+
+def run(server, streaming, turns, word_s):
+    voicebot.LLM_STREAMING = streaming
+    # Every turn asks the same question, so keep the response cache out of the way
+    generator = ResponseGenerator(client=server.client(), cache=ResponseCache(max_size=0, template_intents=()))
+    generator.client.openai    # Build the SDK client before timing
+    bot = VoiceBot(components={'db': StandInDB(), 'recorder': StandInRecorder(),
+                               'transcriber': StandInTranscriber(), 'intent_classifier': StandInClassifier(),
+                               'tts_generator': StandInSpeaker(word_s), 'response_generator': generator})
+    first_audio, turn_times = [], []
+    for _ in range(turns):
+        bot.conversation_history.clear()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            bot.process_user_input()
+        turn_times.append(time.perf_counter() - start)
+        first_audio.append(bot.last_turn_metrics['time_to_first_audio_s'])
+    return first_audio, turn_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--first-token-ms", type=float, default=300, help="Fake model time to first token")
+    parser.add_argument("--token-ms", type=float, default=30, help="Fake model delay between tokens")
+    parser.add_argument("--word-ms", type=float, default=0, help="Stand-in TTS time per spoken word")
+    args = parser.parse_args()
+
+    with FakeLLMServer(REPLY, first_token_s=args.first_token_ms / 1000, token_s=args.token_ms / 1000) as server:
+        print(f"{'mode':<10}{'first audio p50':>17}{'max':>10}{'turn p50':>12}")
+        for label, streaming in (("blocking", False), ("streaming", True)):
+            first_audio, turn_times = run(server, streaming, args.turns, args.word_ms / 1000)
+            print(f"{label:<10}{statistics.median(first_audio) * 1000:>14.1f} ms{max(first_audio) * 1000:>7.1f} ms"
+                  f"{statistics.median(turn_times) * 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
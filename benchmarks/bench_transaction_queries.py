@@ -0,0 +1,84 @@
+"""
+Latency of "show my transactions" as the ledger grows. Seeds a scratch
+database in steps and times DatabaseManager.get_transactions for random
+users, next to the same query forced off the index (the pre-migration plan).
+
+Run from the repository root:
+    python -m benchmarks.bench_transaction_queries
+    python -m benchmarks.bench_transaction_queries --sizes 100000,1000000,5000000 --users 5000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from src.database.db_manager import DatabaseManager
+
+UNINDEXED_QUERY = '''
+    SELECT transaction_type, amount_cents / 100.0, timestamp
+    FROM transactions NOT INDEXED
+    WHERE user_id = ?
+    ORDER BY timestamp DESC, transaction_id DESC
+    LIMIT ?
+'''
+
+
+def seed(db, start, stop, users):
+    """Append rows start..stop-1 spread over `users` accounts, one per minute"""
+    rows = ((random.randint(1, users), random.choice(('deposit', 'withdrawal')), random.randint(100, 50000),
+             "2024-01-01 00:00:00", i * 60) for i in range(start, stop))
+    with db.pool.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO transactions (user_id, transaction_type, amount_cents, timestamp)
+            VALUES (?, ?, ?, datetime(?, '+' || ? || ' seconds'))
+        ''', rows)
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def time_queries(query, lookups):
+    samples = []
+    for user_id in lookups:
+        start = time.perf_counter()
+        query(user_id)
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000,2000000", help="Comma-separated ledger sizes")
+    parser.add_argument("--users", type=int, default=1000, help="Accounts the rows are spread over")
+    parser.add_argument("--queries", type=int, default=500, help="Indexed lookups per size")
+    parser.add_argument("--scan-queries", type=int, default=20, help="Unindexed lookups per size (0 to skip)")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    random.seed(7)
+    with tempfile.TemporaryDirectory() as scratch:
+        db = DatabaseManager(os.path.join(scratch, "bench.db"))
+        conn = db.pool.connection()
+        print(f"{'rows':>10}  {'seed s':>7}  {'indexed p50':>11}  {'p99':>7}  {'no index p50':>12}")
+        seeded = 0
+        for size in sizes:
+            start = time.perf_counter()
+            seed(db, seeded, size, args.users)
+            seed_s = time.perf_counter() - start
+            seeded = size
+
+            lookups = [random.randint(1, args.users) for _ in range(args.queries)]
+            p50, p99 = time_queries(lambda user_id: db.get_transactions(user_id, limit=5), lookups)
+            scan = "-"
+            if args.scan_queries:
+                scan_p50, _ = time_queries(lambda user_id: conn.execute(UNINDEXED_QUERY, (user_id, 5)).fetchall(),
+                                           lookups[:args.scan_queries])
+                scan = f"{scan_p50:.2f} ms"
+            print(f"{size:>10}  {seed_s:>7.1f}  {p50:>8.3f} ms  {p99:>4.3f} ms  {scan:>12}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
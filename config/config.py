@@ -8,13 +8,55 @@ load_dotenv()
 
 # Database Configuration
 DATABASE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'banking.db')
+DB_BUSY_TIMEOUT_MS = 5000         # How long a writer waits for the lock before failing
+DB_CACHE_SIZE_KB = 16384          # Page cache per connection
+DB_SYNCHRONOUS = "NORMAL"         # Safe with WAL: commits survive crashes, only power loss can drop the last ones
+LOG_QUEUE_SIZE = 1000             # Conversation rows waiting to be written
+LOG_BATCH_SIZE = 64               # Rows per group commit
+LOG_FLUSH_INTERVAL_S = 0.5        # Longest a row waits before its batch is committed
+LOG_ENQUEUE_TIMEOUT_S = 0.05      # Backpressure: how long a caller blocks on a full queue before the row is dropped
+BULK_CHUNK_SIZE = 5000            # Rows per transaction for bulk import/export
+USER_CACHE_ENABLED = os.getenv('USER_CACHE_ENABLED', '1') == '1'  # Turn off when several processes write to one database
+USER_CACHE_SIZE = 10000           # Users kept in the in-process cache
+HISTORY_PAGE_SIZE = 100           # Rows fetched per keyset page when walking transaction history
 
 # Path for saving audio files
 AUDIO_OUTPUT_DIR = "output/audio"
 
+# Recordings are passed to the transcriber in memory; set SAVE_RECORDINGS=1 to keep a copy for auditing
+SAVE_RECORDINGS = os.getenv('SAVE_RECORDINGS', '0') == '1'
+RECORDINGS_DIR = "output/recordings"
+
+# Speech recognition backend: "openai" (remote Whisper API), "local" (in-process model) or "stub"
+ASR_BACKEND = os.getenv('ASR_BACKEND', 'openai')
+LOCAL_ASR_MODEL = os.getenv('LOCAL_ASR_MODEL', 'openai/whisper-base.en')
+ASR_WORKERS = int(os.getenv('ASR_WORKERS', os.cpu_count() or 1))  # Process pool size for Transcriber.transcribe_many
+
+# Voice activity detection (end-pointing) for AudioRecorder.record_utterance
+VAD_ENERGY_THRESHOLD = 0.003      # Minimum RMS level of a float32 frame counted as speech
+VAD_NOISE_RATIO = 3.0             # Speech must also be this many times louder than the noise floor
+VAD_MIN_SPEECH_MS = 120           # Voiced audio needed before a turn is considered started
+VAD_TRAILING_SILENCE_MS = 800     # Silence after speech that ends the turn
+VAD_PRE_ROLL_MS = 300             # Audio kept from before speech start
+VAD_MAX_DURATION_S = 15           # Hard cap on a single utterance
+VAD_NO_SPEECH_TIMEOUT_S = 8       # Give up if the caller never starts talking
+
 
 
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+# Shared LLM client (src/llm/client.py), used for chat replies, extraction fallbacks and Whisper
+LLM_MODEL = "gpt-3.5-turbo"
+LLM_BASE_URL = os.getenv('OPENAI_BASE_URL')      # None uses the SDK default
+LLM_TIMEOUT_S = 15.0              # Per attempt
+LLM_CONNECT_TIMEOUT_S = 3.0
+LLM_DEADLINE_S = 30.0             # Per call, retries and backoff included
+LLM_MAX_RETRIES = 2               # Retries after timeouts, connection errors, 429 and 5xx
+LLM_RETRY_BACKOFF_S = 0.25        # Full-jitter exponential backoff: random(0, base * 2**attempt)
+LLM_RETRY_MAX_BACKOFF_S = 4.0
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '16'))  # Calls in flight per process
+LLM_HEDGE_AFTER_S = float(os.getenv('LLM_HEDGE_AFTER_MS', '0')) / 1000 or None  # Send a second copy of a slow call (doubles its cost)
+# Stream LLM replies and speak each sentence as soon as it is complete
+LLM_STREAMING = os.getenv('LLM_STREAMING', '1') == '1'
 
 # Response templates for different intents
 RESPONSE_TEMPLATES = {
@@ -25,7 +67,26 @@ RESPONSE_TEMPLATES = {
     "unknown": "I'm not sure I understand. Could you please rephrase that?",
     "help": "I can help you with checking your balance, viewing transactions, and more."
 }
+# Per-session chat memory sent with each LLM prompt (src/response_gen/conversation_memory.py)
+MEMORY_TOKEN_BUDGET = 300         # Recent messages kept verbatim, in tokens
+MEMORY_MAX_MESSAGES = 40          # Hard cap on verbatim messages, however short
+MEMORY_SUMMARY_TOKENS = 120       # Rolling summary of older turns, in tokens
+# Response cache in front of the LLM (src/response_gen/response_cache.py)
+RESPONSE_TEMPLATE_INTENTS = ["greeting", "help", "goodbye"]  # Always answered from RESPONSE_TEMPLATES
+RESPONSE_TEMPLATE_MIN_CONFIDENCE = 0.7  # Below this the intent is a guess, so ask the LLM instead
+RESPONSE_CACHE_SIZE = 1024        # Prior replies kept per process (0 disables the cache)
+RESPONSE_CACHE_TTL_S = 6 * 3600   # Seconds before a cached reply is regenerated
+RESPONSE_CACHE_MAX_WORDS = 8      # Only short, low-information turns are cached; longer ones depend on context
+RESPONSE_CACHE_SEMANTIC = os.getenv('RESPONSE_CACHE_SEMANTIC', '0') == '1'  # Also reuse replies to similar wording
+RESPONSE_CACHE_SIMILARITY = 0.85  # Cosine similarity needed for a near match
 # config/config.py
+# Zero-shot intent model
+INTENT_MODEL = os.getenv('INTENT_MODEL', 'facebook/bart-large-mnli')
+INTENT_HYPOTHESIS_TEMPLATE = "This is a request to {}."
+INTENT_NUM_THREADS = int(os.getenv('INTENT_NUM_THREADS', '0'))  # 0 leaves torch's default
+INTENT_CACHE_SIZE = 2048          # Classification results kept per process (0 disables the cache)
+INTENT_CACHE_TTL_S = 3600         # Seconds before a cached classification is recomputed
+
 CANDIDATE_INTENTS = [
     "current_user",
     "show_users",
@@ -46,17 +107,96 @@ INTENT_DESCRIPTIONS = {
     "goodbye": "end conversation",
     "unknown": "unclear or undefined request"
 }
-from google.cloud import texttospeech
 
+# Exact phrases that decide an intent without running the model
+COMMAND_PATTERNS = {
+    "show_users": ["show all users", "display users",
+                   "list users", "show users", "get all users"]
+}
+
+# Command keyword priorities for the fast-path matcher; the highest-priority
+# keyword found anywhere in the transcript wins, ties go to the earliest one
+COMMAND_PRIORITIES = {
+    'change user': 100,
+    'this is': 90,
+    'create': 80,
+    'transfer': 70,
+    'send': 70,
+    'deposit': 60,
+    'withdraw': 60,
+    # Below the money-moving commands: "Deposit 100, I want to spend it later" is a deposit.
+    # "total deposits" still wins over 'deposit' because the longer phrase consumes it.
+    'spend': 55,
+    'spent': 55,
+    'total deposit': 55,
+    'show_users': 50,
+    'balance': 40,
+    'transaction': 40,
+    'help': 10
+}
+
+# Keywords that only count at the start of an utterance ("This is John", not "what is this")
+ANCHORED_COMMANDS = ['this is']
+
+# Local username/amount extraction below this confidence falls back to the LLM
+ENTITY_CONFIDENCE_THRESHOLD = 0.7
+
+# Intent logged when a command keyword decides the turn
+COMMAND_INTENTS = {
+    'change user': 'current_user',
+    'this is': 'current_user',
+    'balance': 'balance_inquiry',
+    'transaction': 'transaction_history',
+    'spend': 'transaction_history',
+    'spent': 'transaction_history',
+    'total deposit': 'transaction_history',
+    'help': 'help'
+}
 # TTS Configuration
+# Enum values are given by name so importing config does not pull in google.cloud
+# (~300 ms); texttospeech.VoiceSelectionParams/AudioConfig accept the names directly.
 TTS_LANGUAGE_CODE = "en-US"
 TTS_VOICE = {
     "name": "en-US-Standard-A",
     "language_code": "en-US",
-    "ssml_gender": texttospeech.SsmlVoiceGender.FEMALE
+    "ssml_gender": "FEMALE"
 }
 TTS_AUDIO_CONFIG = {
-    "audio_encoding": texttospeech.AudioEncoding.MP3,
+    "audio_encoding": "MP3",
     "speaking_rate": 1.0,
     "pitch": 0.0
-}
\ No newline at end of file
+}
+# Synthesized speech cache (src/text_to_speech/speech_cache.py)
+TTS_CACHE_ENABLED = os.getenv('TTS_CACHE_ENABLED', '1') == '1'
+TTS_CACHE_DIR = os.path.join(AUDIO_OUTPUT_DIR, "cache")   # WAV files plus index.json
+TTS_CACHE_MAX_BYTES = 200 * 1024 * 1024   # Least recently played phrases are deleted past this size
+TTS_PRERENDER = os.getenv('TTS_PRERENDER', '1') == '1'   # Render fixed phrases during warm-up
+# Speak templated replies as pre-rendered fixed segments joined with slots rendered on demand.
+# Off until python -m benchmarks.bench_segmented_tts shows a win with the deployed engine
+TTS_SEGMENTED = os.getenv('TTS_SEGMENTED', '0') == '1'
+TTS_CROSSFADE_MS = 15             # Overlap at each seam between joined segments
+TTS_SILENCE_THRESHOLD = 300       # 16-bit amplitude below which segment edges are trimmed
+# Slots besides numbers and amounts: each pattern's "slot" group is rendered on demand
+TTS_SLOT_PATTERNS = [
+    r"account for (?P<slot>\S+)$",
+    r"^Current user: (?P<slot>\S+)",
+    r"^An account for (?P<slot>\S+) already exists$",
+]
+# Pipelined turn processing (python main.py --pipeline)
+PIPELINE_QUEUE_SIZE = 4           # Turns waiting between two stages before the earlier stage blocks
+# Stop speaking when the caller starts talking. Off by default: without echo cancellation
+# (headset or AEC) the bot's own speech from the speakers trips the VAD and cancels the reply
+BARGE_IN_ENABLED = os.getenv('BARGE_IN_ENABLED', '0') == '1'
+
+# Multi-session conversation server (python -m src.server.session_server)
+SERVER_HOST = os.getenv('SERVER_HOST', '127.0.0.1')
+SERVER_PORT = int(os.getenv('SERVER_PORT', '8765'))
+SERVER_MAX_MESSAGE_BYTES = 16 * 1024 * 1024   # One newline-delimited JSON message (base64 audio included)
+# Turns from all sessions allowed in each blocking stage at once
+SERVER_STAGE_LIMITS = {
+    'asr': 2,         # Speech recognition
+    'nlu': 2,         # Command matching / intent model
+    'db': 8,          # Command handlers (SQLite, entity extraction)
+    'llm': 16,        # OpenAI replies; network-bound, so allow more
+    'tts': 1          # pyttsx3 engines are not thread-safe
+}
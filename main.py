@@ -1,28 +1,100 @@
+import argparse
+import importlib
+import itertools
 import json
+import threading
 import time
 import os
-import openai
-from src.speech_to_text.recorder import AudioRecorder
-from src.speech_to_text.transcriber import Transcriber
-from src.nlp_processing.intent_classifier import IntentClassifier
-from src.response_gen.response_generator import ResponseGenerator
-from src.text_to_speech.tts_generator import TTSGenerator
-from src.database.db_manager import DatabaseManager
+import uuid
+from datetime import datetime, timezone
+from config.config import SAVE_RECORDINGS, RECORDINGS_DIR, ENTITY_CONFIDENCE_THRESHOLD, BARGE_IN_ENABLED, \
+    LLM_STREAMING, TTS_PRERENDER, RESPONSE_TEMPLATES
+from src.nlp_processing.command_matcher import CommandMatcher
+from src.nlp_processing.entity_extractor import EntityExtractor, UserIndex, parse_amount, parse_period
+from src.utils.startup_profiler import StartupProfiler
+from src.utils.pipeline import TurnPipeline
+from src.llm.client import get_client
+from src.response_gen.conversation_memory import ConversationMemory
 import logging
 
 logging.basicConfig(level=logging.INFO, filename='app.log', filemode='w', format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Components are imported and constructed on first use (or by warm_up), in this order.
+# Heavy modules (torch/transformers, PyAudio, pyttsx3, openai) are only imported here.
+COMPONENTS = {
+    'db': ('src.database.db_manager', 'DatabaseManager'),
+    'intent_classifier': ('src.nlp_processing.intent_classifier', 'IntentClassifier'),
+    'response_generator': ('src.response_gen.response_generator', 'ResponseGenerator'),
+    'transcriber': ('src.speech_to_text.transcriber', 'Transcriber'),
+    'tts_generator': ('src.text_to_speech.tts_generator', 'TTSGenerator'),
+    'recorder': ('src.speech_to_text.recorder', 'AudioRecorder'),
+}
+
+
+ASK_FOR_USER = "Please tell the name of user like 'This is user name' "
+# Replies that never change; their speech is rendered during warm-up
+FIXED_PHRASES = [
+    ASK_FOR_USER,
+    "You have no recent transactions.",
+    "Please specify a valid username",
+    "Please specify the amount to deposit.",
+    "Please specify the amount to withdraw.",
+    "Invalid input. Please specify both amount and recipient.",
+    "User not found.",
+]
+# Example replies for the templates with slots; pre-rendering them caches
+# their fixed wording, and the amounts and names are rendered per reply
+TEMPLATE_PHRASES = [
+    "Your current balance is $0.00",
+    "Successfully deposited $0.00",
+    "Successfully withdrew $0.00",
+    "You spent $0.00 this month across 0 transactions.",
+    "Successfully created account for user",
+    "Current user: user (ID: 0)",
+]
+
+# log_turn default: whoever is the current user now
+_CURRENT_USER = object()
+
+
+def _component_property(name):
+    return property(lambda self: self.get_component(name))
+
+
 class VoiceBot:
-    def __init__(self):
-        print("Initializing Voice Bot...")
-        self.recorder = AudioRecorder()
-        self.transcriber = Transcriber()
-        self.intent_classifier = IntentClassifier()
-        self.response_generator = ResponseGenerator()
-        self.tts_generator = TTSGenerator()
-        self.db = DatabaseManager()
+    recorder = _component_property('recorder')
+    transcriber = _component_property('transcriber')
+    intent_classifier = _component_property('intent_classifier')
+    response_generator = _component_property('response_generator')
+    tts_generator = _component_property('tts_generator')
+    db = _component_property('db')
+
+    def __init__(self, components=None, profiler=None):
+        """
+        components: optional {name: instance} to use instead of building them,
+        e.g. shared instances or test doubles.
+        """
+        self.profiler = profiler or StartupProfiler(enabled=False)
+        self._components = dict(components or {})
+        self._component_locks = {name: threading.Lock() for name in COMPONENTS}
+        self._warm_up_thread = None
+        self._entity_extractor = None
+        self._entity_lock = threading.Lock()
         self.user_id = None
         self.username= None
+        # Per-caller chat memory handed to the shared ResponseGenerator
+        self.conversation_history = ConversationMemory()
+        # Latency of the latest turn, e.g. time_to_first_audio_s (end of speech -> first sentence to TTS)
+        self.last_turn_metrics = {}
+        # Pipelined mode (run_pipelined): turn ids, barge-in state
+        self.pipeline = None
+        self._turn_ids = itertools.count(1)
+        self._last_turn_id = 0
+        self._cancel_through = 0
+        self._speaking = None
+        self._speaking_reply = None
+        self._streaming_reply = None
+        self._barge_in = threading.Event()
         # In main.py, update the commands dictionary in __init__
         # In main.py, update the commands dictionary in __init__
         self.commands = {
@@ -35,10 +107,89 @@ class VoiceBot:
             'withdraw': self.make_withdrawal,
             'create': self.create_new_user,
             'transfer': self.transfer_money,
-            'send': self.transfer_money  # Alias for transfer
+            'send': self.transfer_money,  # Alias for transfer
+            'spend': self.check_spending,
+            'spent': self.check_spending,
+            'total deposit': self.check_spending
         }
+        # Uses the configured command patterns so matching never waits for the model to load
+        self.command_matcher = CommandMatcher.from_sources(self.commands)
 
+    def get_component(self, name):
+        """Return a component, importing and constructing it on first use"""
+        component = self._components.get(name)
+        if component is not None:
+            return component
+        with self._component_locks[name]:
+            if name not in self._components:
+                module_name, class_name = COMPONENTS[name]
+                with self.profiler.measure(name, "import"):
+                    module = importlib.import_module(module_name)
+                with self.profiler.measure(name, "init"):
+                    self._components[name] = getattr(module, class_name)()
+        return self._components[name]
+
+    def spawn_session(self):
+        """
+        A VoiceBot for another caller: its own current user and chat history,
+        sharing this bot's already-built components and name index.
+        """
+        session = VoiceBot(profiler=self.profiler)
+        # The same mapping and locks, so a component first needed by any
+        # session is built once, shared, and closed by this bot's cleanup()
+        session._components = self._components
+        session._component_locks = self._component_locks
+        if 'db' in self._components:
+            session._entity_extractor = self.entity_extractor
+        return session
 
+    @property
+    def entity_extractor(self):
+        """Local username/amount extractor backed by an index of all usernames"""
+        if self._entity_extractor is None:
+            with self._entity_lock:
+                if self._entity_extractor is None:
+                    self._entity_extractor = EntityExtractor(UserIndex(self.db.get_all_usernames()))
+        return self._entity_extractor
+
+    def warm_up(self, background=True, components=None):
+        """
+        Build components ahead of the first turn and run a dummy inference so
+        the first real request does not pay for model loading.
+        Returns the warm-up thread when running in the background.
+        """
+        names = list(components or COMPONENTS)
+
+        def _warm_up():
+            for name in names:
+                try:
+                    self.get_component(name)
+                    if name == 'intent_classifier':
+                        with self.profiler.measure(name, "warm-up"):
+                            # Bypass the result cache so the model really runs
+                            self.intent_classifier.score_intents("hello, what's my balance")
+                    if name == 'response_generator':
+                        # Build the SDK client (and its connection pool) before the first reply
+                        self.response_generator.client.openai
+                    if name == 'tts_generator' and TTS_PRERENDER:
+                        with self.profiler.measure(name, "warm-up"):
+                            self.tts_generator.prerender(self.fixed_phrases())
+                except Exception as e:
+                    self.profiler.record_error(name, e)
+                    logging.error(f"Warm-up of {name} failed: {str(e)}")
+
+        if not background:
+            _warm_up()
+            return None
+        self._warm_up_thread = threading.Thread(target=_warm_up, name="voicebot-warm-up", daemon=True)
+        self._warm_up_thread.start()
+        return self._warm_up_thread
+
+
+
+    def fixed_phrases(self):
+        """Replies that are always worded the same"""
+        return FIXED_PHRASES + TEMPLATE_PHRASES + [self.show_help("")] + list(RESPONSE_TEMPLATES.values())
 
     def create_new_user(self, text):
         """Handle user creation command"""
@@ -48,8 +199,11 @@ class VoiceBot:
             match = re.search(r'create (?:user|account)(?: for)? ([a-zA-Z]+)', text.lower())
             if match:
                 username = match.group(1)
+                if self.db.username_exists(username):
+                    return f"An account for {username} already exists"
                 user_id = self.db.create_user(username)
                 if user_id:
+                    self.entity_extractor.user_index.add(username)
                     return f"Successfully created account for {username}"
                 else:
                     return f"Failed to create account for {username}"
@@ -61,36 +215,22 @@ class VoiceBot:
 
     
     def transfer_money(self, text):
-        """Handle money transfer command using OpenAI extraction"""
+        """Handle money transfer command, extracting recipient and amount locally"""
         if self.user_id is None:
-            return (f"Please tell the name of user like 'This is user name' ")
+            return ASK_FOR_USER
         try:
-            # Define the prompt to extract amount and username
-            prompt = f"Extract the amount and recipient username from this text: '{text}'. Return a valid JSON in this format: {{\"username\": \"<recipient>\", \"amount\": <amount>}}. make sure nothing extra is sent in response apart from json "
-            
-            logging.info("Extracting data using OpenAI...")
-
-            # Call OpenAI API (Updated for latest version)
-            response = openai.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant."},
-                    {"role": "user", "content": prompt},
-                ]
-            )
-
-            logging.info(f"API Response: {response}")
-
-            # Extract response content
-            extracted_text = response.choices[0].message.content.strip()
-            logging.info(f"extracted_text {extracted_text}")
-            # Convert extracted response to JSON
-            extracted_data = json.loads(extracted_text)
-            logging.info(f"username {extracted_text}")
-            logging.info(f"amount {extracted_data}")
+            extracted_data = self.entity_extractor.extract_transfer(text)
+            logging.info(f"Local extraction: {extracted_data}")
+            if extracted_data['confidence'] < ENTITY_CONFIDENCE_THRESHOLD:
+                extracted_data = self._llm_extract_transfer(text)
+            elif not extracted_data['exact']:
+                # A name that only sounds like a user ("Jon" -> john) never moves money by itself
+                recipient, amount = extracted_data['username'], extracted_data['amount']
+                return f'Did you mean {recipient}? Say "send ${amount:.2f} to {recipient}" to confirm.'
+
             # Get extracted username and amount
-            to_username = extracted_data.get("username", "").strip().lower()
-            amount = float(extracted_data.get("amount", 0))
+            to_username = (extracted_data.get("username") or "").strip().lower()
+            amount = float(extracted_data.get("amount") or 0)
             from_username=self.username
             # Validate extracted data
             if to_username and amount > 0:
@@ -103,35 +243,58 @@ class VoiceBot:
         except Exception as e:
             return f"Error processing transfer: {str(e)}"
 
+    def _llm_extract_transfer(self, text):
+        """Fallback extraction of recipient and amount using OpenAI"""
+        # Define the prompt to extract amount and username
+        prompt = f"Extract the amount and recipient username from this text: '{text}'. Return a valid JSON in this format: {{\"username\": \"<recipient>\", \"amount\": <amount>}}. make sure nothing extra is sent in response apart from json "
+        
+        logging.info("Extracting data using OpenAI...")
+        extracted_text = get_client().complete_text([
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": prompt},
+        ])
+        logging.info(f"extracted_text {extracted_text}")
+        # Convert extracted response to JSON
+        return json.loads(extracted_text)
+
     
     def check_balance(self, text):
         if self.user_id is None:
-            return (f"Please tell the name of user like 'This is user name' ")
+            return ASK_FOR_USER
         logging.info(f"this is the text {text}")
         balance = self.db.get_balance(self.user_id)
         return f"Your current balance is ${balance:.2f}"
 
     def check_transactions(self, text):
         if self.user_id is None:
-            return (f"Please tell the name of user like 'This is user name' ")
+            return ASK_FOR_USER
         transactions = self.db.get_transactions(self.user_id, limit=5)
         if not transactions:
             return "You have no recent transactions."
         
-        response = "Here are your recent transactions:\n"
-        for trans in transactions:
-            response += f"- {trans[0]}: ${trans[1]:.2f} on {trans[2]}\n"
-        return response
+        lines = [f"- {trans[0]}: ${trans[1]:.2f} on {trans[2]}" for trans in transactions]
+        return "Here are your recent transactions:\n" + "\n".join(lines) + "\n"
+
+    def check_spending(self, text):
+        """Statement questions ("how much did I spend this month"), answered from the rollups"""
+        if self.user_id is None:
+            return ASK_FOR_USER
+        start, end, label = parse_period(text, datetime.now(timezone.utc).date())
+        if 'deposit' in text.lower():
+            total = self.db.summarize_period(self.user_id, start, end)['deposit']
+            return f"You deposited ${total['in']:.2f} {label} across {total['count']} deposits."
+        spent, count = self.db.get_spending(self.user_id, start, end)
+        if not count:
+            return f"You haven't spent anything {label}."
+        return f"You spent ${spent:.2f} {label} across {count} transactions."
 
     def make_deposit(self, text):
         if self.user_id is None:
-            return (f"Please tell the name of user like 'This is user name' ")
+            return ASK_FOR_USER
         try:
-            # Try to extract amount from text
-            import re
-            amounts = re.findall(r'\$?(\d+(?:\.\d{2})?)', text)
-            if amounts:
-                amount = float(amounts[0])
+            # Try to extract amount from text ("$100", "fifty dollars", ...)
+            amount, _ = parse_amount(text)
+            if amount:
                 if self.db.add_transaction(self.user_id, 'deposit', amount):
                     return f"Successfully deposited ${amount:.2f}"
             return "Please specify the amount to deposit."
@@ -140,12 +303,10 @@ class VoiceBot:
 
     def make_withdrawal(self, text):
         if self.user_id is None:
-            return (f"Please tell the name of user like 'This is user name' ")
+            return ASK_FOR_USER
         try:
-            import re
-            amounts = re.findall(r'\$?(\d+(?:\.\d{2})?)', text)
-            if amounts:
-                amount = float(amounts[0])
+            amount, _ = parse_amount(text)
+            if amount:
                 if self.db.add_transaction(self.user_id, 'withdrawal', amount):
                     return f"Successfully withdrew ${amount:.2f}"
             return "Please specify the amount to withdraw."
@@ -153,56 +314,28 @@ class VoiceBot:
             return "Error processing withdrawal. Please try again."
 
     def change_user(self, text):
-        try:
-            # OpenAI GPT model to identify the username
-                
-            prompt = f"Extract the changed username from this text :'{text}' i just need username make sure not to give anything else except that just give one word and that should be username"
-            logging.info("im here ")
-            # Call OpenAI API to generate a response (updated for new API interface)
-            response = openai.chat.completions.create(
-                model="gpt-3.5-turbo",  # Use an appropriate model
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant."},
-                    {"role": "user", "content": prompt},
-                ],
-            )
-            logging.info(f"response {response}")
-            
-            # Parse the response
-            extracted_username = response.choices[0].message.content.strip().lower()
-            logging.info(f"username {extracted_username}")
-            # If we found a valid username, retrieve user details
-            if extracted_username:
-                user_details = self.db.get_user_by_username(extracted_username)
-                if user_details:
-                    self.user_id=user_details['user_id']
-                    self.username=extracted_username
-                    return f"Current user: {extracted_username} (ID: {user_details['user_id']})"
-                else:
-                    return "User not found."
-            return "No valid username detected in the input."
-        
-        except Exception as e:
-            return f"Error processing the current user. Details: {str(e)}"
+        prompt = f"Extract the changed username from this text :'{text}' i just need username make sure not to give anything else except that just give one word and that should be username"
+        return self._switch_user(text, prompt)
 
     def find_current_user(self, text):
+        prompt = f"Extract the username from this text :'{text}' i just need username make sure not to give anything else except that just give one word and that should be username"
+        return self._switch_user(text, prompt)
+
+    def _switch_user(self, text, prompt):
+        """Resolve the spoken username (locally, else via OpenAI) and make it the current user"""
         try:
-            # OpenAI GPT model to identify the username
-                
-            prompt = f"Extract the username from this text :'{text}' i just need username make sure not to give anything else except that just give one word and that should be username"
-            logging.info("im here ")
-            # Call OpenAI API to generate a response (updated for new API interface)
-            response = openai.chat.completions.create(
-                model="gpt-3.5-turbo",  # Use an appropriate model
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant."},
-                    {"role": "user", "content": prompt},
-                ],
-            )
-            logging.info(f"response {response}")
-            
-            # Parse the response
-            extracted_username = response.choices[0].message.content.strip().lower()
+            extracted = self.entity_extractor.extract_username(text)
+            logging.info(f"Local extraction: {extracted}")
+            if extracted['confidence'] >= ENTITY_CONFIDENCE_THRESHOLD:
+                if not extracted['exact']:
+                    # "this is Jon" must not log in as john without asking
+                    return f'Did you mean {extracted["username"]}? Say "this is {extracted["username"]}" to confirm.'
+                extracted_username = extracted['username']
+            else:
+                extracted_username = self._llm_extract_username(prompt)
+                # Names created elsewhere become resolvable locally next time
+                if extracted_username and self.db.username_exists(extracted_username):
+                    self.entity_extractor.user_index.add(extracted_username)
             logging.info(f"username {extracted_username}")
             # If we found a valid username, retrieve user details
             if extracted_username:
@@ -218,11 +351,21 @@ class VoiceBot:
         except Exception as e:
             return f"Error processing the current user. Details: {str(e)}"
 
+    def _llm_extract_username(self, prompt):
+        """Fallback username extraction using OpenAI"""
+        response = get_client().complete_text([
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": prompt},
+        ])
+        logging.info(f"response {response}")
+        return response.lower()
+
     def show_help(self, text):
         return """
     Available commands:
     - Check balance: "What's my balance?"
     - Recent transactions: "Show my transactions"
+    - Spending: "How much did I spend this month?"
     - Make deposit: "Deposit $100"
     - Make withdrawal: "Withdraw $50"
     - Create user: "Create user John"
@@ -232,68 +375,239 @@ class VoiceBot:
 
 
 
+    def save_recording(self, audio=None):
+        """
+        Persist a recording for auditing, with a collision-free name.
+        audio: an in-memory WAV from get_audio(); defaults to the recorder's last capture.
+        """
+        os.makedirs(RECORDINGS_DIR, exist_ok=True)
+        filename = f"recording_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.wav"
+        path = os.path.join(RECORDINGS_DIR, filename)
+        if audio is None:
+            return self.recorder.save_audio(path)
+        with open(path, 'wb') as f:
+            f.write(audio.getvalue())
+        return path
+
+    def resolve_intent(self, text):
+        """Return (match, intent, confidence); the model only runs when no keyword decides it"""
+        match = self.command_matcher.match(text)
+        if match:
+            return match, match.intent, 1.0
+        intent_data = self.intent_classifier.classify_intent(text)
+        return None, intent_data['intent'], intent_data['confidence']
+
+    def run_command(self, match, text):
+        """Run the matched command handler; None when there is no handler to run"""
+        if match and match.command:
+            return self.commands[match.command](text)
+        return None
+
+    def generate_reply(self, text, intent, confidence):
+        """General LLM reply, using this caller's own history"""
+        return self.response_generator.generate_response(text, intent, confidence,
+                                                         history=self.conversation_history)
+
+    def stream_reply(self, text, intent, confidence, remember=True):
+        """LLM reply as sentences while it streams in; history is updated when it ends"""
+        return self.response_generator.stream_response(text, intent, confidence,
+                                                       history=self.conversation_history, remember=remember)
+
+    def _timed_sentences(self, sentences, heard_at, parts=None):
+        """Pass sentences through to TTS, noting when the first one goes out"""
+        first = True
+        for sentence in sentences:
+            if first:
+                self.last_turn_metrics['time_to_first_audio_s'] = time.perf_counter() - heard_at
+                first = False
+            if parts is not None:
+                parts.append(sentence)
+            yield sentence
+
+    def log_turn(self, text, response, intent, confidence, user_id=_CURRENT_USER):
+        """user_id: who the turn was answered for, when logged after later turns ran"""
+        if user_id is _CURRENT_USER:
+            user_id = self.user_id
+        self.db.log_conversation(user_id, text, response, intent, confidence)
+
+    def handle_text(self, text):
+        """Answer one utterance; returns (response, intent, confidence)"""
+        match, intent, confidence = self.resolve_intent(text)
+        response = self.run_command(match, text)
+        # If no command matched, use general response generator
+        if not response:
+            response = self.generate_reply(text, intent, confidence)
+        self.log_turn(text, response, intent, confidence)
+        return response, intent, confidence
+
     def process_user_input(self):
         try:
-            # 1. Record audio
-            print("\nListening... (Speaking for 5 seconds)")
-            self.recorder.start_recording()
-            time.sleep(5)
-            self.recorder.stop_recording()
-            
-            # Save audio to file
-            audio_file = f"temp_recording_{int(time.time())}.wav"
-            self.recorder.save_audio(audio_file)
-            
-            # 2. Convert speech to text
-            text = self.transcriber.transcribe_audio(audio_file)
+            # 1. Record audio until the caller stops talking
+            print("\nListening... (stop speaking to finish)")
+            if not self.recorder.record_utterance():
+                return "I didn't hear anything. Please try again."
+            heard_at = time.perf_counter()
+            self.last_turn_metrics = {}
+
+            # Keep a copy on disk only when auditing is enabled
+            if SAVE_RECORDINGS:
+                self.save_recording()
+
+            # 2. Convert speech to text straight from the in-memory recording
+            text = self.transcriber.transcribe_audio(self.recorder.get_audio())
             if not text:
                 return "I couldn't understand the audio. Please try again."
             print(f"You said: {text}")
             
-            # 3. Classify intent and handle commands
-            intent_data = self.intent_classifier.classify_intent(text)
-            intent = intent_data['intent']
-            confidence = intent_data['confidence']
+            # 3-4. Resolve the intent and answer it
+            match, intent, confidence = self.resolve_intent(text)
             print(f"Detected intent: {intent} (confidence: {confidence:.2f})")
-            
-            # 4. Generate response based on intent
-            response = None
-            text_lower = text.lower()
-            
-            # Check for specific commands
-            for cmd, handler in self.commands.items():
-                if cmd in text_lower:
-                    response = handler(text)
-                    break
-            
-            # If no command matched, use general response generator
-            if not response:
-                response = self.response_generator.generate_response(text, intent, confidence)
-            
+            response = self.run_command(match, text)
+            if response or not LLM_STREAMING:
+                sentences = [response or self.generate_reply(text, intent, confidence)]
+            else:
+                # Streamed LLM reply: speaking starts with the first sentence
+                sentences = self.stream_reply(text, intent, confidence)
+
+            # 5. Convert response to speech
+            parts = []
+            self.tts_generator.speak_sentences(self._timed_sentences(sentences, heard_at, parts))
+            response = " ".join(parts)
             print(f"Bot response: {response}")
-            
-            # 5. Log conversation
-            self.db.log_conversation(
-                self.user_id,
-                text,
-                response,
-                intent,
-                confidence
-            )
-            
-            # 6. Convert response to speech
-            self.tts_generator.speak_text(response)
-            
-            # 7. Cleanup temporary audio file
-            if os.path.exists(audio_file):
-                os.remove(audio_file)
-            
+
+            # 6. Log the full reply
+            self.log_turn(text, response, intent, confidence)
             return response
             
         except Exception as e:
             print(f"Error in processing: {str(e)}")
             return "I encountered an error. Please try again."
 
+    def build_pipeline(self):
+        """transcribe -> respond -> (speak | bookkeeping), one worker per stage"""
+        pipeline = TurnPipeline()
+        pipeline.add_stage('transcribe', self._transcribe_stage, ['respond'])
+        pipeline.add_stage('respond', self._respond_stage, ['speak', 'bookkeeping'])
+        pipeline.add_stage('speak', self._speak_stage)
+        pipeline.add_stage('bookkeeping', self._bookkeeping_stage)
+        return pipeline
+
+    def _transcribe_stage(self, turn):
+        turn['text'] = self.transcriber.transcribe_audio(turn['audio'])
+        if not turn['text']:
+            print("I couldn't understand the audio. Please try again.")
+            return None
+        print(f"You said: {turn['text']}")
+        return turn
+
+    def _respond_stage(self, turn):
+        text = turn['text']
+        match, turn['intent'], turn['confidence'] = self.resolve_intent(text)
+        print(f"Detected intent: {turn['intent']} (confidence: {turn['confidence']:.2f})")
+        response = self.run_command(match, text)
+        # Bookkeeping runs later, when a following "this is X" may have switched user
+        turn['user_id'] = self.user_id
+        if response:
+            print(f"Bot response: {response}")
+        elif LLM_STREAMING:
+            self._wait_for_reply()
+            # Hand the stream on at once; speak reads sentences as they arrive. History
+            # gets the reply once it has been spoken (or the part heard before a barge-in)
+            from src.response_gen.response_generator import StreamingReply
+            response = StreamingReply(
+                self.stream_reply(text, turn['intent'], turn['confidence'], remember=False),
+                on_end=lambda heard: self.response_generator.remember_reply(self.conversation_history, heard))
+            self._streaming_reply = response
+        else:
+            self._wait_for_reply()
+            response = self.generate_reply(text, turn['intent'], turn['confidence'])
+            print(f"Bot response: {response}")
+        turn['response'] = response
+        return turn
+
+    def _wait_for_reply(self):
+        """
+        The next prompt must include the previous streamed reply, which is
+        only added to history once it has been spoken or cancelled.
+        """
+        if self._streaming_reply is not None:
+            self._streaming_reply.wait()
+
+    def _speak_stage(self, turn):
+        response = turn['response']
+        streamed = not isinstance(response, str)
+        # The caller already started talking over an earlier reply; skip it
+        if turn['id'] <= self._cancel_through:
+            if streamed:
+                response.cancel()
+            return None
+        self._barge_in.clear()
+        self._speaking = turn['id']
+        self._speaking_reply = response if streamed else None
+        try:
+            if not streamed:
+                turn['spoken'] = self.tts_generator.speak_text(response, cancel_event=self._barge_in)
+            else:
+                sentences = self._timed_sentences(response, turn['heard_at'])
+                turn['spoken'] = self.tts_generator.speak_sentences(sentences, cancel_event=self._barge_in)
+        finally:
+            self._speaking = None
+            self._speaking_reply = None
+            if streamed:
+                if not turn.get('spoken'):
+                    response.cancel()
+                response.finish()
+        return turn
+
+    def _bookkeeping_stage(self, turn):
+        """Runs while the reply is being spoken"""
+        response = turn['response']
+        if not isinstance(response, str):
+            # Waits for the end of a streamed reply
+            response = str(response)
+            print(f"Bot response: {response}")
+        self.log_turn(turn['text'], response, turn['intent'], turn['confidence'], user_id=turn['user_id'])
+        if SAVE_RECORDINGS:
+            self.save_recording(turn['audio'])
+        return turn
+
+    def _on_speech_start(self):
+        """Barge-in: the caller started talking, so stop the reply being spoken"""
+        if not BARGE_IN_ENABLED or self._speaking is None:
+            return
+        self._cancel_through = self._last_turn_id
+        self._barge_in.set()
+        reply = self._speaking_reply
+        if reply is not None:
+            # Stop streaming too; speech waiting on the next sentence wakes up
+            reply.cancel()
+        # Only stops playback from disk; the speak stage sees cancel_event between sentences
+        self.tts_generator.stop()
+
+    def run_pipelined(self, max_turns=None):
+        """
+        Continuous listening: the next utterance is captured while earlier
+        turns are still being transcribed, answered and spoken.
+        """
+        self.pipeline = self.build_pipeline().start()
+        print("\nVoice Bot is listening (pipelined). Press Ctrl+C to exit.")
+        turns = 0
+        try:
+            while max_turns is None or turns < max_turns:
+                if not self.recorder.record_utterance(on_speech_start=self._on_speech_start):
+                    continue
+                turn = {'id': next(self._turn_ids), 'audio': self.recorder.get_audio(),
+                        'heard_at': time.perf_counter()}
+                self._last_turn_id = turn['id']
+                self.pipeline.submit(turn)
+                turns += 1
+        except KeyboardInterrupt:
+            print("\nShutting down Voice Bot...")
+        finally:
+            self.pipeline.stop()
+            print(self.pipeline.report())
+            self.cleanup()
+
     def run(self):
         print("\nVoice Bot is ready! Press Ctrl+C to exit.")
         print("Type 'help' or say 'show help' for available commands.")
@@ -309,20 +623,39 @@ class VoiceBot:
 
     def cleanup(self):
         """Cleanup resources"""
-        self.db.close()
-        # Clean up any remaining temporary files
-        for file in os.listdir():
-            if file.startswith("temp_recording_") and file.endswith(".wav"):
-                try:
-                    os.remove(file)
-                except:
-                    pass
+        if 'tts_generator' in self._components:
+            self.tts_generator.close()
+        if 'db' in self._components:
+            self.db.close()
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Banking Voice Bot")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Load every component, print where startup time goes and exit")
+    parser.add_argument("--no-warm-up", action="store_true",
+                        help="Load components lazily on first use instead of in the background")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Listen continuously and overlap speaking with the next capture (supports barge-in)")
+    args = parser.parse_args()
+
     print("=== Banking Voice Bot ===")
+    print("Initializing Voice Bot...")
+    if args.profile_startup:
+        profiler = StartupProfiler()
+        bot = VoiceBot(profiler=profiler)
+        bot.warm_up(background=False)
+        print(profiler.report())
+        bot.cleanup()
+        return
+
     bot = VoiceBot()
-    bot.run()
+    if not args.no_warm_up:
+        bot.warm_up()
+    if args.pipeline:
+        bot.run_pipelined()
+    else:
+        bot.run()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,86 @@
+import csv
+import json
+import os
+from contextlib import contextmanager
+from itertools import islice
+
+FORMATS = ('csv', 'jsonl')
+_EXTENSIONS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.json': 'jsonl'}
+
+
+def detect_format(source, fmt=None):
+    """Pick 'csv' or 'jsonl' from an explicit format or the file extension"""
+    if fmt:
+        fmt = fmt.lower()
+    else:
+        name = source if isinstance(source, (str, os.PathLike)) else getattr(source, 'name', '')
+        fmt = _EXTENSIONS.get(os.path.splitext(str(name))[1].lower())
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown bulk file format for {source!r}; use one of {FORMATS}")
+    return fmt
+
+
+@contextmanager
+def _open(target, mode):
+    """Yield a text file for a path, or the file object itself"""
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, mode, newline='', encoding='utf-8') as f:
+            yield f
+    else:
+        yield target
+
+
+def read_rows(source, fmt=None):
+    """Stream dict rows from a CSV (with header) or JSON Lines file, one at a time"""
+    fmt = detect_format(source, fmt)
+    with _open(source, 'r') as f:
+        if fmt == 'csv':
+            for row in csv.DictReader(f):
+                yield row
+        else:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON on line {line_number}: {e}") from e
+
+
+def write_rows(target, rows, fieldnames, fmt=None):
+    """Write dict rows as they arrive; returns the number written"""
+    fmt = detect_format(target, fmt)
+    count = 0
+    with _open(target, 'w') as f:
+        if fmt == 'csv':
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                f.write(json.dumps(row) + '\n')
+                count += 1
+    return count
+
+
+def chunked(iterable, size):
+    """Yield lists of at most `size` items without reading ahead further"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_cursor(cursor, size):
+    """Yield rows from a cursor fetchmany() page at a time"""
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
+
@@ -0,0 +1,94 @@
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from config.config import DB_BUSY_TIMEOUT_MS, DB_CACHE_SIZE_KB, DB_SYNCHRONOUS
+
+
+class ConnectionPool:
+    """
+    Hands out one SQLite connection per thread, all opened in WAL mode so
+    readers never block on the writer.
+    Connections run in autocommit mode; writes go through transaction(),
+    which wraps them in an explicit BEGIN ... COMMIT.
+    """
+    def __init__(self, db_path, busy_timeout_ms=DB_BUSY_TIMEOUT_MS,
+                 cache_size_kb=DB_CACHE_SIZE_KB, synchronous=DB_SYNCHRONOUS):
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kb = cache_size_kb
+        self.synchronous = synchronous
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000.0,
+                               isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA synchronous={self.synchronous}')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        # Negative cache_size is in KiB
+        conn.execute(f'PRAGMA cache_size=-{int(self.cache_size_kb)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+
+    def connection(self):
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Connection pool is closed")
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.depth = 0
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self, immediate=True):
+        """
+        Run a block in one transaction on this thread's connection.
+        BEGIN IMMEDIATE takes the write lock up front so read-modify-write
+        sequences can't interleave with other writers. Nested calls join the
+        outer transaction.
+        """
+        conn = self.connection()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+        self._local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+        finally:
+            self._local.depth = 0
+
+    @contextmanager
+    def checkout(self):
+        """Context-manager access to this thread's connection for reads"""
+        yield self.connection()
+
+    def close(self):
+        """Close every connection the pool has opened"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._closed = True
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception as e:
+                logging.error(f"Error closing connection: {str(e)}")
+        self._local = threading.local()
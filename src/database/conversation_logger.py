@@ -0,0 +1,147 @@
+import logging
+import queue
+import threading
+import time
+from config.config import LOG_QUEUE_SIZE, LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL_S, LOG_ENQUEUE_TIMEOUT_S
+
+_STOP = object()
+
+INSERT_CONVERSATION = '''
+    INSERT INTO conversation_history
+    (user_id, user_input, bot_response, intent, confidence)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+
+class ConversationLogger:
+    """
+    Write-behind conversation log. Callers only enqueue a row; a background
+    thread groups rows into executemany batches and commits when a batch
+    fills up or the flush interval passes, so no reply waits on the disk.
+    When the queue is full a caller blocks for at most enqueue_timeout_s
+    and then the row is dropped and counted, as is any row logged after
+    close().
+    """
+    def __init__(self, pool, max_queue=LOG_QUEUE_SIZE, batch_size=LOG_BATCH_SIZE,
+                 flush_interval_s=LOG_FLUSH_INTERVAL_S, enqueue_timeout_s=LOG_ENQUEUE_TIMEOUT_S):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.enqueue_timeout_s = enqueue_timeout_s
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stats_lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self._closed = False
+        # Guards _closed and the count of puts in flight, so nothing lands behind _STOP
+        self._state = threading.Condition()
+        self._putting = 0
+        self._thread = threading.Thread(target=self._run, name="conversation-logger", daemon=True)
+        self._thread.start()
+
+    def log(self, user_id, user_input, bot_response, intent, confidence):
+        """Queue one conversation turn. Returns False if it was dropped"""
+        try:
+            if self._enqueue((user_id, user_input, bot_response, intent, confidence), self.enqueue_timeout_s):
+                return True
+            self._count('dropped', 1)
+            return False
+        except queue.Full:
+            self._count('dropped', 1)
+            logging.warning("Conversation log queue full; dropped one row")
+            return False
+
+    def flush(self, timeout=None):
+        """Block until every row queued before this call is committed"""
+        done = threading.Event()
+        if not self._enqueue(done):
+            return True
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """
+        Write out everything still queued and stop the writer thread.
+        Returns True once the writer has exited; the pool must stay open
+        until then. Calling it again waits for the writer again.
+        """
+        with self._state:
+            stopping = not self._closed
+            self._closed = True
+            self._state.wait_for(lambda: not self._putting)
+        if stopping:
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def _enqueue(self, item, timeout=None):
+        """Put an item on the queue unless closed; returns False after close()"""
+        with self._state:
+            if self._closed:
+                return False
+            self._putting += 1
+        try:
+            self._queue.put(item, timeout=timeout)
+            return True
+        finally:
+            with self._state:
+                self._putting -= 1
+                self._state.notify_all()
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'batches': self.batches,
+            }
+
+    def _count(self, name, amount):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def _write(self, rows):
+        if not rows:
+            return
+        try:
+            with self.pool.transaction() as conn:
+                conn.executemany(INSERT_CONVERSATION, rows)
+            self._count('written', len(rows))
+            self._count('batches', 1)
+        except Exception as e:
+            self._count('failed', len(rows))
+            logging.error(f"Error logging {len(rows)} conversation rows: {str(e)}")
+
+    def _run(self):
+        rows, waiters = [], []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            stop = item is _STOP
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+            elif item is not None and not stop:
+                rows.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval_s
+
+            due = deadline is not None and time.monotonic() >= deadline
+            if stop or waiters or due or len(rows) >= self.batch_size:
+                self._write(rows)
+                rows, deadline = [], None
+                for waiter in waiters:
+                    waiter.set()
+                waiters = []
+            if stop:
+                return
@@ -1,128 +1,220 @@
 import sqlite3
 import os
 import logging
-from config.config import DATABASE_PATH
+import time
+from collections import namedtuple
+from itertools import islice
+from config.config import DATABASE_PATH, BULK_CHUNK_SIZE, HISTORY_PAGE_SIZE
 from datetime import datetime
+from src.database.connection_pool import ConnectionPool
+from src.database.migrations import migrate
+from src.database.conversation_logger import ConversationLogger
+from src.database.bulk_io import read_rows, write_rows, chunked, iter_cursor
+from src.database import rollups
+from src.database.user_cache import UserCache
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, filename='app.log', filemode='w', format='%(asctime)s - %(levelname)s - %(message)s')
 
+def to_cents(amount):
+    """Convert a dollar amount to integer cents, rounding to the nearest cent"""
+    return int(round(float(amount) * 100))
+
+
+def from_cents(cents):
+    """Convert integer cents back to dollars for display"""
+    return cents / 100.0
+
+
+# First three fields match the (type, amount, timestamp) tuples get_transactions returns
+TransactionRow = namedtuple('TransactionRow', ['transaction_type', 'amount', 'timestamp', 'transaction_id'])
+
+
+def balance_delta(transaction_type, cents):
+    """Signed effect of a ledger row on the account balance"""
+    if transaction_type == 'withdrawal':
+        return -abs(cents)
+    if transaction_type == 'deposit':
+        return abs(cents)
+    # Transfers are stored signed already
+    return cents
+
+
+def is_known_transaction_type(transaction_type):
+    """Types the app writes: deposit, withdrawal, transfer_to_<user>, transfer_from_<user>"""
+    if transaction_type in ('deposit', 'withdrawal'):
+        return True
+    for prefix in ('transfer_to_', 'transfer_from_'):
+        if transaction_type.startswith(prefix) and len(transaction_type) > len(prefix):
+            return True
+    return False
+
+
+def _import_report(kind, rows, skipped, started):
+    seconds = time.perf_counter() - started
+    report = {
+        'rows': rows,
+        'skipped': skipped,
+        'seconds': round(seconds, 3),
+        'rows_per_sec': round(rows / seconds) if seconds > 0 else rows,
+    }
+    logging.info(f"Bulk {kind}: {report}")
+    return report
+
+
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, db_path=DATABASE_PATH, user_cache=None):
+        """user_cache: a UserCache to share, or None for one built from config"""
         # Ensure the directory exists
-        os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
-        self.conn = None
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        # One WAL-mode connection per thread; safe to share this manager across threads
+        self.pool = ConnectionPool(db_path)
+        self.user_cache = user_cache if user_cache is not None else UserCache()
         self.setup_database()
+        # Conversation rows are written behind the reply, in batches
+        self.conversation_logger = ConversationLogger(self.pool)
 
     def setup_database(self):
-        """Initialize the database and create tables if they don't exist"""
+        """Bring the schema up to date and seed the demo user"""
         try:
-            self.conn = sqlite3.connect(DATABASE_PATH)
-            cursor = self.conn.cursor()
-
-            # Create tables
-            cursor.executescript('''
-                CREATE TABLE IF NOT EXISTS users (
-                    user_id INTEGER PRIMARY KEY,
-                    username TEXT UNIQUE NOT NULL,
-                    account_balance REAL DEFAULT 0.0
-                );
-
-                CREATE TABLE IF NOT EXISTS transactions (
-                    transaction_id INTEGER PRIMARY KEY,
-                    user_id INTEGER,
-                    transaction_type TEXT NOT NULL,
-                    amount REAL NOT NULL,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(user_id)
-                );
-
-                CREATE TABLE IF NOT EXISTS conversation_history (
-                    id INTEGER PRIMARY KEY,
-                    user_id INTEGER,
-                    user_input TEXT,
-                    bot_response TEXT,
-                    intent TEXT,
-                    confidence REAL,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(user_id)
-                );
-            ''')
-
-            # Insert demo user if not exists
-            cursor.execute('''
-                INSERT OR IGNORE INTO users (user_id, username, account_balance)
-                VALUES (1, 'demo_user', 1000.00)
-            ''')
-
-            self.conn.commit()
-            logging.info("Database setup completed successfully.")
+            version = migrate(self.pool)
+
+            with self.pool.transaction() as conn:
+                # Insert demo user if not exists
+                conn.execute('''
+                    INSERT OR IGNORE INTO users (user_id, username, balance_cents)
+                    VALUES (1, 'demo_user', 100000)
+                ''')
+
+            logging.info(f"Database setup completed successfully (schema version {version}).")
 
         except Exception as e:
             logging.error(f"Database setup error: {str(e)}")
 
     def _get_user_details(self, username):
-        """Helper function to get user details by username"""
+        """Helper function to get (user_id, balance) by username, read through the user cache"""
+        user_id = self.user_cache.get_user_id(username)
+        if user_id is not None:
+            row = self.user_cache.get_row(user_id)
+            if row is not None:
+                return user_id, from_cents(row[1])
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('SELECT user_id, account_balance FROM users WHERE username = ?', (username,))
-            return cursor.fetchone()
+            token = self.user_cache.token()
+            cursor = self.pool.connection().execute(
+                'SELECT user_id, balance_cents FROM users WHERE username = ?', (username,))
+            result = cursor.fetchone()
+            if not result:
+                return None
+            self.user_cache.put(result[0], username, result[1], token)
+            return result[0], from_cents(result[1])
         except Exception as e:
             logging.error(f"Error fetching user details: {str(e)}")
             return None
 
 
     def get_user_id(self,username):
+        user_id = self.user_cache.get_user_id(username)
+        if user_id is not None:
+            return user_id
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT user_id FROM users WHERE username = ?", (username,))
+            cursor = self.pool.connection().execute("SELECT user_id FROM users WHERE username = ?", (username,))
             result = cursor.fetchone()
-            # self.conn.close()
+            if result:
+                self.user_cache.put(result[0], username)
             return result[0] if result else None
         except sqlite3.Error as e:
             print(f"SQLite error: {e}")
             return None
-    
+
+    def username_exists(self, username):
+        """Cheap existence check for names coming out of speech recognition"""
+        return self.get_user_id(username) is not None
+
+    def get_all_usernames(self):
+        """Return every username, for building the speech-side name index"""
+        try:
+            cursor = self.pool.connection().execute('SELECT username FROM users')
+            return [row[0] for row in cursor.fetchall()]
+        except Exception as e:
+            logging.error(f"Error listing usernames: {str(e)}")
+            return []
+
     def get_balance(self, user_id):
         """Get account balance for a user"""
+        row = self.user_cache.get_row(user_id)
+        if row is not None:
+            return from_cents(row[1])
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('SELECT account_balance FROM users WHERE user_id = ?', (user_id,))
+            token = self.user_cache.token()
+            cursor = self.pool.connection().execute(
+                'SELECT username, balance_cents FROM users WHERE user_id = ?', (user_id,))
             result = cursor.fetchone()
-            return result[0] if result else None
+            if not result:
+                return None
+            self.user_cache.put(user_id, result[0], result[1], token)
+            return from_cents(result[1])
         except Exception as e:
             logging.error(f"Error getting balance: {str(e)}")
             return None
 
+    def iter_transactions(self, user_id, before=None, page_size=HISTORY_PAGE_SIZE, transaction_type=None):
+        """
+        Lazily walk a user's history, newest first, one keyset page at a time.
+        Ordering is stable on (timestamp, transaction_id). `before` resumes
+        after a previous row: pass its (timestamp, transaction_id), or just a
+        timestamp. Yields TransactionRow tuples with the amount in dollars.
+        """
+        conditions, params = ['user_id = ?'], [user_id]
+        if transaction_type:
+            conditions.append('transaction_type = ?')
+            params.append(transaction_type)
+        if isinstance(before, TransactionRow):
+            before = (before.timestamp, before.transaction_id)
+
+        while True:
+            where = list(conditions)
+            page_params = list(params)
+            if isinstance(before, tuple):
+                where.append('(timestamp, transaction_id) < (?, ?)')
+                page_params.extend(before)
+            elif before is not None:
+                where.append('timestamp < ?')
+                page_params.append(before)
+            page_params.append(page_size)
+
+            cursor = self.pool.connection().execute(f'''
+                SELECT transaction_type, amount_cents, timestamp, transaction_id
+                FROM transactions
+                WHERE {' AND '.join(where)}
+                ORDER BY timestamp DESC, transaction_id DESC
+                LIMIT ?
+            ''', page_params)
+            rows = cursor.fetchmany(page_size)
+            for kind, cents, timestamp, transaction_id in rows:
+                yield TransactionRow(kind, from_cents(cents), timestamp, transaction_id)
+            if len(rows) < page_size:
+                return
+            before = (rows[-1][2], rows[-1][3])
+
     def get_transactions(self, user_id, limit=5):
         """Get recent transactions for a user"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                SELECT transaction_type, amount, timestamp 
-                FROM transactions 
-                WHERE user_id = ? 
-                ORDER BY timestamp DESC 
-                LIMIT ?
-            ''', (user_id, limit))
-            return cursor.fetchall()
+            rows = self.iter_transactions(user_id, page_size=limit)
+            return [tuple(row[:3]) for row in islice(rows, limit)]
         except Exception as e:
             logging.error(f"Error getting transactions: {str(e)}")
             return []
 
     def log_conversation(self, user_id, user_input, bot_response, intent, confidence):
-        """Log conversation history"""
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                INSERT INTO conversation_history 
-                (user_id, user_input, bot_response, intent, confidence)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (user_id, user_input, bot_response, intent, confidence))
-            self.conn.commit()
-            logging.info("Conversation logged successfully.")
-        except Exception as e:
-            logging.error(f"Error logging conversation: {str(e)}")
+        """Queue a conversation turn for the background writer"""
+        self.conversation_logger.log(user_id, user_input, bot_response, intent, confidence)
+
+    def flush_conversations(self, timeout=None):
+        """Wait until all queued conversation turns are on disk"""
+        return self.conversation_logger.flush(timeout)
 
     def add_transaction(self, user_id, transaction_type, amount):
         """
@@ -130,70 +222,65 @@ class DatabaseManager:
         Args:
             user_id: User's ID
             transaction_type: 'deposit' or 'withdrawal'
-            amount: Transaction amount
+            amount: Transaction amount in dollars
         Returns:
             bool: True if successful, False otherwise
         """
         try:
             # Ensure valid transaction type
-            if transaction_type.lower() not in ['deposit', 'withdrawal']:
+            transaction_type = transaction_type.lower()
+            if transaction_type not in ['deposit', 'withdrawal']:
                 logging.error(f"Invalid transaction type: {transaction_type}")
                 return False
 
-            cursor = self.conn.cursor()
-
-            # First check if user exists and get current balance
-            cursor.execute('SELECT account_balance FROM users WHERE user_id = ?', (user_id,))
-            result = cursor.fetchone()
-            if not result:
-                logging.error(f"User {user_id} not found")
+            cents = to_cents(amount)
+            if cents <= 0:
+                logging.error(f"Invalid transaction amount: {amount}")
                 return False
 
-            current_balance = result[0]
+            with self.pool.transaction() as conn:
+                # The balance check and the update are one statement, so
+                # concurrent withdrawals can't both spend the same money
+                if transaction_type == 'deposit':
+                    cursor = conn.execute(
+                        'UPDATE users SET balance_cents = balance_cents + ? WHERE user_id = ?',
+                        (cents, user_id))
+                else:
+                    cursor = conn.execute(
+                        'UPDATE users SET balance_cents = balance_cents - ? WHERE user_id = ? AND balance_cents >= ?',
+                        (cents, user_id, cents))
+
+                if cursor.rowcount == 0:
+                    if conn.execute('SELECT 1 FROM users WHERE user_id = ?', (user_id,)).fetchone():
+                        logging.error("Insufficient balance for withdrawal")
+                    else:
+                        logging.error(f"User {user_id} not found")
+                    return False
+
+                # Add transaction record
+                cursor = conn.execute('''
+                    INSERT INTO transactions (user_id, transaction_type, amount_cents)
+                    VALUES (?, ?, ?)
+                ''', (user_id, transaction_type, cents))
+                rollups.roll_up(conn, 'transaction_id = ?', (cursor.lastrowid,))
+            self.user_cache.invalidate(user_id)
 
-            # For withdrawals, check if sufficient balance exists
-            if transaction_type.lower() == 'withdrawal' and current_balance < amount:
-                logging.error("Insufficient balance for withdrawal")
-                return False
-
-            new_balance = current_balance + amount if transaction_type.lower() == 'deposit' else current_balance - amount
-
-            # Begin transaction
-            cursor.execute('BEGIN TRANSACTION')
-
-            # Add transaction record
-            cursor.execute('''
-                INSERT INTO transactions (user_id, transaction_type, amount)
-                VALUES (?, ?, ?)
-            ''', (user_id, transaction_type.lower(), amount))
-
-            # Update user balance
-            cursor.execute('''
-                UPDATE users 
-                SET account_balance = ?
-                WHERE user_id = ?
-            ''', (new_balance, user_id))
-
-            # Commit transaction
-            self.conn.commit()
             logging.info(f"Transaction successful for user {user_id}: {transaction_type} of {amount}")
             return True
 
         except Exception as e:
-            if self.conn:
-                self.conn.rollback()
             logging.error(f"Error adding transaction: {str(e)}")
             return False
 
     def create_user(self, username, initial_balance=0.0):
         """Create a new user account"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                INSERT INTO users (username, account_balance)
-                VALUES (?, ?)
-            ''', (username, initial_balance))
-            self.conn.commit()
+            with self.pool.transaction() as conn:
+                cursor = conn.execute('''
+                    INSERT INTO users (username, balance_cents)
+                    VALUES (?, ?)
+                ''', (username, to_cents(initial_balance)))
+            self.user_cache.put(cursor.lastrowid, username, to_cents(initial_balance))
             logging.info(f"User created successfully: {username}")
             return cursor.lastrowid  # Returns the new user_id
         except sqlite3.IntegrityError:
@@ -213,58 +300,269 @@ class DatabaseManager:
     def transfer_money(self, from_username, to_username, amount):
         """Transfer money between users"""
         try:
-            from_user = self._get_user_details(from_username)
-            to_user = self._get_user_details(to_username)
-            logging.info(f"from user : {from_user}")
-            logging.info(f"to user : {to_user}")
-            logging.info(f"username : {from_username}")
-            if not from_user or not to_user:
-                return "One or both users not found"
-
-            if from_user[1] < amount:
-                return "Insufficient balance for transfer"
-
-            # Begin transaction
-            cursor = self.conn.cursor()
-            cursor.execute('BEGIN TRANSACTION')
-
-            # Deduct from sender
-            cursor.execute('''
-                UPDATE users 
-                SET account_balance = account_balance - ?
-                WHERE username = ?
-            ''', (amount, from_username))
-
-            # Add to receiver
-            cursor.execute('''
-                UPDATE users 
-                SET account_balance = account_balance + ?
-                WHERE username = ?
-            ''', (amount, to_username))
-
-            # Log transfer transaction for both users
-            cursor.execute('''
-                INSERT INTO transactions (user_id, transaction_type, amount)
-                VALUES (?, ?, ?)
-            ''', (from_user[0], f'transfer_to_{to_username}', -amount))
-
-            cursor.execute('''
-                INSERT INTO transactions (user_id, transaction_type, amount)
-                VALUES (?, ?, ?)
-            ''', (to_user[0], f'transfer_from_{from_username}', amount))
-
-            self.conn.commit()
+            cents = to_cents(amount)
+            if cents <= 0:
+                return "Invalid transfer amount"
+
+            with self.pool.transaction() as conn:
+                user_ids = {name: self.user_cache.get_user_id(name) for name in (from_username, to_username)}
+                if None in user_ids.values():
+                    rows = conn.execute('SELECT username, user_id FROM users WHERE username IN (?, ?)',
+                                        (from_username, to_username)).fetchall()
+                    user_ids = dict(rows)
+                    for name, user_id in rows:
+                        self.user_cache.put(user_id, name)
+                logging.info(f"transfer users : {user_ids}")
+                if from_username not in user_ids or to_username not in user_ids:
+                    return "One or both users not found"
+
+                # Deduct from sender only if the funds are there
+                cursor = conn.execute('''
+                    UPDATE users
+                    SET balance_cents = balance_cents - ?
+                    WHERE user_id = ? AND balance_cents >= ?
+                ''', (cents, user_ids[from_username], cents))
+                if cursor.rowcount == 0:
+                    return "Insufficient balance for transfer"
+
+                # Add to receiver
+                conn.execute('''
+                    UPDATE users
+                    SET balance_cents = balance_cents + ?
+                    WHERE user_id = ?
+                ''', (cents, user_ids[to_username]))
+
+                # Log transfer transaction for both users
+                transaction_ids = []
+                for user_id, transaction_type, signed_cents in (
+                        (user_ids[from_username], f'transfer_to_{to_username}', -cents),
+                        (user_ids[to_username], f'transfer_from_{from_username}', cents)):
+                    cursor = conn.execute('''
+                        INSERT INTO transactions (user_id, transaction_type, amount_cents)
+                        VALUES (?, ?, ?)
+                    ''', (user_id, transaction_type, signed_cents))
+                    transaction_ids.append(cursor.lastrowid)
+                rollups.roll_up(conn, 'transaction_id IN (?, ?)', transaction_ids)
+            self.user_cache.invalidate(user_ids[from_username], user_ids[to_username])
+
             logging.info(f"Transfer successful: {from_username} to {to_username} for {amount}")
             return "Transfer successful"
 
         except Exception as e:
-            if self.conn:
-                self.conn.rollback()
             logging.error(f"Error in transfer: {str(e)}")
             return "Transfer failed"
 
+    def rebuild_rollups(self):
+        """Recompute the daily/monthly rollup tables from the raw ledger"""
+        with self.pool.transaction() as conn:
+            rollups.rebuild(conn)
+        logging.info("Rollups rebuilt from the ledger.")
+
+    def verify_rollups(self):
+        """Return rollup rows that disagree with the ledger (empty when in sync)"""
+        # One read transaction so both sides see the same snapshot
+        with self.pool.transaction(immediate=False) as conn:
+            return rollups.verify(conn)
+
+    def summarize_period(self, user_id, start, end):
+        """
+        Totals per category for the inclusive date range, in dollars:
+        {category: {'count', 'in', 'out'}}. Whole months come from the
+        monthly rollup and only the partial months at either end from the
+        daily one, so cost grows with the number of periods, not rows.
+        """
+        day_ranges, month_range = rollups.split_period(start, end)
+        queries = [('''SELECT category, txn_count, cents_in, cents_out FROM daily_rollups
+                       WHERE user_id = ? AND day BETWEEN ? AND ?''', (user_id, first.isoformat(), last.isoformat()))
+                   for first, last in day_ranges]
+        if month_range:
+            queries.append(('''SELECT category, txn_count, cents_in, cents_out FROM monthly_rollups
+                              WHERE user_id = ? AND month BETWEEN ? AND ?''', (user_id,) + month_range))
+
+        totals = {category: [0, 0, 0] for category in rollups.CATEGORIES}
+        try:
+            conn = self.pool.connection()
+            for query, params in queries:
+                for category, count, cents_in, cents_out in conn.execute(query, params):
+                    total = totals.setdefault(category, [0, 0, 0])
+                    total[0] += count
+                    total[1] += cents_in
+                    total[2] += cents_out
+        except Exception as e:
+            logging.error(f"Error summarizing period: {str(e)}")
+        return {category: {'count': count, 'in': from_cents(cents_in), 'out': from_cents(cents_out)}
+                for category, (count, cents_in, cents_out) in totals.items()}
+
+    def get_spending(self, user_id, start, end):
+        """Money that left the account (withdrawals and transfers out) in the range: (dollars, count)"""
+        summary = self.summarize_period(user_id, start, end)
+        spent = sum(summary[category]['out'] for category in rollups.SPENDING_CATEGORIES)
+        count = sum(summary[category]['count'] for category in rollups.SPENDING_CATEGORIES)
+        return round(spent, 2), count
+
+    def get_monthly_statement(self, user_id, months=6):
+        """Newest-first [(month, money in, money out)] for the last `months` active months"""
+        try:
+            rows = self.pool.connection().execute('''
+                SELECT month, SUM(cents_in), SUM(cents_out) FROM monthly_rollups
+                WHERE user_id = ? GROUP BY month ORDER BY month DESC LIMIT ?
+            ''', (user_id, months)).fetchall()
+            return [(month, from_cents(cents_in), from_cents(cents_out)) for month, cents_in, cents_out in rows]
+        except Exception as e:
+            logging.error(f"Error building monthly statement: {str(e)}")
+            return []
+
+    def bulk_import_users(self, source, fmt=None, chunk_size=BULK_CHUNK_SIZE):
+        """
+        Stream users from a CSV or JSONL file (columns: username, balance in
+        dollars) in chunked transactions. Existing usernames, negative
+        balances and malformed rows are skipped.
+        Returns a report with rows, skipped, seconds and rows_per_sec.
+        """
+        started = time.perf_counter()
+        inserted = skipped = 0
+        for chunk in chunked(read_rows(source, fmt), chunk_size):
+            params = []
+            for row in chunk:
+                try:
+                    username = str(row['username']).strip()
+                    if not username:
+                        raise ValueError("empty username")
+                    balance_cents = to_cents(row.get('balance') or 0)
+                    if balance_cents < 0:
+                        raise ValueError("negative balance")
+                    params.append((username, balance_cents))
+                except (KeyError, TypeError, ValueError, ArithmeticError) as e:
+                    logging.warning(f"Skipping user row {row}: {e}")
+                    skipped += 1
+            with self.pool.transaction() as conn:
+                before = conn.total_changes
+                conn.executemany('''
+                    INSERT INTO users (username, balance_cents) VALUES (?, ?)
+                    ON CONFLICT(username) DO NOTHING
+                ''', params)
+                added = conn.total_changes - before
+            inserted += added
+            skipped += len(params) - added
+        return _import_report('user import', inserted, skipped, started)
+
+    def bulk_import_transactions(self, source, fmt=None, chunk_size=BULK_CHUNK_SIZE, apply_to_balances=True):
+        """
+        Stream ledger rows from a CSV or JSONL file (columns: username or
+        user_id, transaction_type, amount in dollars, optional timestamp).
+        Each chunk's inserts and its per-user balance deltas commit together.
+        Pass apply_to_balances=False when the users were imported with their
+        closing balances already. Skipped rows: unknown users, unknown
+        transaction types, malformed or non-finite amounts, and rows that would take a
+        balance below zero (when applying them to balances).
+        """
+        started = time.perf_counter()
+        inserted = skipped = 0
+        user_ids = {}
+        for chunk in chunked(read_rows(source, fmt), chunk_size):
+            with self.pool.transaction() as conn:
+                rows = []
+                for row in chunk:
+                    if isinstance(row, dict):
+                        rows.append(row)
+                    else:
+                        logging.warning(f"Skipping transaction row {row!r}: not an object")
+                        skipped += 1
+                missing = {str(row['username']) for row in rows
+                           if row.get('username') and str(row['username']) not in user_ids}
+                if missing:
+                    placeholders = ','.join('?' * len(missing))
+                    user_ids.update(conn.execute(
+                        f'SELECT username, user_id FROM users WHERE username IN ({placeholders})',
+                        tuple(missing)).fetchall())
+
+                parsed = []
+                for row in rows:
+                    try:
+                        if row.get('username'):
+                            user_id = user_ids[str(row['username'])]
+                        else:
+                            user_id = int(row['user_id'])
+                        transaction_type = str(row['transaction_type']).strip().lower()
+                        if not is_known_transaction_type(transaction_type):
+                            raise ValueError(f"unknown transaction_type {transaction_type!r}")
+                        cents = to_cents(row['amount'])
+                    except (KeyError, TypeError, ValueError, ArithmeticError) as e:
+                        logging.warning(f"Skipping transaction row {row}: {e!r}")
+                        skipped += 1
+                        continue
+                    parsed.append((row, user_id, transaction_type, cents))
+
+                # Rows keyed by user_id are checked like usernames: the user must exist
+                ids = {user_id for _, user_id, _, _ in parsed}
+                balances = {}
+                if ids:
+                    placeholders = ','.join('?' * len(ids))
+                    balances = dict(conn.execute(
+                        f'SELECT user_id, balance_cents FROM users WHERE user_id IN ({placeholders})',
+                        tuple(ids)).fetchall())
+
+                params, deltas = [], {}
+                for row, user_id, transaction_type, cents in parsed:
+                    if user_id not in balances:
+                        logging.warning(f"Skipping transaction row {row}: unknown user")
+                        skipped += 1
+                        continue
+                    delta = balance_delta(transaction_type, cents)
+                    if apply_to_balances:
+                        if balances[user_id] + delta < 0:
+                            logging.warning(f"Skipping transaction row {row}: balance would go negative")
+                            skipped += 1
+                            continue
+                        balances[user_id] += delta
+                    params.append((user_id, transaction_type, cents, row.get('timestamp') or None))
+                    deltas[user_id] = deltas.get(user_id, 0) + delta
+
+                last_id = conn.execute('SELECT COALESCE(MAX(transaction_id), 0) FROM transactions').fetchone()[0]
+                conn.executemany('''
+                    INSERT INTO transactions (user_id, transaction_type, amount_cents, timestamp)
+                    VALUES (?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+                ''', params)
+                rollups.roll_up(conn, 'transaction_id > ?', (last_id,))
+                if apply_to_balances:
+                    conn.executemany('UPDATE users SET balance_cents = balance_cents + ? WHERE user_id = ?',
+                                     [(delta, user_id) for user_id, delta in deltas.items() if delta])
+            if apply_to_balances:
+                self.user_cache.invalidate(*deltas)
+            inserted += len(params)
+        return _import_report('transaction import', inserted, skipped, started)
+
+    def export_users(self, target, fmt=None, chunk_size=BULK_CHUNK_SIZE):
+        """Stream every user to a CSV or JSONL file; returns the row count"""
+        cursor = self.pool.connection().execute('SELECT username, balance_cents FROM users ORDER BY user_id')
+        rows = ({'username': username, 'balance': f"{from_cents(cents):.2f}"}
+                for username, cents in iter_cursor(cursor, chunk_size))
+        return write_rows(target, rows, ['username', 'balance'], fmt)
+
+    def export_transactions(self, target, fmt=None, user_id=None, chunk_size=BULK_CHUNK_SIZE):
+        """Stream the ledger (optionally one user's) to a CSV or JSONL file; returns the row count"""
+        query = '''
+            SELECT t.transaction_id, u.username, t.transaction_type, t.amount_cents, t.timestamp
+            FROM transactions t JOIN users u ON u.user_id = t.user_id
+        '''
+        params = ()
+        if user_id is not None:
+            query += ' WHERE t.user_id = ?'
+            params = (user_id,)
+        cursor = self.pool.connection().execute(query + ' ORDER BY t.transaction_id', params)
+        fieldnames = ['transaction_id', 'username', 'transaction_type', 'amount', 'timestamp']
+        rows = ({'transaction_id': transaction_id, 'username': username, 'transaction_type': transaction_type,
+                 'amount': f"{from_cents(cents):.2f}", 'timestamp': timestamp}
+                for transaction_id, username, transaction_type, cents, timestamp in iter_cursor(cursor, chunk_size))
+        return write_rows(target, rows, fieldnames, fmt)
+
     def close(self):
-        """Close the database connection"""
-        if self.conn:
-            self.conn.close()
-            logging.info("Database connection closed.")
+        """Flush the conversation log and close all pooled database connections"""
+        if not self.conversation_logger.close():
+            logging.warning("Conversation log writer still busy; waiting for it before closing the pool")
+            self.conversation_logger.close(timeout=None)
+        stats = self.conversation_logger.stats()
+        if stats['dropped'] or stats['failed']:
+            logging.warning(f"Conversation log lost rows: {stats}")
+        self.pool.close()
+        logging.info("Database connection closed.")
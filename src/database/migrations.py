@@ -0,0 +1,131 @@
+import logging
+from src.database import rollups
+
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+
+
+def _create_base_schema(conn):
+    """Original tables, as the first release created them"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY,
+            username TEXT UNIQUE NOT NULL,
+            account_balance REAL DEFAULT 0.0
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS transactions (
+            transaction_id INTEGER PRIMARY KEY,
+            user_id INTEGER,
+            transaction_type TEXT NOT NULL,
+            amount REAL NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS conversation_history (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER,
+            user_input TEXT,
+            bot_response TEXT,
+            intent TEXT,
+            confidence REAL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id)
+        )
+    ''')
+
+
+def _integer_cents(conn):
+    """Rebuild REAL-dollar users/transactions tables with integer cent columns"""
+    if 'account_balance' in _columns(conn, 'users'):
+        conn.execute('''
+            CREATE TABLE users_cents (
+                user_id INTEGER PRIMARY KEY,
+                username TEXT UNIQUE NOT NULL,
+                balance_cents INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        conn.execute('''
+            INSERT INTO users_cents (user_id, username, balance_cents)
+            SELECT user_id, username, CAST(ROUND(COALESCE(account_balance, 0) * 100) AS INTEGER) FROM users
+        ''')
+        conn.execute('DROP TABLE users')
+        conn.execute('ALTER TABLE users_cents RENAME TO users')
+
+    if 'amount' in _columns(conn, 'transactions'):
+        conn.execute('''
+            CREATE TABLE transactions_cents (
+                transaction_id INTEGER PRIMARY KEY,
+                user_id INTEGER,
+                transaction_type TEXT NOT NULL,
+                amount_cents INTEGER NOT NULL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(user_id)
+            )
+        ''')
+        conn.execute('''
+            INSERT INTO transactions_cents (transaction_id, user_id, transaction_type, amount_cents, timestamp)
+            SELECT transaction_id, user_id, transaction_type, CAST(ROUND(amount * 100) AS INTEGER), timestamp
+            FROM transactions
+        ''')
+        conn.execute('DROP TABLE transactions')
+        conn.execute('ALTER TABLE transactions_cents RENAME TO transactions')
+
+
+def _lookup_indexes(conn):
+    """Per-user, newest-first indexes for history and conversation lookups"""
+    # Covers get_transactions entirely: no table lookups and no sort step
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_transactions_user_time
+        ON transactions (user_id, timestamp DESC, transaction_id DESC, transaction_type, amount_cents)
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_conversation_user_time
+        ON conversation_history (user_id, timestamp DESC)
+    ''')
+
+
+def _rollup_tables(conn):
+    """Per-user daily/monthly totals by category, backfilled from the ledger"""
+    rollups.create_tables(conn)
+    rollups.rebuild(conn)
+
+
+# (version, description, function). Append only; never edit a released step.
+MIGRATIONS = [
+    (1, "base schema", _create_base_schema),
+    (2, "integer cent balances", _integer_cents),
+    (3, "lookup indexes", _lookup_indexes),
+    (4, "daily and monthly rollups", _rollup_tables),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    """Version recorded in the database header (0 for a new file)"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(pool):
+    """
+    Bring the database up to SCHEMA_VERSION.
+    Every pending step runs in one transaction, so a failure leaves the
+    schema exactly as it was. Steps are written to be idempotent so
+    databases created before versioning existed are upgraded safely.
+    Returns the resulting schema version.
+    """
+    with pool.transaction() as conn:
+        version = schema_version(conn)
+        for target, description, step in MIGRATIONS:
+            if target <= version:
+                continue
+            step(conn)
+            logging.info(f"Applied schema migration {target}: {description}")
+            version = target
+        conn.execute(f'PRAGMA user_version = {int(version)}')
+    return version
@@ -0,0 +1,133 @@
+import argparse
+from datetime import timedelta
+
+# Ledger rows fold into four categories; transfer types carry the other username
+CATEGORIES = ('deposit', 'withdrawal', 'transfer_in', 'transfer_out')
+SPENDING_CATEGORIES = ('withdrawal', 'transfer_out')
+
+CATEGORY_SQL = '''
+    CASE
+        WHEN transaction_type LIKE 'transfer\\_to\\_%' ESCAPE '\\' THEN 'transfer_out'
+        WHEN transaction_type LIKE 'transfer\\_from\\_%' ESCAPE '\\' THEN 'transfer_in'
+        ELSE transaction_type
+    END
+'''
+# Same sign rules as db_manager.balance_delta
+DELTA_SQL = '''
+    CASE transaction_type
+        WHEN 'withdrawal' THEN -ABS(amount_cents)
+        WHEN 'deposit' THEN ABS(amount_cents)
+        ELSE amount_cents
+    END
+'''
+PERIODS = {
+    'daily_rollups': ('day', "date(timestamp)"),
+    'monthly_rollups': ('month', "strftime('%Y-%m', timestamp)"),
+}
+
+
+def create_tables(conn):
+    for table, (period, _) in PERIODS.items():
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                user_id INTEGER NOT NULL,
+                {period} TEXT NOT NULL,
+                category TEXT NOT NULL,
+                txn_count INTEGER NOT NULL,
+                cents_in INTEGER NOT NULL,
+                cents_out INTEGER NOT NULL,
+                PRIMARY KEY (user_id, {period}, category)
+            ) WITHOUT ROWID
+        ''')
+
+
+def _aggregate_sql(period_expr, where):
+    return f'''
+        SELECT user_id, {period_expr}, {CATEGORY_SQL}, COUNT(*),
+               SUM(MAX({DELTA_SQL}, 0)), SUM(MAX(-({DELTA_SQL}), 0))
+        FROM transactions
+        WHERE {where}
+        GROUP BY 1, 2, 3
+    '''
+
+
+def roll_up(conn, where, params=()):
+    """
+    Add the ledger rows matching `where` to the daily and monthly rollups.
+    Call inside the transaction that inserted those rows.
+    """
+    for table, (period, period_expr) in PERIODS.items():
+        conn.execute(f'''
+            INSERT INTO {table} (user_id, {period}, category, txn_count, cents_in, cents_out)
+            {_aggregate_sql(period_expr, where)}
+            ON CONFLICT (user_id, {period}, category) DO UPDATE SET
+                txn_count = txn_count + excluded.txn_count,
+                cents_in = cents_in + excluded.cents_in,
+                cents_out = cents_out + excluded.cents_out
+        ''', params)
+
+
+def rebuild(conn):
+    """Recompute both rollup tables from the raw ledger"""
+    for table in PERIODS:
+        conn.execute(f'DELETE FROM {table}')
+    roll_up(conn, '1')
+
+
+def verify(conn):
+    """Return (table, "missing"|"stale", row) for rollup rows that disagree with the ledger; empty means in sync"""
+    mismatches = []
+    for table, (period, period_expr) in PERIODS.items():
+        expected = f"SELECT * FROM ({_aggregate_sql(period_expr, '1')})"
+        stored = f'SELECT user_id, {period}, category, txn_count, cents_in, cents_out FROM {table}'
+        for label, query in (('missing', f'{expected} EXCEPT {stored}'), ('stale', f'{stored} EXCEPT {expected}')):
+            mismatches.extend((table, label, row) for row in conn.execute(query))
+    return mismatches
+
+
+def split_period(start, end):
+    """
+    Split the inclusive date range into (day ranges, month range) so whole
+    months are read from monthly_rollups and only the ragged edges from
+    daily_rollups. Month range is (first 'YYYY-MM', last 'YYYY-MM') or None.
+    """
+    first_full = start if start.day == 1 else (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    after_end = end + timedelta(days=1)
+    last_full_end = after_end.replace(day=1)   # first day of the month containing after_end
+    if first_full >= last_full_end:
+        return [(start, end)], None
+    days = []
+    if start < first_full:
+        days.append((start, first_full - timedelta(days=1)))
+    if last_full_end <= end:
+        days.append((last_full_end, end))
+    last_month = last_full_end - timedelta(days=1)
+    return days, (first_full.strftime('%Y-%m'), last_month.strftime('%Y-%m'))
+
+
+def main():
+    """Rebuild or verify the rollup tables of a ledger database"""
+    from config.config import DATABASE_PATH
+    from src.database.db_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("action", choices=("rebuild", "verify"))
+    parser.add_argument("--db", default=DATABASE_PATH, help="Database file")
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db)
+    try:
+        if args.action == "rebuild":
+            db.rebuild_rollups()
+            print("Rollups rebuilt from the ledger.")
+        mismatches = db.verify_rollups()
+        for table, label, row in mismatches[:20]:
+            print(f"{table}: {label} {row}")
+        print("Rollups are in sync." if not mismatches else f"{len(mismatches)} rollup rows disagree with the ledger.")
+        return 1 if mismatches else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
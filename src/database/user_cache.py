@@ -0,0 +1,97 @@
+import threading
+from collections import OrderedDict
+from config.config import USER_CACHE_ENABLED, USER_CACHE_SIZE
+
+
+class UserCache:
+    """
+    Bounded, thread-safe LRU cache of user rows for one process.
+    Usernames never change, so username -> user_id entries stay valid until
+    evicted; balance rows are dropped whenever a write touches the user.
+    A read that raced with a write is not cached: callers take a token
+    before querying and put() ignores rows whose token is stale.
+    Disable it when several processes write to the same database.
+    """
+    def __init__(self, max_size=USER_CACHE_SIZE, enabled=USER_CACHE_ENABLED):
+        self.max_size = max_size
+        self.enabled = enabled and max_size > 0
+        self._ids = OrderedDict()       # username -> user_id
+        self._rows = OrderedDict()      # user_id -> (username, balance_cents)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _lookup(self, entries, key):
+        if not self.enabled:
+            return None
+        with self._lock:
+            value = entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _store(self, entries, key, value):
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.max_size:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_user_id(self, username):
+        return self._lookup(self._ids, username)
+
+    def get_row(self, user_id):
+        """Return (username, balance_cents) or None"""
+        return self._lookup(self._rows, user_id)
+
+    def token(self):
+        """Take before reading from the database; pass to put()"""
+        return self._generation
+
+    def put(self, user_id, username, balance_cents=None, token=None):
+        """Cache a user read from the database; ignored if a write happened since `token`"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._store(self._ids, username, user_id)
+            if balance_cents is None or (token is not None and token != self._generation):
+                return
+            self._store(self._rows, user_id, (username, balance_cents))
+
+    def invalidate(self, *user_ids):
+        """Forget cached balances after a write to these users"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._generation += 1
+            for user_id in user_ids:
+                if self._rows.pop(user_id, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._ids.clear()
+            self._rows.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._rows),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
@@ -0,0 +1,312 @@
+import bisect
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config.config import (OPENAI_API_KEY, LLM_MODEL, LLM_BASE_URL, LLM_TIMEOUT_S, LLM_CONNECT_TIMEOUT_S,
+                           LLM_DEADLINE_S, LLM_MAX_RETRIES, LLM_RETRY_BACKOFF_S, LLM_RETRY_MAX_BACKOFF_S,
+                           LLM_MAX_CONCURRENCY, LLM_HEDGE_AFTER_S)
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+HISTOGRAM_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, float('inf')]
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """The call's deadline passed before any attempt succeeded"""
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; percentiles are bucket upper bounds"""
+    def __init__(self, buckets_ms=HISTOGRAM_BUCKETS_MS):
+        self.buckets_ms = list(buckets_ms)
+        self.counts = [0] * len(self.buckets_ms)
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets_ms, seconds * 1000)] += 1
+        self.count += 1
+        self.total_s += seconds
+        self.max_s = max(self.max_s, seconds)
+
+    def percentile_ms(self, fraction):
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets_ms, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_s * 1000)
+        return self.max_s * 1000
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_s / self.count * 1000, 2) if self.count else 0.0,
+            'p50_ms': round(self.percentile_ms(0.5), 2),
+            'p95_ms': round(self.percentile_ms(0.95), 2),
+            'p99_ms': round(self.percentile_ms(0.99), 2),
+            'max_ms': round(self.max_s * 1000, 2),
+            'buckets': {str(bound): count for bound, count in zip(self.buckets_ms, self.counts) if count},
+        }
+
+
+def is_timeout(error):
+    import openai
+    return isinstance(error, (openai.APITimeoutError, TimeoutError))
+
+
+def is_retryable(error):
+    import openai
+    if isinstance(error, (openai.APIConnectionError, openai.InternalServerError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+
+class LLMClient:
+    """
+    The one way this process talks to the OpenAI API. Wraps a single SDK
+    client, so every caller shares its keep-alive connection pool, and adds:
+      - a per-attempt timeout and an overall deadline per call;
+      - retries with full-jitter exponential backoff on timeouts,
+        connection errors, 429 and 5xx (the SDK's own retries are off);
+      - optional hedging: if an attempt is slower than hedge_after_s, a
+        second copy is sent and the first answer wins;
+      - a semaphore capping calls in flight, so a burst queues here
+        instead of piling onto the network;
+      - latency histograms per operation.
+    """
+    def __init__(self, api_key=None, base_url=LLM_BASE_URL, model=LLM_MODEL, timeout_s=LLM_TIMEOUT_S,
+                 connect_timeout_s=LLM_CONNECT_TIMEOUT_S, deadline_s=LLM_DEADLINE_S, max_retries=LLM_MAX_RETRIES,
+                 backoff_s=LLM_RETRY_BACKOFF_S, max_backoff_s=LLM_RETRY_MAX_BACKOFF_S,
+                 max_concurrency=LLM_MAX_CONCURRENCY, hedge_after_s=LLM_HEDGE_AFTER_S, client=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.timeout_s = timeout_s
+        self.connect_timeout_s = connect_timeout_s
+        self.deadline_s = deadline_s
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.max_concurrency = max_concurrency
+        self.hedge_after_s = hedge_after_s
+        self._client = client
+        self._client_lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._executor = None
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.in_flight = 0
+        self.waiting = 0
+        self.peak_in_flight = 0
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @property
+    def openai(self):
+        """The underlying SDK client, built on first use"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import openai
+                    self._client = openai.OpenAI(
+                        api_key=self.api_key or OPENAI_API_KEY, base_url=self.base_url,
+                        timeout=openai.Timeout(self.timeout_s, connect=self.connect_timeout_s), max_retries=0)
+        return self._client
+
+    def chat(self, messages, model=None, deadline_s=None, hedge=True, **params):
+        """chat.completions.create with this client's limits; returns the completion"""
+        def attempt(timeout):
+            return self.openai.chat.completions.create(model=model or self.model, messages=messages,
+                                                       timeout=timeout, **params)
+        return self._call('chat', attempt, deadline_s, hedge)
+
+    def complete_text(self, messages, **kwargs):
+        """The reply text of a chat completion, stripped"""
+        return self.chat(messages, **kwargs).choices[0].message.content.strip()
+
+    def stream_chat(self, messages, model=None, deadline_s=None, **params):
+        """
+        Yields chat.completion.chunk objects. Retries only until the first
+        chunk arrives; the concurrency slot is held until the stream ends.
+        """
+        deadline = time.monotonic() + (deadline_s or self.deadline_s)
+        self._acquire(deadline)
+        start = time.perf_counter()
+        try:
+            def attempt(timeout):
+                stream = self.openai.chat.completions.create(model=model or self.model, messages=messages,
+                                                             stream=True, timeout=timeout, **params)
+                iterator = iter(stream)
+                try:
+                    first = next(iterator)
+                except StopIteration:
+                    first = None
+                return stream, iterator, first
+
+            stream, iterator, first = self._retry('stream_first_token', attempt, deadline, hedge=False)
+            try:
+                if first is not None:
+                    yield first
+                    yield from iterator
+            finally:
+                stream.close()
+            self._record('stream', time.perf_counter() - start)
+        finally:
+            self._release()
+
+    def transcribe(self, audio_file, deadline_s=None, **params):
+        """audio.transcriptions.create; the file is rewound before each attempt"""
+        def attempt(timeout):
+            audio_file.seek(0)
+            return self.openai.audio.transcriptions.create(file=audio_file, timeout=timeout, **params)
+        return self._call('transcribe', attempt, deadline_s, hedge=False)
+
+    def _call(self, operation, attempt, deadline_s, hedge):
+        deadline = time.monotonic() + (deadline_s or self.deadline_s)
+        self._acquire(deadline)
+        try:
+            return self._retry(operation, attempt, deadline, hedge)
+        finally:
+            self._release()
+
+    def _acquire(self, deadline):
+        with self._lock:
+            self.waiting += 1
+        try:
+            acquired = self._semaphore.acquire(timeout=max(deadline - time.monotonic(), 0))
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        if not acquired:
+            with self._lock:
+                self.timeouts += 1
+            raise LLMDeadlineExceeded("timed out waiting for an LLM slot")
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._semaphore.release()
+
+    def _retry(self, operation, attempt, deadline, hedge):
+        start = time.perf_counter()
+        error = None
+        for attempt_number in range(self.max_retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            timeout = min(self.timeout_s, remaining)
+            try:
+                if hedge and self.hedge_after_s and self.hedge_after_s < timeout:
+                    result = self._hedged(attempt, timeout)
+                else:
+                    result = attempt(timeout)
+                self._record(operation, time.perf_counter() - start)
+                return result
+            except Exception as e:
+                error = e
+                if is_timeout(e):
+                    with self._lock:
+                        self.timeouts += 1
+                if not is_retryable(e):
+                    break
+            if attempt_number == self.max_retries:
+                break
+            backoff = random.uniform(0, min(self.max_backoff_s, self.backoff_s * 2 ** attempt_number))
+            if time.monotonic() + backoff >= deadline:
+                break
+            with self._lock:
+                self.retries += 1
+            logging.info(f"Retrying LLM {operation} in {backoff:.2f}s after: {str(error)}")
+            time.sleep(backoff)
+        with self._lock:
+            self.errors += 1
+        if error is None:
+            raise LLMDeadlineExceeded(f"LLM {operation} deadline exceeded")
+        raise error
+
+    def _hedged(self, attempt, timeout):
+        """Run one attempt; past hedge_after_s, race it against a second copy"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency * 2,
+                                                    thread_name_prefix="llm-hedge")
+        primary = self._executor.submit(attempt, timeout)
+        done, _ = wait([primary], timeout=self.hedge_after_s)
+        # Only hedge with a spare slot, so hedging never exceeds the concurrency cap
+        if done or not self._semaphore.acquire(blocking=False):
+            return primary.result()
+        with self._lock:
+            self.hedges += 1
+        hedge = self._executor.submit(attempt, max(timeout - self.hedge_after_s, 0.001))
+        hedge.add_done_callback(lambda _: self._semaphore.release())
+        pending = [primary, hedge]
+        error = None
+        while pending:
+            done, still_pending = wait(pending, return_when=FIRST_COMPLETED)
+            pending = list(still_pending)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _record(self, operation, seconds):
+        with self._lock:
+            histogram = self.histograms.get(operation)
+            if histogram is None:
+                histogram = self.histograms[operation] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'in_flight': self.in_flight,
+                'waiting': self.waiting,
+                'peak_in_flight': self.peak_in_flight,
+                'errors': self.errors,
+                'retries': self.retries,
+                'timeouts': self.timeouts,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'latency': {operation: histogram.summary() for operation, histogram in self.histograms.items()},
+            }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._client is not None:
+            self._client.close()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_client():
+    """The process-wide LLMClient, created on first use"""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = LLMClient()
+    return _shared
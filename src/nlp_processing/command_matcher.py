@@ -0,0 +1,75 @@
+import re
+from collections import namedtuple
+from config.config import COMMAND_PATTERNS, COMMAND_PRIORITIES, ANCHORED_COMMANDS, COMMAND_INTENTS
+
+# command is the VoiceBot.commands key, or None for intent-only patterns
+CommandMatch = namedtuple('CommandMatch', ['command', 'intent', 'phrase', 'priority', 'start'])
+
+# Inflections accepted after a keyword: "transactions", "withdrawals", "transferred";
+# ed/ing may follow a doubled final letter ("transferred", "transferring")
+_SUFFIX = r"(?:es|(?:al)?s?|{last}?(?:ed|ing))"
+# Greetings and fillers allowed before an anchored keyword: "Hi, this is John", "um, this is John"
+_LEADING_WORDS = r"(?:(?:hi|hello|hey|ok|okay|um+|uh+|er+m?|so|well)\W+)*"
+
+
+def _phrase_regex(phrase, anchored=False):
+    words = [re.escape(word) for word in phrase.lower().split()]
+    body = r"\s+".join(words)
+    if anchored:
+        return r"^\W*" + _LEADING_WORDS + body + r"\b"
+    return body + _SUFFIX.format(last=re.escape(phrase[-1].lower())) + r"\b"
+
+
+class CommandMatcher:
+    """
+    Resolve a transcript to a command in a single pass of one compiled regex.
+    Keywords match on word boundaries; when several are present the one with
+    the highest priority wins and ties go to the earliest in the sentence.
+    """
+    def __init__(self, rules):
+        """rules: iterable of (phrase, command, intent, priority, anchored)"""
+        # Longer phrases first so "change user" beats a shorter overlapping keyword
+        self.rules = sorted(rules, key=lambda rule: len(rule[0]), reverse=True)
+        anchored_alternatives = []
+        word_alternatives = []
+        for index, (phrase, _, _, _, anchored) in enumerate(self.rules):
+            alternative = f"(?P<r{index}>{_phrase_regex(phrase, anchored)})"
+            (anchored_alternatives if anchored else word_alternatives).append(alternative)
+        # One shared word boundary in front of the keyword alternation keeps the scan cheap
+        parts = list(anchored_alternatives)
+        if word_alternatives:
+            parts.append(r"\b(?:" + "|".join(word_alternatives) + ")")
+        self.pattern = re.compile("|".join(parts) or r"(?!)", re.IGNORECASE)
+
+    @classmethod
+    def from_sources(cls, commands, command_patterns=COMMAND_PATTERNS,
+                     priorities=COMMAND_PRIORITIES, anchored=ANCHORED_COMMANDS,
+                     command_intents=COMMAND_INTENTS):
+        """
+        Merge VoiceBot.commands keywords with IntentClassifier.command_patterns.
+        Command keywords dispatch to a handler; intent patterns only decide the intent.
+        """
+        rules = []
+        for keyword in commands:
+            rules.append((keyword, keyword, command_intents.get(keyword, keyword),
+                          priorities.get(keyword, 0), keyword in anchored))
+        for intent, phrases in command_patterns.items():
+            for phrase in phrases:
+                rules.append((phrase, None, intent, priorities.get(intent, 0), False))
+        return cls(rules)
+
+    def find_all(self, text):
+        """Every keyword occurrence in the text, in sentence order"""
+        matches = []
+        for found in self.pattern.finditer(text):
+            phrase, command, intent, priority, _ = self.rules[int(found.lastgroup[1:])]
+            matches.append(CommandMatch(command, intent, phrase, priority, found.start()))
+        return matches
+
+    def match(self, text):
+        """Return the winning CommandMatch, or None if no keyword is present"""
+        best = None
+        for candidate in self.find_all(text):
+            if best is None or candidate.priority > best.priority:
+                best = candidate
+        return best
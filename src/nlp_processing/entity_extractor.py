@@ -0,0 +1,304 @@
+import bisect
+import difflib
+import re
+import threading
+from datetime import date, timedelta
+
+NUMBER_WORDS = {
+    'zero': 0, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12,
+    'thirteen': 13, 'fourteen': 14, 'fifteen': 15, 'sixteen': 16, 'seventeen': 17,
+    'eighteen': 18, 'nineteen': 19, 'twenty': 20, 'thirty': 30, 'forty': 40,
+    'fourty': 40, 'fifty': 50, 'sixty': 60, 'seventy': 70, 'eighty': 80, 'ninety': 90
+}
+SCALE_WORDS = {
+    'hundred': 100, 'thousand': 1000, 'grand': 1000, 'k': 1000, 'lakh': 100000, 'lac': 100000,
+    'lakhs': 100000, 'million': 1000000, 'crore': 10000000
+}
+CURRENCY_PREFIXES = {'$', '₹', 'rs', 'inr', 'usd'}
+CURRENCY_WORDS = {'dollar', 'dollars', 'buck', 'bucks', 'rupee', 'rupees', 'rs', 'inr', 'usd'}
+CENT_WORDS = {'cent', 'cents', 'paise', 'paisa'}
+DIGIT_SUFFIXES = {'k': 1000, 'm': 1000000}
+
+# Words that are never usernames in a command
+NON_NAME_WORDS = {
+    'a', 'an', 'the', 'to', 'from', 'for', 'of', 'and', 'my', 'me', 'i', 'im', 'am', 'is', 'it', 'its',
+    'this', 'that', 'name', 'user', 'username', 'account', 'please', 'now', 'money', 'amount',
+    'transfer', 'send', 'pay', 'give', 'move', 'change', 'switch', 'set', 'current', 'with',
+    'hi', 'hello', 'hey', 'ok', 'okay', 'um', 'uh', 'can', 'you', 'could', 'would', 'want', 'like',
+    'point', 'only', 'just', 'back', 'over', 'into', 'on', 'in', 'at', 'speaking', 'here'
+} | set(NUMBER_WORDS) | set(SCALE_WORDS) | CURRENCY_WORDS | CURRENCY_PREFIXES | CENT_WORDS
+
+_AMOUNT_TOKENS = re.compile(r"[$₹]|\d[\d,]*(?:\.\d+)?(?:[km]\b)?|[a-z]+")
+_NAME_TOKENS = re.compile(r"[a-z][a-z0-9_]*")
+_SOUNDEX_CODES = {}
+for _letters, _code in (("bfpv", "1"), ("cgjkqsxz", "2"), ("dt", "3"), ("l", "4"), ("mn", "5"), ("r", "6")):
+    for _letter in _letters:
+        _SOUNDEX_CODES[_letter] = _code
+
+
+def soundex(word):
+    """American Soundex code, used to match names the recogniser spelled differently"""
+    word = re.sub(r"[^a-z]", "", word.lower())
+    if not word:
+        return ""
+    code = word[0].upper()
+    previous = _SOUNDEX_CODES.get(word[0], "")
+    for letter in word[1:]:
+        digit = _SOUNDEX_CODES.get(letter, "")
+        if digit and digit != previous:
+            code += digit
+        if letter not in "hw":
+            previous = digit
+    return (code + "000")[:4]
+
+
+def _is_number_start(tokens, i):
+    token = tokens[i]
+    if token[0].isdigit() or token in NUMBER_WORDS:
+        return True
+    # "a hundred", "a thousand"
+    return token == 'a' and i + 1 < len(tokens) and tokens[i + 1] in SCALE_WORDS
+
+
+def _read_number(tokens, i):
+    """Parse one spoken or written number starting at tokens[i]. Returns (value, next index)"""
+    total, current = 0.0, 0.0
+    token = tokens[i]
+    if token[0].isdigit():
+        suffix = token[-1] if token[-1] in DIGIT_SUFFIXES else None
+        current = float((token[:-1] if suffix else token).replace(",", ""))
+        if suffix:
+            current *= DIGIT_SUFFIXES[suffix]
+        i += 1
+    elif token == 'a':
+        current = 1.0
+        i += 1
+
+    while i < len(tokens):
+        token = tokens[i]
+        if token in NUMBER_WORDS:
+            current += NUMBER_WORDS[token]
+        elif token == 'hundred':
+            current = (current or 1) * 100
+        elif token in SCALE_WORDS:
+            total += (current or 1) * SCALE_WORDS[token]
+            current = 0.0
+        elif token == 'and' and i + 1 < len(tokens) and tokens[i + 1] in NUMBER_WORDS:
+            pass
+        elif token == 'point' and i + 1 < len(tokens) and tokens[i + 1] in NUMBER_WORDS:
+            decimals = ""
+            while i + 1 < len(tokens) and tokens[i + 1] in NUMBER_WORDS and NUMBER_WORDS[tokens[i + 1]] < 10:
+                i += 1
+                decimals += str(NUMBER_WORDS[tokens[i]])
+            current += float("0." + decimals) if decimals else 0.0
+        else:
+            break
+        i += 1
+    return total + current, i
+
+
+def find_amounts(text):
+    """Return every (amount, has_currency) mentioned in the text, in order"""
+    tokens = _AMOUNT_TOKENS.findall(text.lower())
+    amounts = []
+    i = 0
+    while i < len(tokens):
+        if not _is_number_start(tokens, i):
+            i += 1
+            continue
+        has_currency = i > 0 and tokens[i - 1] in CURRENCY_PREFIXES
+        value, j = _read_number(tokens, i)
+
+        if j < len(tokens) and tokens[j] in CURRENCY_WORDS:
+            has_currency = True
+            j += 1
+            # "twenty dollars and fifty cents"
+            k = j + 1 if j < len(tokens) and tokens[j] == 'and' else j
+            if k < len(tokens) and _is_number_start(tokens, k):
+                cents, k = _read_number(tokens, k)
+                if k < len(tokens) and tokens[k] in CENT_WORDS:
+                    value += cents / 100.0
+                    j = k + 1
+        elif j < len(tokens) and tokens[j] in CENT_WORDS:
+            value /= 100.0
+            has_currency = True
+            j += 1
+
+        amounts.append((round(value, 2), has_currency))
+        i = j
+    return amounts
+
+
+def parse_amount(text):
+    """
+    Extract the money amount from a command.
+    Returns (amount, confidence); amount is None when nothing was found.
+    """
+    amounts = [found for found in find_amounts(text) if found[0] > 0]
+    if not amounts:
+        return None, 0.0
+    with_currency = [amount for amount, has_currency in amounts if has_currency]
+    if len(with_currency) == 1:
+        return with_currency[0], 0.95
+    if with_currency:
+        return with_currency[0], 0.6
+    if len(amounts) == 1:
+        return amounts[0][0], 0.8
+    return amounts[0][0], 0.5
+
+
+_LAST_N_DAYS = re.compile(r"\b(?:last|past)\s+(\d+|[a-z]+)\s+days?\b")
+
+
+def parse_period(text, today=None):
+    """
+    Resolve a spoken time range ("this month", "last week", "past 30 days")
+    to (start, end, label) with inclusive dates. Defaults to this month.
+    """
+    today = today or date.today()
+    text = text.lower()
+    month_start = today.replace(day=1)
+    week_start = today - timedelta(days=today.weekday())
+
+    match = _LAST_N_DAYS.search(text)
+    if match:
+        count = match.group(1)
+        days = int(count) if count.isdigit() else NUMBER_WORDS.get(count)
+        if days:
+            return today - timedelta(days=days - 1), today, f"in the last {days} days"
+    if 'yesterday' in text:
+        yesterday = today - timedelta(days=1)
+        return yesterday, yesterday, "yesterday"
+    if 'today' in text:
+        return today, today, "today"
+    if 'last week' in text:
+        return week_start - timedelta(days=7), week_start - timedelta(days=1), "last week"
+    if 'this week' in text:
+        return week_start, today, "this week"
+    if 'last month' in text:
+        last_month_end = month_start - timedelta(days=1)
+        return last_month_end.replace(day=1), last_month_end, "last month"
+    if 'last year' in text:
+        return date(today.year - 1, 1, 1), date(today.year - 1, 12, 31), "last year"
+    if 'this year' in text:
+        return date(today.year, 1, 1), today, "this year"
+    return month_start, today, "this month"
+
+
+def _name_key(name):
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+class UserIndex:
+    """
+    In-memory index of usernames supporting exact, prefix, phonetic and
+    fuzzy lookups for names as the speech recogniser spelled them.
+    """
+    def __init__(self, usernames=()):
+        self._lock = threading.Lock()
+        self._by_key = {}
+        self._keys = []
+        self._by_soundex = {}
+        for username in usernames:
+            self.add(username)
+
+    def __len__(self):
+        return len(self._by_key)
+
+    def __contains__(self, username):
+        return _name_key(username) in self._by_key
+
+    def add(self, username):
+        key = _name_key(username)
+        if not key:
+            return
+        with self._lock:
+            if key in self._by_key:
+                return
+            self._by_key[key] = username
+            bisect.insort(self._keys, key)
+            self._by_soundex.setdefault(soundex(key), []).append(key)
+
+    def resolve(self, candidate):
+        """Return (username, confidence) for the closest known user, or (None, 0.0)"""
+        key = _name_key(candidate)
+        if not key:
+            return None, 0.0
+        with self._lock:
+            if key in self._by_key:
+                return self._by_key[key], 1.0
+
+            if len(key) >= 3:
+                start = bisect.bisect_left(self._keys, key)
+                prefixed = []
+                for known in self._keys[start:]:
+                    if not known.startswith(key):
+                        break
+                    prefixed.append(known)
+                if len(prefixed) == 1:
+                    return self._by_key[prefixed[0]], 0.85
+
+            best_key, best_score = None, 0.0
+            for known in self._by_soundex.get(soundex(key), []):
+                score = 0.7 + 0.25 * difflib.SequenceMatcher(None, key, known).ratio()
+                if score > best_score:
+                    best_key, best_score = known, score
+
+            for known in difflib.get_close_matches(key, self._keys, n=3, cutoff=0.75):
+                score = 0.9 * difflib.SequenceMatcher(None, key, known).ratio()
+                if score > best_score:
+                    best_key, best_score = known, score
+
+            if best_key is None:
+                return None, 0.0
+            return self._by_key[best_key], round(best_score, 3)
+
+
+class EntityExtractor:
+    """Pulls usernames and amounts out of banking commands without an LLM call"""
+    def __init__(self, user_index):
+        self.user_index = user_index
+
+    def _name_candidates(self, text):
+        """Words (and adjacent word pairs) that could be a username, most likely first"""
+        words = _NAME_TOKENS.findall(text.lower())
+        preferred, others = [], []
+        after_marker = False
+        for index, word in enumerate(words):
+            if word in ('to', 'is', 'am'):
+                after_marker = True
+                continue
+            if word in NON_NAME_WORDS:
+                continue
+            target = preferred if after_marker else others
+            target.append(word)
+            # "demo user" -> demo_user
+            if index + 1 < len(words):
+                target.append(word + words[index + 1])
+        return preferred + others
+
+    def extract_username(self, text):
+        """
+        Return {'username', 'confidence', 'exact'} for the best matching known
+        user; exact is False for prefix, phonetic and fuzzy matches.
+        """
+        best_name, best_confidence = None, 0.0
+        for candidate in self._name_candidates(text):
+            username, confidence = self.user_index.resolve(candidate)
+            if confidence > best_confidence:
+                best_name, best_confidence = username, confidence
+                if confidence == 1.0:
+                    break
+        return {'username': best_name, 'confidence': best_confidence, 'exact': best_confidence == 1.0}
+
+    def extract_transfer(self, text):
+        """Return {'username', 'amount', 'confidence', 'exact'} for a transfer command"""
+        amount, amount_confidence = parse_amount(text)
+        user = self.extract_username(text)
+        return {
+            'username': user['username'],
+            'amount': amount,
+            'confidence': min(amount_confidence, user['confidence']),
+            'exact': user['exact']
+        }
@@ -0,0 +1,120 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from config.config import INTENT_CACHE_SIZE, INTENT_CACHE_TTL_S
+
+FILLER_WORDS = {
+    "um", "umm", "uh", "uhh", "erm", "er", "hmm", "ah", "oh",
+    "please", "just", "so", "well", "okay", "ok", "actually", "basically", "hey"
+}
+
+_APOSTROPHES = re.compile(r"['’]")
+_NON_WORD = re.compile(r"[^a-z0-9$.]+")
+
+
+def normalize_text(text):
+    """
+    Canonical form of a transcript for cache lookups: lower case, no
+    punctuation, single spaces and no filler words.
+    "Um, what's my BALANCE?" -> "whats my balance"
+    """
+    text = _APOSTROPHES.sub("", text.lower())
+    text = _NON_WORD.sub(" ", text)
+    # Keep decimal points inside numbers only
+    words = [word.strip(".") for word in text.split()]
+    return " ".join(word for word in words if word and word not in FILLER_WORDS)
+
+
+def labels_fingerprint(intents, descriptions, template=""):
+    """Hash of everything that changes what the classifier can return"""
+    digest = hashlib.sha1(template.encode("utf-8"))
+    for intent in intents:
+        digest.update(f"\x00{intent}\x01{descriptions.get(intent, '')}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class IntentCache:
+    """
+    Bounded, thread-safe LRU cache of classification results with a TTL.
+    Entries are tagged with the label fingerprint they were computed for;
+    set_fingerprint() drops everything when the labels change.
+    """
+    def __init__(self, max_size=INTENT_CACHE_SIZE, ttl_seconds=INTENT_CACHE_TTL_S, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.fingerprint = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def set_fingerprint(self, fingerprint):
+        """Switch to a new label set, invalidating results for the old one"""
+        with self._lock:
+            if fingerprint != self.fingerprint:
+                self._entries.clear()
+                self.fingerprint = fingerprint
+
+    def get(self, text):
+        """Return a copy of the cached result for `text`, or None"""
+        key = normalize_text(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, result = entry
+            if self.ttl_seconds and self.clock() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return _copy_result(result)
+
+    def put(self, text, result, fingerprint=None):
+        """Store a result; ignored if it was computed for a stale label set"""
+        key = normalize_text(text)
+        if not key or self.max_size <= 0:
+            return
+        expires_at = self.clock() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            if fingerprint is not None and fingerprint != self.fingerprint:
+                return
+            self._entries[key] = (expires_at, _copy_result(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+def _copy_result(result):
+    copied = dict(result)
+    if 'all_intents' in copied:
+        copied['all_intents'] = dict(copied['all_intents'])
+    return copied
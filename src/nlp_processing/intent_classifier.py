@@ -1,17 +1,94 @@
 # src/nlp_processing/intent_classifier.py
-from transformers import pipeline
-from config.config import CANDIDATE_INTENTS, INTENT_DESCRIPTIONS
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from config.config import (
+    CANDIDATE_INTENTS,
+    INTENT_DESCRIPTIONS,
+    INTENT_MODEL,
+    INTENT_HYPOTHESIS_TEMPLATE,
+    INTENT_NUM_THREADS,
+    COMMAND_PATTERNS
+)
+from src.nlp_processing.intent_cache import IntentCache, labels_fingerprint
 
 class IntentClassifier:
-    def __init__(self):
-        self.classifier = pipeline("zero-shot-classification",
-                                 model="facebook/bart-large-mnli")
-        
+    """
+    Zero-shot NLI intent classifier.
+    Label-side work (hypothesis text and token ids) is done once at startup;
+    each utterance is paired with every hypothesis and scored in a single
+    batched forward pass. Results are cached by normalized transcript.
+    """
+    # Pad batch width to a multiple of this so tensor shapes repeat between calls
+    PAD_MULTIPLE = 8
+
+    def __init__(self, model_name=INTENT_MODEL, num_threads=INTENT_NUM_THREADS, cache=None):
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.tokenizer, self.model = self._load_model(model_name)
+        self.model.eval()
+        self.entailment_id = self._entailment_index(self.model.config)
+
         # Add specific command patterns
-        self.command_patterns = {
-            "show_users": ["show all users", "display users", 
-                          "list users", "show users", "get all users"]
-        }
+        self.command_patterns = COMMAND_PATTERNS
+        self.cache = cache if cache is not None else IntentCache()
+        self.prepare_labels()
+
+    def _load_model(self, model_name):
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        return tokenizer, model
+
+    @staticmethod
+    def _entailment_index(model_config):
+        for label, index in model_config.label2id.items():
+            if label.lower().startswith("entail"):
+                return index
+        return -1
+
+    @staticmethod
+    def current_fingerprint():
+        return labels_fingerprint(CANDIDATE_INTENTS, INTENT_DESCRIPTIONS, INTENT_HYPOTHESIS_TEMPLATE)
+
+    def prepare_labels(self):
+        """Build and tokenize the hypothesis for every candidate intent"""
+        self.intents = list(CANDIDATE_INTENTS)
+        self.hypotheses = [INTENT_HYPOTHESIS_TEMPLATE.format(INTENT_DESCRIPTIONS[intent]) for intent in self.intents]
+        self.hypothesis_ids = [
+            self.tokenizer.encode(hypothesis, add_special_tokens=False)
+            for hypothesis in self.hypotheses
+        ]
+        # Room left for the premise once special tokens and the longest hypothesis are added
+        max_length = min(getattr(self.tokenizer, 'model_max_length', 1024), 1024)
+        self.max_premise_length = max_length - max(len(ids) for ids in self.hypothesis_ids) - 4
+        self.pad_id = self.tokenizer.pad_token_id or 0
+        self.labels_fingerprint = self.current_fingerprint()
+        self.cache.set_fingerprint(self.labels_fingerprint)
+
+    def _build_batch(self, text):
+        """Pair the premise with every cached hypothesis in one padded batch"""
+        premise_ids = self.tokenizer.encode(text, add_special_tokens=False)[:self.max_premise_length]
+        rows = [
+            self.tokenizer.build_inputs_with_special_tokens(premise_ids, hypothesis_ids)
+            for hypothesis_ids in self.hypothesis_ids
+        ]
+        width = max(len(row) for row in rows)
+        width = -(-width // self.PAD_MULTIPLE) * self.PAD_MULTIPLE
+
+        input_ids = torch.full((len(rows), width), self.pad_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(rows), width), dtype=torch.long)
+        for i, row in enumerate(rows):
+            input_ids[i, :len(row)] = torch.tensor(row, dtype=torch.long)
+            attention_mask[i, :len(row)] = 1
+        return input_ids, attention_mask
+
+    def score_intents(self, text):
+        """Return {intent: probability} for all candidate intents"""
+        input_ids, attention_mask = self._build_batch(text)
+        with torch.inference_mode():
+            logits = self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+        # Same as the zero-shot pipeline in single-label mode: softmax of entailment across labels
+        scores = logits[:, self.entailment_id].softmax(dim=0).tolist()
+        return dict(zip(self.intents, scores))
 
     def classify_intent(self, text):
         """
@@ -28,23 +105,26 @@ class IntentClassifier:
                         'all_intents': {intent: 1.0}
                     }
 
+            # Rebuild hypotheses (and drop cached results) if the intent config changed
+            if self.current_fingerprint() != self.labels_fingerprint:
+                self.prepare_labels()
+
+            cached = self.cache.get(text)
+            if cached is not None:
+                return cached
+            fingerprint = self.labels_fingerprint
+
             # If no exact match, use zero-shot classification with enhanced context
-            hypothesis_template = "This is a request to {}."
-            
-            result = self.classifier(
-                text,
-                candidate_labels=[INTENT_DESCRIPTIONS[intent] for intent in CANDIDATE_INTENTS],
-                hypothesis_template=hypothesis_template
-            )
-            
-            # Map back to original intent names
-            mapped_labels = [CANDIDATE_INTENTS[i] for i in range(len(CANDIDATE_INTENTS))]
-            
-            return {
-                'intent': mapped_labels[0],
-                'confidence': result['scores'][0],
-                'all_intents': dict(zip(mapped_labels, result['scores']))
+            scores = self.score_intents(text)
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+            result = {
+                'intent': ranked[0][0],
+                'confidence': ranked[0][1],
+                'all_intents': dict(ranked)
             }
+            self.cache.put(text, result, fingerprint)
+            return result
 
         except Exception as e:
             print(f"Error in intent classification: {str(e)}")
@@ -0,0 +1,131 @@
+import logging
+import re
+from collections import deque
+from config.config import MEMORY_TOKEN_BUDGET, MEMORY_MAX_MESSAGES, MEMORY_SUMMARY_TOKENS
+
+# Chat format overhead per message (role and separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+
+_encoding = None
+_FIRST_SENTENCE = re.compile(r"(.+?[.!?])(\s|$)")
+
+
+def count_tokens(text):
+    """Tokens in `text`: exact with tiktoken installed, otherwise ~4 characters per token"""
+    global _encoding
+    if _encoding is None:
+        # Optional, and imported on first use so startup doesn't pay for it
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            if not isinstance(e, ImportError):
+                logging.error(f"Falling back to estimated token counts: {str(e)}")
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def message_tokens(message, counter=count_tokens):
+    return counter(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def fold_summary(summary, evicted, max_tokens, counter=count_tokens):
+    """
+    Default summarizer: keep the gist (first sentence, at most 25 words)
+    of each evicted message, dropping the oldest lines past max_tokens.
+    Local and instant, so eviction never waits on the network.
+    """
+    lines = summary.splitlines() if summary else []
+    for message in evicted:
+        text = " ".join(message["content"].split())
+        match = _FIRST_SENTENCE.match(text)
+        gist = " ".join((match.group(1) if match else text).split()[:25])
+        if gist:
+            lines.append(f"{message['role'].capitalize()}: {gist}")
+    while lines and counter("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+class ConversationMemory:
+    """
+    One caller's chat history for the LLM prompt. Recent messages are kept
+    verbatim in a deque with their token counts, within a token budget
+    rather than a fixed number of messages; older ones are folded into a
+    rolling summary, sent ahead of them as a system message.
+    Iterating yields the prompt messages; indexing and len() see only the
+    verbatim messages.
+    summarizer: callable(summary, evicted_messages, max_tokens) -> summary
+    """
+    def __init__(self, max_tokens=MEMORY_TOKEN_BUDGET, max_messages=MEMORY_MAX_MESSAGES,
+                 summary_tokens=MEMORY_SUMMARY_TOKENS, summarizer=None, counter=count_tokens):
+        self.max_tokens = max_tokens
+        self.max_messages = max_messages
+        self.summary_tokens = summary_tokens
+        self.counter = counter
+        self.summarizer = summarizer or (lambda summary, evicted, limit: fold_summary(summary, evicted, limit,
+                                                                                      counter))
+        self.summary = ""
+        self.tokens = 0
+        self.evicted = 0
+        self._messages = deque()    # (message, tokens)
+
+    def append(self, message):
+        tokens = message_tokens(message, self.counter)
+        self._messages.append((message, tokens))
+        self.tokens += tokens
+        self._enforce_budget()
+
+    def _enforce_budget(self):
+        evicted = []
+        # The newest message always stays, however long
+        while len(self._messages) > 1 and (self.tokens > self.max_tokens or len(self._messages) > self.max_messages):
+            message, tokens = self._messages.popleft()
+            self.tokens -= tokens
+            evicted.append(message)
+        if evicted:
+            self.evicted += len(evicted)
+            if self.summary_tokens > 0:
+                self.summary = self.summarizer(self.summary, evicted, self.summary_tokens)
+
+    def summary_message(self):
+        if not self.summary:
+            return None
+        return {"role": "system", "content": f"{SUMMARY_PREFIX}\n{self.summary}"}
+
+    def prompt_tokens(self):
+        """Tokens this memory adds to a prompt, summary included"""
+        summary = self.summary_message()
+        return self.tokens + (message_tokens(summary, self.counter) if summary else 0)
+
+    def __iter__(self):
+        summary = self.summary_message()
+        if summary:
+            yield summary
+        for message, _ in self._messages:
+            yield message
+
+    def __len__(self):
+        return len(self._messages)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [message for message, _ in list(self._messages)[index]]
+        return self._messages[index][0]
+
+    def clear(self):
+        self._messages.clear()
+        self.summary = ""
+        self.tokens = 0
+
+    def stats(self):
+        return {
+            'messages': len(self._messages),
+            'tokens': self.tokens,
+            'summary_tokens': self.counter(self.summary) if self.summary else 0,
+            'prompt_tokens': self.prompt_tokens(),
+            'evicted': self.evicted,
+        }
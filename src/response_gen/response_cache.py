@@ -0,0 +1,172 @@
+import math
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from config.config import (RESPONSE_TEMPLATES, RESPONSE_TEMPLATE_INTENTS, RESPONSE_TEMPLATE_MIN_CONFIDENCE,
+                           RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_S, RESPONSE_CACHE_MAX_WORDS,
+                           RESPONSE_CACHE_SEMANTIC, RESPONSE_CACHE_SIMILARITY)
+from src.nlp_processing.intent_cache import normalize_text
+
+VECTOR_DIMENSIONS = 1024
+
+
+def sentence_vector(text, dimensions=VECTOR_DIMENSIONS):
+    """
+    Cheap unit-length bag of words and character trigrams, hashed into a
+    sparse {index: weight} dict; similar wordings share most features.
+    """
+    counts = {}
+    words = text.split()
+    features = words + [padded[i:i + 3] for word in words for padded in [f" {word} "]
+                        for i in range(len(padded) - 2)]
+    for feature in features:
+        index = zlib.crc32(feature.encode("utf-8")) % dimensions
+        counts[index] = counts.get(index, 0.0) + 1.0
+    norm = math.sqrt(sum(weight * weight for weight in counts.values()))
+    return {index: weight / norm for index, weight in counts.items()} if norm else {}
+
+
+def cosine(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(index, 0.0) for index, weight in a.items())
+
+
+class ResponseCache:
+    """
+    Answers a turn without calling the LLM when it can:
+      1. template: fixed replies from RESPONSE_TEMPLATES for intents that
+         don't need the model (greeting, help, goodbye);
+      2. exact: a reply generated earlier for the same normalized input and
+         intent, kept in a bounded LRU with a TTL;
+      3. semantic (optional): the closest earlier input with the same intent
+         by cosine similarity of hashed sentence vectors.
+    Only short turns are cached, since longer ones tend to depend on the
+    conversation so far. Callers pass context_free=False for turns with
+    history: those replies were built from one caller's conversation, so
+    they are neither looked up nor stored (templates still apply).
+    """
+    def __init__(self, max_size=RESPONSE_CACHE_SIZE, ttl_seconds=RESPONSE_CACHE_TTL_S,
+                 templates=None, template_intents=RESPONSE_TEMPLATE_INTENTS,
+                 min_template_confidence=RESPONSE_TEMPLATE_MIN_CONFIDENCE, max_words=RESPONSE_CACHE_MAX_WORDS,
+                 semantic=RESPONSE_CACHE_SEMANTIC, similarity=RESPONSE_CACHE_SIMILARITY, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.templates = dict(RESPONSE_TEMPLATES if templates is None else templates)
+        self.template_intents = set(template_intents)
+        self.min_template_confidence = min_template_confidence
+        self.max_words = max_words
+        self.semantic = semantic
+        self.similarity = similarity
+        self.clock = clock
+        self._entries = OrderedDict()   # (normalized text, intent) -> (expires_at, reply, vector)
+        self._lock = threading.Lock()
+        self.template_hits = 0
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def template(self, intent, confidence):
+        """The canned reply for a deterministic intent, or None"""
+        if intent in self.template_intents and confidence >= self.min_template_confidence:
+            return self.templates.get(intent)
+        return None
+
+    def _key(self, text, intent):
+        normalized = normalize_text(text)
+        if not normalized or len(normalized.split()) > self.max_words:
+            return None
+        return normalized, intent
+
+    def get(self, text, intent, confidence, context_free=True):
+        """Return a reply for this turn without the LLM, or None"""
+        reply = self.template(intent, confidence)
+        if reply is not None:
+            with self._lock:
+                self.template_hits += 1
+            return reply
+        key = self._key(text, intent) if context_free else None
+        if key is None or self.max_size <= 0:
+            with self._lock:
+                self.misses += 1
+            return None
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(key, entry, now):
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return entry[1]
+            if self.semantic:
+                reply = self._nearest(key, now)
+                if reply is not None:
+                    self.semantic_hits += 1
+                    return reply
+            self.misses += 1
+        return None
+
+    def _expired(self, key, entry, now):
+        if self.ttl_seconds and now >= entry[0]:
+            del self._entries[key]
+            self.expirations += 1
+            return True
+        return False
+
+    def _nearest(self, key, now):
+        vector = sentence_vector(key[0])
+        best_key, best_score = None, self.similarity
+        for other, entry in list(self._entries.items()):
+            if other[1] != key[1] or self._expired(other, entry, now):
+                continue
+            if entry[2] is None:
+                # Stored while semantic lookup was off
+                entry = (entry[0], entry[1], sentence_vector(other[0]))
+                self._entries[other] = entry
+            score = cosine(vector, entry[2])
+            if score >= best_score:
+                best_key, best_score = other, score
+        if best_key is None:
+            return None
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key][1]
+
+    def put(self, text, intent, confidence, reply, context_free=True):
+        """Remember an LLM reply for later turns; template intents are never stored"""
+        key = self._key(text, intent) if context_free else None
+        if key is None or not reply or self.max_size <= 0 or self.template(intent, confidence) is not None:
+            return
+        expires_at = self.clock() + self.ttl_seconds if self.ttl_seconds else None
+        vector = sentence_vector(key[0]) if self.semantic else None
+        with self._lock:
+            self._entries[key] = (expires_at, reply, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            hits = self.template_hits + self.exact_hits + self.semantic_hits
+            lookups = hits + self.misses
+            return {
+                'size': len(self._entries),
+                'template_hits': self.template_hits,
+                'exact_hits': self.exact_hits,
+                'semantic_hits': self.semantic_hits,
+                'misses': self.misses,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
@@ -1,46 +1,130 @@
-from openai import OpenAI
-from config.config import OPENAI_API_KEY
+import queue
+import threading
+from config.config import LLM_MODEL
+from src.llm.client import get_client
+from src.response_gen.conversation_memory import ConversationMemory
+from src.response_gen.response_cache import ResponseCache
+from src.response_gen.sentence_splitter import SentenceSplitter, split_stream
+
+FALLBACK_RESPONSE = "I'm having trouble processing that. Can you try rephrasing?"
+_DONE = object()
+
 
 class ResponseGenerator:
-    def __init__(self):
-        self.client = OpenAI()
-        self.conversation_history = []
+    def __init__(self, client=None, cache=None):
+        """client: an LLMClient; defaults to the process-wide one"""
+        self.client = client or get_client()
+        self.cache = cache if cache is not None else ResponseCache()
+        self.conversation_history = ConversationMemory()
 
-    def generate_response(self, user_input, intent, confidence):
+    def generate_response(self, user_input, intent, confidence, history=None):
+        """
+        history: the caller's ConversationMemory when one generator is shared
+        by several sessions; defaults to this generator's own history.
+        """
+        if history is None:
+            history = self.conversation_history
         try:
+            # Only an opening turn's reply is independent of the caller's history
+            context_free = len(history) == 0
             # Update conversation history
-            self.conversation_history.append({"role": "user", "content": user_input})
+            history.append({"role": "user", "content": user_input})
 
-            # If confidence is low, make the bot more conversational
-            if confidence < 0.7:
-                system_message = "You are a friendly and engaging AI assistant. If you are uncertain, keep the conversation going naturally and ask for clarification if needed."
-            else:
-                system_message = self._get_system_message(intent)
+            # Templates and earlier replies skip the network
+            bot_response = self.cache.get(user_input, intent, confidence, context_free)
+            if bot_response is not None:
+                self._remember(history, bot_response)
+                return bot_response
 
             # Generate response using OpenAI
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_message},
-                    *self.conversation_history
-                ],
-                max_tokens=150,
-                temperature=0.9 if confidence < 0.7 else 0.7
-            )
+            response = self.client.chat(**self._request(intent, confidence, history))
 
             # Extract and store response
             bot_response = response.choices[0].message.content.strip()
-            self.conversation_history.append({"role": "assistant", "content": bot_response})
-
-            # Maintain conversation history length
-            if len(self.conversation_history) > 10:
-                self.conversation_history = self.conversation_history[-10:]
-
+            self._remember(history, bot_response)
+            self.cache.put(user_input, intent, confidence, bot_response, context_free)
             return bot_response
 
         except Exception as e:
             print(f"Error generating response: {str(e)}")
-            return "I'm having trouble processing that. Can you try rephrasing?"
+            return FALLBACK_RESPONSE
+
+    def stream_response(self, user_input, intent, confidence, history=None, remember=True):
+        """
+        Like generate_response, but yields the reply one sentence at a time
+        as the completion streams in, so speech can start before the model
+        has finished. The full reply is added to history once it ends,
+        unless remember is False: then the caller records what was actually
+        heard with remember_reply().
+        """
+        if history is None:
+            history = self.conversation_history
+        context_free = len(history) == 0
+        history.append({"role": "user", "content": user_input})
+        cached = self.cache.get(user_input, intent, confidence, context_free)
+        if cached is not None:
+            if remember:
+                self._remember(history, cached)
+            yield from split_stream([cached])
+            return
+        splitter = SentenceSplitter()
+        parts = []
+        complete = False
+        stream = None
+        try:
+            stream = self.client.stream_chat(**self._request(intent, confidence, history))
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content
+                if not token:
+                    continue
+                parts.append(token)
+                yield from splitter.feed(token)
+            yield from splitter.flush()
+            complete = True
+        except Exception as e:
+            print(f"Error generating response: {str(e)}")
+            # Say the fallback only if nothing was spoken yet
+            if not "".join(parts).strip():
+                parts = [FALLBACK_RESPONSE]
+                yield FALLBACK_RESPONSE
+        finally:
+            # Also runs when the caller stops reading early and closes us (barge-in)
+            if stream is not None:
+                stream.close()
+            if remember:
+                self._remember(history, "".join(parts).strip())
+        if complete:
+            self.cache.put(user_input, intent, confidence, "".join(parts).strip(), context_free)
+
+    def _request(self, intent, confidence, history):
+        # If confidence is low, make the bot more conversational
+        if confidence < 0.7:
+            system_message = "You are a friendly and engaging AI assistant. If you are uncertain, keep the conversation going naturally and ask for clarification if needed."
+        else:
+            system_message = self._get_system_message(intent)
+        return dict(
+            model=LLM_MODEL,
+            messages=[
+                {"role": "system", "content": system_message},
+                *history
+            ],
+            max_tokens=150,
+            temperature=0.9 if confidence < 0.7 else 0.7
+        )
+
+    def remember_reply(self, history, bot_response):
+        """Record a reply streamed with remember=False"""
+        self._remember(history if history is not None else self.conversation_history, bot_response)
+
+    @staticmethod
+    def _remember(history, bot_response):
+        # A ConversationMemory keeps itself within its token budget
+        history.append({"role": "assistant", "content": bot_response})
+        # Plain lists are trimmed in place, so the caller's list stays current
+        if isinstance(history, list) and len(history) > 10:
+            del history[:-10]
 
     def _get_system_message(self, intent):
         """Returns appropriate system message based on intent"""
@@ -57,4 +141,99 @@ class ResponseGenerator:
 
     def reset_conversation(self):
         """Clears the conversation history"""
-        self.conversation_history = []
+        self.conversation_history = ConversationMemory()
+
+
+class StreamingReply:
+    """
+    Drains a sentence iterator (e.g. stream_response) on a background
+    thread. Iterate it to get sentences as they arrive (for speech);
+    text() waits for the end and returns the reply as heard (for logging).
+    The reply ends once the stream is drained and the speaker is done
+    with it: it read every sentence, or called finish() or cancel().
+    cancel() (barge-in) also stops and closes the stream, and only the
+    sentences handed to the speaker count as heard.
+    on_end(text) is called once, with the heard text, when the reply ends.
+    """
+    def __init__(self, sentences, on_end=None):
+        self._queue = queue.Queue()
+        self._sentences = []
+        self._heard = []
+        self._on_end = on_end
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._drained = False
+        self._finished = False
+        self._ended = threading.Event()
+        self._thread = threading.Thread(target=self._drain, args=(sentences,), name="streaming-reply", daemon=True)
+        self._thread.start()
+
+    def _drain(self, sentences):
+        try:
+            for sentence in sentences:
+                if self._cancelled.is_set():
+                    break
+                self._sentences.append(sentence)
+                self._queue.put(sentence)
+        except Exception as e:
+            print(f"Error generating response: {str(e)}")
+        finally:
+            if hasattr(sentences, 'close'):
+                sentences.close()
+            self._queue.put(_DONE)
+            self._end(drained=True)
+
+    def __iter__(self):
+        while not self._cancelled.is_set():
+            sentence = self._queue.get()
+            if sentence is _DONE:
+                # Let other iterators finish too
+                self._queue.put(_DONE)
+                self.finish()
+                return
+            self._heard.append(sentence)
+            yield sentence
+
+    def finish(self):
+        """The speaker is done with this reply"""
+        self._end(finished=True)
+
+    def cancel(self):
+        """Barge-in: stop the stream; what was not handed out yet was never heard"""
+        self._cancelled.set()
+        self._queue.put(_DONE)
+        self.finish()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def _end(self, drained=False, finished=False):
+        with self._lock:
+            if self._ended.is_set():
+                return
+            self._drained = self._drained or drained
+            self._finished = self._finished or finished
+            if not (self._drained and self._finished):
+                return
+            text = self._text()
+            if self._on_end is not None:
+                try:
+                    self._on_end(text)
+                except Exception as e:
+                    print(f"Error finishing response: {str(e)}")
+            self._ended.set()
+
+    def _text(self):
+        return " ".join(self._heard if self._cancelled.is_set() else self._sentences)
+
+    def wait(self, timeout=None):
+        """Block until the reply has ended; returns False on timeout"""
+        return self._ended.wait(timeout)
+
+    def text(self, timeout=None):
+        self._ended.wait(timeout)
+        return self._text()
+
+    def __str__(self):
+        return self.text()
@@ -0,0 +1,64 @@
+import re
+
+# Words that end with a period without ending the sentence
+ABBREVIATIONS = {'mr', 'mrs', 'ms', 'dr', 'st', 'sr', 'jr', 'vs', 'etc', 'e.g', 'i.e', 'a.m', 'p.m', 'no', 'approx'}
+
+_BOUNDARY = re.compile(r"[.!?]+[\"')\]]*\s|\n+")
+
+
+class SentenceSplitter:
+    """
+    Incrementally cuts streamed text into sentences so each one can be
+    spoken as soon as it is complete. feed() returns the sentences that a
+    new chunk finished; flush() returns whatever is left at the end.
+    Clauses longer than max_chars are cut at the last comma or space so a
+    run-on reply doesn't hold back the audio.
+    """
+    def __init__(self, max_chars=200):
+        self.max_chars = max_chars
+        self._pending = ""
+
+    def feed(self, chunk):
+        self._pending += chunk
+        sentences = []
+        start = 0
+        for match in _BOUNDARY.finditer(self._pending):
+            candidate = self._pending[start:match.end()]
+            if self._ends_with_abbreviation(self._pending[start:match.start() + 1]):
+                continue
+            if candidate.strip():
+                sentences.append(candidate.strip())
+            start = match.end()
+        self._pending = self._pending[start:]
+
+        while len(self._pending) > self.max_chars:
+            cut = max(self._pending.rfind(", ", 0, self.max_chars), self._pending.rfind(" ", 0, self.max_chars))
+            if cut <= 0:
+                cut = self.max_chars
+            sentences.append(self._pending[:cut + 1].strip())
+            self._pending = self._pending[cut + 1:]
+        return sentences
+
+    def flush(self):
+        rest, self._pending = self._pending.strip(), ""
+        return [rest] if rest else []
+
+    @staticmethod
+    def _ends_with_abbreviation(text):
+        if not text.endswith('.'):
+            return False
+        words = text[:-1].split()
+        if not words:
+            return False
+        word = words[-1].lower().lstrip("(\"'")
+        # Single letters ("J. Smith") are initials; a leading number is a list item ("1. Deposit")
+        return (word in ABBREVIATIONS or (len(word) == 1 and word.isalpha())
+                or (len(words) == 1 and word.isdigit()))
+
+
+def split_stream(chunks, max_chars=200):
+    """Yield complete sentences from an iterable of text chunks"""
+    splitter = SentenceSplitter(max_chars)
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.flush()
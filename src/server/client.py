@@ -0,0 +1,41 @@
+import asyncio
+import base64
+import json
+from config.config import SERVER_HOST, SERVER_PORT, SERVER_MAX_MESSAGE_BYTES
+
+
+class ConversationClient:
+    """Minimal asyncio client for the conversation server's JSON-lines protocol"""
+    def __init__(self, reader, writer, session):
+        self.reader = reader
+        self.writer = writer
+        self.session = session
+
+    @classmethod
+    async def connect(cls, host=SERVER_HOST, port=SERVER_PORT):
+        reader, writer = await asyncio.open_connection(host, port, limit=SERVER_MAX_MESSAGE_BYTES)
+        hello = json.loads(await reader.readline())
+        return cls(reader, writer, hello.get("session"))
+
+    async def request(self, message):
+        self.writer.write(json.dumps(message).encode() + b"\n")
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        return json.loads(line)
+
+    async def say(self, text, audio_reply=False):
+        return await self.request({"type": "text", "text": text, "audio_reply": audio_reply})
+
+    async def send_audio(self, wav_bytes, audio_reply=False):
+        data = base64.b64encode(wav_bytes).decode()
+        return await self.request({"type": "audio", "data": data, "audio_reply": audio_reply})
+
+    async def close(self):
+        try:
+            await self.request({"type": "bye"})
+        except ConnectionError:
+            pass
+        self.writer.close()
+        await self.writer.wait_closed()
@@ -0,0 +1,263 @@
+"""
+Asyncio conversation server: many callers, one set of components.
+
+Protocol: newline-delimited JSON over TCP. The server greets each connection
+with {"type": "hello", "session": id}, then answers every message in order:
+    {"type": "text", "text": "...", "audio_reply": false}
+    {"type": "audio", "data": "<base64 WAV>", "audio_reply": false}
+    {"type": "reset"}      forget the current user and chat history
+    {"type": "stats"}      server-wide latency and stage counters
+    {"type": "bye"}        close the session
+Replies to text/audio turns are {"type": "reply", "text", "intent",
+"confidence", "latency_ms"} (plus "transcript" and "audio" when relevant).
+"""
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from config.config import SERVER_HOST, SERVER_PORT, SERVER_MAX_MESSAGE_BYTES, SERVER_STAGE_LIMITS
+from src.llm.client import get_client
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class StageLimiter:
+    """
+    Runs blocking calls on a thread pool with a separate concurrency cap
+    per stage, so a burst of LLM calls can't starve speech recognition and
+    single-threaded engines are never entered twice.
+    """
+    def __init__(self, limits=None, executor=None):
+        self.limits = dict(SERVER_STAGE_LIMITS if limits is None else limits)
+        self._semaphores = {stage: asyncio.Semaphore(limit) for stage, limit in self.limits.items()}
+        self.executor = executor or ThreadPoolExecutor(max_workers=sum(self.limits.values()),
+                                                       thread_name_prefix="voicebot-stage")
+        self.active = {stage: 0 for stage in self.limits}
+        self.waiting = {stage: 0 for stage in self.limits}
+        self.peak = {stage: 0 for stage in self.limits}
+        self.calls = {stage: 0 for stage in self.limits}
+
+    async def run(self, stage, fn, *args):
+        semaphore = self._semaphores[stage]
+        self.waiting[stage] += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting[stage] -= 1
+        self.active[stage] += 1
+        self.peak[stage] = max(self.peak[stage], self.active[stage])
+        self.calls[stage] += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.active[stage] -= 1
+            semaphore.release()
+
+    def stats(self):
+        return {stage: {'limit': self.limits[stage], 'active': self.active[stage], 'waiting': self.waiting[stage],
+                        'peak': self.peak[stage], 'calls': self.calls[stage]}
+                for stage in self.limits}
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ConversationServer:
+    """Serves one VoiceBot session per connection, all sharing `bot`'s components"""
+    def __init__(self, bot, host=SERVER_HOST, port=SERVER_PORT, stage_limits=None, latency_window=10000):
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self.stage_limits = stage_limits
+        self.stages = None
+        self.sessions = {}
+        self.turn_latencies = deque(maxlen=latency_window)
+        self.sessions_opened = 0
+        self.turns = 0
+        self.errors = 0
+        self._ids = itertools.count(1)
+        self._server = None
+
+    async def start(self):
+        """Start listening; with port=0 the chosen port is stored in self.port"""
+        self.stages = StageLimiter(self.stage_limits)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                  limit=SERVER_MAX_MESSAGE_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logging.info(f"Conversation server listening on {self.host}:{self.port}")
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self.stages is not None:
+            self.stages.shutdown()
+
+    async def _handle_connection(self, reader, writer):
+        session_id = next(self._ids)
+        session = self.bot.spawn_session()
+        self.sessions[session_id] = session
+        self.sessions_opened += 1
+        try:
+            await self._send(writer, {"type": "hello", "session": session_id})
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    await self._send(writer, {"type": "error", "error": "message too large"})
+                    break
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    await self._send(writer, {"type": "error", "error": "invalid JSON"})
+                    continue
+                if not isinstance(message, dict):
+                    await self._send(writer, {"type": "error", "error": "message must be a JSON object"})
+                    continue
+                if message.get("type") == "bye":
+                    await self._send(writer, {"type": "bye"})
+                    break
+                await self._send(writer, await self.handle_message(session, message))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.sessions.pop(session_id, None)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _send(self, writer, payload):
+        writer.write(json.dumps(payload).encode() + b"\n")
+        await writer.drain()
+
+    async def handle_message(self, session, message):
+        kind = message.get("type")
+        try:
+            if kind == "text":
+                return await self.turn(session, message.get("text", ""), message.get("audio_reply", False))
+            if kind == "audio":
+                audio = base64.b64decode(message.get("data", ""))
+                return await self.turn(session, None, message.get("audio_reply", False), audio=audio)
+            if kind == "reset":
+                session.user_id = session.username = None
+                session.conversation_history.clear()
+                return {"type": "reset"}
+            if kind == "stats":
+                return {"type": "stats", **self.stats()}
+            return {"type": "error", "error": f"unknown message type {kind!r}"}
+        except Exception as e:
+            self.errors += 1
+            logging.error(f"Error handling {kind} message: {str(e)}")
+            return {"type": "error", "error": "I encountered an error. Please try again."}
+
+    async def turn(self, session, text, audio_reply=False, audio=None):
+        """One caller turn, each blocking step under its own stage limit"""
+        start = time.perf_counter()
+        reply = {"type": "reply"}
+        if audio is not None:
+            text = await self.stages.run('asr', session.transcriber.transcribe_audio, audio)
+            reply["transcript"] = text
+            if not text:
+                reply.update(text="I couldn't understand the audio. Please try again.", intent=None, confidence=0.0)
+                return self._finish(reply, start)
+
+        match, intent, confidence = await self.stages.run('nlu', session.resolve_intent, text)
+        response = None
+        if match and match.command:
+            response = await self.stages.run('db', session.run_command, match, text)
+        if not response:
+            response = await self.stages.run('llm', session.generate_reply, text, intent, confidence)
+        # Only enqueues; the write happens behind the reply
+        session.log_turn(text, response, intent, confidence)
+        reply.update(text=response, intent=intent, confidence=confidence)
+
+        if audio_reply:
+            speech = await self.stages.run('tts', self._synthesize, session, response)
+            if speech:
+                reply["audio"] = base64.b64encode(speech).decode()
+        return self._finish(reply, start)
+
+    def _finish(self, reply, start):
+        latency = time.perf_counter() - start
+        self.turns += 1
+        self.turn_latencies.append(latency)
+        reply["latency_ms"] = round(latency * 1000, 2)
+        return reply
+
+    @staticmethod
+    def _synthesize(session, text):
+        """Render speech to a private temp file and return its bytes"""
+        handle, path = tempfile.mkstemp(suffix=".mp3")
+        os.close(handle)
+        try:
+            generated = session.tts_generator.generate_speech(text, output_filename=os.path.abspath(path))
+            if not generated or not os.path.exists(generated):
+                return None
+            with open(generated, 'rb') as f:
+                return f.read()
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def stats(self):
+        latencies = list(self.turn_latencies)
+        return {
+            'sessions_open': len(self.sessions),
+            'sessions_opened': self.sessions_opened,
+            'turns': self.turns,
+            'errors': self.errors,
+            'p50_ms': round(percentile(latencies, 0.5) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'stages': self.stages.stats() if self.stages else {},
+            'llm': get_client().stats(),
+        }
+
+
+def main():
+    from main import VoiceBot
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--tts", action="store_true", help="Also load the TTS engine for audio_reply requests")
+    args = parser.parse_args()
+
+    bot = VoiceBot()
+    # Build the shared components once, before the first caller connects
+    components = ['db', 'intent_classifier', 'response_generator', 'transcriber'] + (['tts_generator'] if args.tts else [])
+    bot.warm_up(background=False, components=components)
+    server = ConversationServer(bot, host=args.host, port=args.port)
+    print(f"Serving on {args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        bot.cleanup()
+
+
+if __name__ == "__main__":
+    main()
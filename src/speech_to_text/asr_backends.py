@@ -0,0 +1,133 @@
+import hashlib
+import os
+import wave
+from config.config import LOCAL_ASR_MODEL
+from src.llm.client import LLMClient, get_client
+
+WHISPER_PROMPT = "Transcribe in Indian English, recognizing Indian names, places, and accents accurately."
+
+
+class ASRBackend:
+    """
+    Interface every speech recognition engine used by Transcriber implements.
+    Backends are rebuilt from (name, options) inside worker processes, so
+    options must be picklable.
+    """
+    name = None
+
+    def __init__(self, **options):
+        self.options = options
+
+    def transcribe(self, audio_file):
+        """Return the transcript for a binary WAV file object"""
+        raise NotImplementedError
+
+
+class OpenAIWhisperBackend(ASRBackend):
+    """Remote transcription through the OpenAI audio API"""
+    name = "openai"
+
+    def __init__(self, model="whisper-1", language="en", temperature=0.2, prompt=WHISPER_PROMPT, api_key=None,
+                 client=None):
+        super().__init__(model=model, language=language, temperature=temperature, prompt=prompt, api_key=api_key)
+        # The shared client unless this backend was given its own client or key
+        self.client = client or (LLMClient(api_key=api_key) if api_key else get_client())
+
+    def transcribe(self, audio_file):
+        response = self.client.transcribe(
+            audio_file,
+            model=self.options['model'],
+            response_format="text",
+            language=self.options['language'],  # Ensures English transcription
+            temperature=self.options['temperature'],  # Low randomness for accurate transcription
+            prompt=self.options['prompt']
+        )
+        return response
+
+
+class LocalWhisperBackend(ASRBackend):
+    """In-process Whisper model through the transformers ASR pipeline"""
+    name = "local"
+
+    def __init__(self, model=LOCAL_ASR_MODEL, device=-1):
+        super().__init__(model=model, device=device)
+        self._pipeline = None
+
+    def _load(self):
+        if self._pipeline is None:
+            from transformers import pipeline
+            self._pipeline = pipeline("automatic-speech-recognition",
+                                      model=self.options['model'],
+                                      device=self.options['device'])
+        return self._pipeline
+
+    @staticmethod
+    def _read_samples(audio_file):
+        """Decode a mono WAV file into float samples in [-1, 1]"""
+        import numpy as np
+        wf = wave.open(audio_file, 'rb')
+        try:
+            width = wf.getsampwidth()
+            rate = wf.getframerate()
+            data = wf.readframes(wf.getnframes())
+        finally:
+            wf.close()
+        if width == 4:
+            # AudioRecorder captures paFloat32
+            samples = np.frombuffer(data, dtype=np.float32)
+        elif width == 2:
+            samples = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+        else:
+            raise ValueError(f"Unsupported sample width: {width}")
+        return samples, rate
+
+    def transcribe(self, audio_file):
+        samples, rate = self._read_samples(audio_file)
+        result = self._load()({"raw": samples, "sampling_rate": rate})
+        return result["text"]
+
+
+class StubBackend(ASRBackend):
+    """
+    Deterministic offline backend for tests and benchmarks.
+    Looks the audio up by content hash, then by a sidecar .txt file next to
+    the recording, and otherwise returns `default_text`.
+    """
+    name = "stub"
+
+    def __init__(self, transcripts=None, default_text="check my balance"):
+        super().__init__(transcripts=transcripts or {}, default_text=default_text)
+
+    @staticmethod
+    def audio_key(data):
+        return hashlib.sha1(data).hexdigest()
+
+    def transcribe(self, audio_file):
+        data = audio_file.read()
+        transcript = self.options['transcripts'].get(self.audio_key(data))
+        if transcript is not None:
+            return transcript
+
+        name = getattr(audio_file, 'name', None)
+        if isinstance(name, str):
+            sidecar = os.path.splitext(name)[0] + ".txt"
+            if os.path.exists(sidecar):
+                with open(sidecar) as f:
+                    return f.read()
+        return self.options['default_text']
+
+
+BACKENDS = {
+    OpenAIWhisperBackend.name: OpenAIWhisperBackend,
+    LocalWhisperBackend.name: LocalWhisperBackend,
+    StubBackend.name: StubBackend,
+}
+
+
+def create_backend(name, **options):
+    """Build an ASR backend by its registered name"""
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown ASR backend '{name}'. Available: {', '.join(sorted(BACKENDS))}")
+    return backend_class(**options)
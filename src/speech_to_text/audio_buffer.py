@@ -0,0 +1,73 @@
+import io
+import wave
+
+
+class AudioBuffer:
+    """
+    Preallocated PCM buffer for one utterance.
+    Frames are copied into a single bytearray as they arrive, so the audio
+    can be handed to the transcriber as a memoryview or an in-memory WAV
+    without joining chunk lists or touching the disk.
+    """
+    def __init__(self, sample_rate=16000, channels=1, sample_width=4, capacity_s=15):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.bytes_per_second = sample_rate * channels * sample_width
+        self._data = bytearray(int(capacity_s * self.bytes_per_second))
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def capacity(self):
+        return len(self._data)
+
+    @property
+    def duration(self):
+        """Length of the buffered audio in seconds"""
+        return self._length / float(self.bytes_per_second)
+
+    def clear(self):
+        """Forget the buffered audio but keep the allocation"""
+        self._length = 0
+
+    def append(self, frame):
+        """Copy a chunk of raw PCM into the buffer, growing it only if it is full"""
+        end = self._length + len(frame)
+        if end > len(self._data):
+            self._data.extend(bytes(max(end - len(self._data), len(self._data))))
+        self._data[self._length:end] = frame
+        self._length = end
+
+    def extend(self, frames):
+        for frame in frames:
+            self.append(frame)
+
+    def view(self):
+        """Zero-copy view of the buffered PCM"""
+        return memoryview(self._data)[:self._length]
+
+    def _write_wav(self, target):
+        wf = wave.open(target, 'wb')
+        wf.setnchannels(self.channels)
+        wf.setsampwidth(self.sample_width)
+        wf.setframerate(self.sample_rate)
+        wf.writeframes(self.view())
+        wf.close()
+
+    def to_wav(self, name="recording.wav"):
+        """Return the audio as an in-memory WAV file object, ready to upload"""
+        wav_file = io.BytesIO()
+        self._write_wav(wav_file)
+        wav_file.seek(0)
+        # Upload APIs infer the format from the file name
+        wav_file.name = name
+        return wav_file
+
+    def save(self, filename):
+        """Persist the audio to a WAV file on disk"""
+        with open(filename, 'wb') as f:
+            self._write_wav(f)
+        return filename
@@ -1,7 +1,10 @@
 import pyaudio
-import wave
 import threading
 import time
+from collections import deque
+from config.config import VAD_PRE_ROLL_MS, VAD_MAX_DURATION_S
+from src.speech_to_text.audio_buffer import AudioBuffer
+from src.speech_to_text.vad import VoiceActivityDetector, SPEECH_START, SPEECH_END, MAX_DURATION, NO_SPEECH
 
 class AudioRecorder:
     def __init__(self):
@@ -10,19 +13,25 @@ class AudioRecorder:
         self.sample_rate = 16000
         self.chunk = 1024
         self.audio = pyaudio.PyAudio()
-        self.frames = []
+        # Sized for the longest utterance plus pre-roll so a turn never reallocates
+        self.buffer = AudioBuffer(
+            sample_rate=self.sample_rate,
+            channels=self.channels,
+            sample_width=self.audio.get_sample_size(self.audio_format),
+            capacity_s=VAD_MAX_DURATION_S + 1
+        )
         self.is_recording = False
 
     def start_recording(self):
         self.is_recording = True
-        self.frames = []
+        self.buffer.clear()
         threading.Thread(target=self._record).start()
 
     def stop_recording(self):
         self.is_recording = False
 
-    def _record(self):
-        stream = self.audio.open(
+    def _open_stream(self):
+        return self.audio.open(
             format=self.audio_format,
             channels=self.channels,
             rate=self.sample_rate,
@@ -30,17 +39,78 @@ class AudioRecorder:
             frames_per_buffer=self.chunk
         )
 
+    def _record(self):
+        stream = self._open_stream()
+
         while self.is_recording:
             data = stream.read(self.chunk)
-            self.frames.append(data)
+            self.buffer.append(data)
 
         stream.stop_stream()
         stream.close()
 
+    def create_detector(self, **overrides):
+        """Build a voice activity detector matching this recorder's stream format"""
+        return VoiceActivityDetector(sample_rate=self.sample_rate, frame_size=self.chunk, **overrides)
+
+    def record_utterance(self, trailing_silence_ms=None, max_duration_s=None, detector=None, on_speech_start=None):
+        """
+        Streaming capture: record until the caller stops talking.
+        Recording ends after `trailing_silence_ms` of silence following speech,
+        or after `max_duration_s`. Returns True if speech was captured.
+        on_speech_start is called as soon as speech is detected (used for barge-in).
+        """
+        if detector is None:
+            overrides = {}
+            if trailing_silence_ms is not None:
+                overrides['trailing_silence_ms'] = trailing_silence_ms
+            if max_duration_s is not None:
+                overrides['max_duration_s'] = max_duration_s
+            detector = self.create_detector(**overrides)
+
+        stream = self._open_stream()
+        self.is_recording = True
+        try:
+            return self.capture_frames(self._read_frames(stream), detector, on_speech_start)
+        finally:
+            self.is_recording = False
+            stream.stop_stream()
+            stream.close()
+
+    def _read_frames(self, stream):
+        while self.is_recording:
+            yield stream.read(self.chunk, exception_on_overflow=False)
+
+    def capture_frames(self, frame_source, detector, on_speech_start=None):
+        """
+        Run frames from any iterable through the detector and keep only the
+        utterance (plus a short pre-roll) in self.buffer.
+        """
+        self.buffer.clear()
+        detector.reset()
+        pre_roll = deque(maxlen=detector.ms_to_frames(VAD_PRE_ROLL_MS))
+
+        for frame in frame_source:
+            event = detector.process(frame)
+            if detector.triggered:
+                if pre_roll:
+                    self.buffer.extend(pre_roll)
+                    pre_roll.clear()
+                self.buffer.append(frame)
+            else:
+                pre_roll.append(frame)
+
+            if event == SPEECH_START and on_speech_start is not None:
+                on_speech_start()
+            if event in (SPEECH_END, MAX_DURATION, NO_SPEECH):
+                break
+
+        return detector.triggered
+
+    def get_audio(self):
+        """Return the last recording as an in-memory WAV file object"""
+        return self.buffer.to_wav()
+
     def save_audio(self, filename):
-        wf = wave.open(filename, 'wb')
-        wf.setnchannels(self.channels)
-        wf.setsampwidth(self.audio.get_sample_size(self.audio_format))
-        wf.setframerate(self.sample_rate)
-        wf.writeframes(b''.join(self.frames))
-        wf.close()
+        """Write the last recording to disk (only needed for auditing or debugging)"""
+        return self.buffer.save(filename)
@@ -1,28 +1,129 @@
-import openai
+import argparse
+import io
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
+from config.config import ASR_BACKEND, ASR_WORKERS
+from src.speech_to_text.asr_backends import create_backend
 
 load_dotenv()
 
+# Backend owned by each transcribe_many worker process
+_worker_backend = None
+
+
+def _as_audio_file(audio):
+    """
+    Accept a file path, an open/in-memory WAV file or raw WAV bytes.
+    Returns (file object, whether we opened it and must close it).
+    """
+    if isinstance(audio, (str, os.PathLike)):
+        return open(audio, "rb"), True
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        audio_file = io.BytesIO(audio)
+        audio_file.name = "recording.wav"
+        return audio_file, False
+    return audio, False
+
+
+def _run_backend(backend, audio):
+    """Transcribe one item and time it. Returns (transcript or None, seconds)"""
+    start = time.perf_counter()
+    audio_file, owned = _as_audio_file(audio)
+    try:
+        text = backend.transcribe(audio_file)
+    finally:
+        if owned:
+            audio_file.close()
+    return (text.strip() if text else None), time.perf_counter() - start
+
+
+def _init_worker(backend_name, options):
+    global _worker_backend
+    _worker_backend = create_backend(backend_name, **options)
+
+
+def _transcribe_in_worker(audio):
+    try:
+        return _run_backend(_worker_backend, audio)
+    except Exception as e:
+        print(f"Error during transcription: {str(e)}")
+        return None, 0.0
+
+
 class Transcriber:
-    def __init__(self):
-        self.api_key = os.getenv('OPENAI_API_KEY')
-        openai.api_key = self.api_key  
+    def __init__(self, backend=None):
+        """
+        backend: an ASRBackend instance or a registered backend name.
+        Defaults to config.ASR_BACKEND.
+        """
+        if backend is None or isinstance(backend, str):
+            backend = create_backend(backend or ASR_BACKEND)
+        self.backend = backend
+        self.last_latency = None
+        self.batch_latencies = []
 
-    def transcribe_audio(self, audio_file_path):
+    def transcribe_audio(self, audio):
         try:
-            with open(audio_file_path, "rb") as audio_file:
-                response = openai.audio.transcriptions.create(
-                    model="whisper-1",  # Best available model
-                    file=audio_file,
-                    response_format="text",
-                    language="en",  # Ensures English transcription
-                    temperature=0.2,  # Low randomness for accurate transcription
-                    prompt="Transcribe in Indian English, recognizing Indian names, places, and accents accurately."
-                )
-            
-            return response.strip()  # Return cleaned transcript
+            text, self.last_latency = _run_backend(self.backend, audio)
+            return text  # Return cleaned transcript
 
         except Exception as e:
             print(f"Error during transcription: {str(e)}")
             return None
+
+    def transcribe_many(self, paths_or_buffers, max_workers=ASR_WORKERS, chunksize=4):
+        """
+        Transcribe many recordings across a process pool.
+        Items may be file paths, WAV bytes or in-memory WAV files. Returns the
+        transcripts in input order (None for failures); per-item latencies are
+        kept in self.batch_latencies.
+        """
+        items = []
+        for item in paths_or_buffers:
+            if not isinstance(item, (str, os.PathLike, bytes)):
+                # File objects and memoryviews can't cross process boundaries
+                item = item.getvalue() if hasattr(item, 'getvalue') else bytes(item)
+            items.append(item)
+
+        if max_workers <= 1 or len(items) <= 1:
+            results = [self._transcribe_timed(item) for item in items]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     initializer=_init_worker,
+                                     initargs=(self.backend.name, self.backend.options)) as pool:
+                results = list(pool.map(_transcribe_in_worker, items, chunksize=chunksize))
+
+        self.batch_latencies = [latency for _, latency in results]
+        return [text for text, _ in results]
+
+    def _transcribe_timed(self, audio):
+        text = self.transcribe_audio(audio)
+        return text, self.last_latency or 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk transcribe recorded calls")
+    parser.add_argument("files", nargs="+", help="WAV files to transcribe")
+    parser.add_argument("--backend", default=ASR_BACKEND, help="ASR backend name (openai, local, stub)")
+    parser.add_argument("--workers", type=int, default=ASR_WORKERS, help="Worker processes")
+    args = parser.parse_args()
+
+    transcriber = Transcriber(args.backend)
+    start = time.perf_counter()
+    transcripts = transcriber.transcribe_many(args.files, max_workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    for path, text, latency in zip(args.files, transcripts, transcriber.batch_latencies):
+        print(f"{path}\t{latency * 1000:.0f} ms\t{text}")
+
+    latencies = sorted(transcriber.batch_latencies)
+    if latencies:
+        print(f"\n{len(latencies)} files in {elapsed:.2f}s "
+              f"(p50 {latencies[len(latencies) // 2] * 1000:.0f} ms, "
+              f"max {latencies[-1] * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import array
+import math
+from config.config import (
+    VAD_ENERGY_THRESHOLD,
+    VAD_NOISE_RATIO,
+    VAD_MIN_SPEECH_MS,
+    VAD_TRAILING_SILENCE_MS,
+    VAD_MAX_DURATION_S,
+    VAD_NO_SPEECH_TIMEOUT_S
+)
+
+# Events returned by VoiceActivityDetector.process
+SPEECH_START = "speech_start"
+SPEECH_END = "speech_end"
+MAX_DURATION = "max_duration"
+NO_SPEECH = "no_speech"
+
+
+def frame_energy(frame, typecode='f'):
+    """Return the RMS level of a raw PCM frame (float32 samples by default)"""
+    samples = array.array(typecode)
+    samples.frombytes(frame)
+    if not samples:
+        return 0.0
+    if typecode == 'h':
+        scale = 32768.0
+    else:
+        scale = 1.0
+    total = 0.0
+    for sample in samples:
+        total += sample * sample
+    return math.sqrt(total / len(samples)) / scale
+
+
+class VoiceActivityDetector:
+    """
+    Energy based speech start/end detector.
+    Feed it one frame at a time; it reports when speech starts and when
+    the caller has been quiet long enough for the turn to end.
+    """
+    def __init__(self, sample_rate=16000, frame_size=1024, typecode='f',
+                 energy_threshold=VAD_ENERGY_THRESHOLD,
+                 noise_ratio=VAD_NOISE_RATIO,
+                 min_speech_ms=VAD_MIN_SPEECH_MS,
+                 trailing_silence_ms=VAD_TRAILING_SILENCE_MS,
+                 max_duration_s=VAD_MAX_DURATION_S,
+                 no_speech_timeout_s=VAD_NO_SPEECH_TIMEOUT_S):
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.typecode = typecode
+        self.energy_threshold = energy_threshold
+        self.noise_ratio = noise_ratio
+        self.frame_ms = 1000.0 * frame_size / sample_rate
+
+        self.min_speech_frames = self.ms_to_frames(min_speech_ms)
+        self.trailing_silence_frames = self.ms_to_frames(trailing_silence_ms)
+        self.max_frames = self.ms_to_frames(max_duration_s * 1000) if max_duration_s else None
+        self.no_speech_frames = self.ms_to_frames(no_speech_timeout_s * 1000) if no_speech_timeout_s else None
+        self.reset()
+
+    def ms_to_frames(self, ms):
+        return max(1, int(math.ceil(ms / self.frame_ms)))
+
+    def reset(self):
+        """Prepare the detector for a new utterance"""
+        self.frame_count = 0
+        self.noise_floor = None
+        self.voiced_run = 0
+        self.silence_run = 0
+        self.triggered = False
+        self.ended = False
+        self.speech_start_frame = None
+        self.speech_end_frame = None
+
+    def threshold(self):
+        """Current speech threshold, adapted to the background noise"""
+        if self.noise_floor is None:
+            return self.energy_threshold
+        return max(self.energy_threshold, self.noise_floor * self.noise_ratio)
+
+    def is_speech(self, energy):
+        return energy >= self.threshold()
+
+    def _update_noise_floor(self, energy):
+        if self.noise_floor is None:
+            self.noise_floor = energy
+        else:
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * energy
+
+    def process(self, frame):
+        """
+        Process one frame of raw audio.
+        Returns one of the event constants, or None when nothing changed.
+        """
+        if self.ended:
+            return None
+
+        energy = frame_energy(frame, self.typecode)
+        index = self.frame_count
+        self.frame_count += 1
+        voiced = self.is_speech(energy)
+
+        if not self.triggered:
+            if voiced:
+                self.voiced_run += 1
+                if self.voiced_run >= self.min_speech_frames:
+                    self.triggered = True
+                    self.speech_start_frame = index - self.voiced_run + 1
+                    return SPEECH_START
+            else:
+                self.voiced_run = 0
+                self._update_noise_floor(energy)
+                if self.no_speech_frames and self.frame_count >= self.no_speech_frames:
+                    self.ended = True
+                    return NO_SPEECH
+        elif voiced:
+            self.silence_run = 0
+        else:
+            self.silence_run += 1
+            if self.silence_run >= self.trailing_silence_frames:
+                self.ended = True
+                self.speech_end_frame = index - self.silence_run + 1
+                return SPEECH_END
+
+        if self.max_frames and self.frame_count >= self.max_frames:
+            self.ended = True
+            if self.triggered:
+                self.speech_end_frame = self.frame_count
+            return MAX_DURATION
+        return None
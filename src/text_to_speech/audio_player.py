@@ -0,0 +1,53 @@
+import logging
+import time
+
+
+class AudioPlayer:
+    """
+    Plays audio files through pygame's mixer, imported on first use.
+    `available` is False when pygame or an audio device is missing, in
+    which case callers speak through the TTS engine instead.
+    """
+    def __init__(self, poll_s=0.01):
+        self.poll_s = poll_s
+        self._mixer = None
+        self._channel = None
+        self._failed = False
+
+    @property
+    def available(self):
+        return self._load() is not None
+
+    def _load(self):
+        if self._mixer is None and not self._failed:
+            try:
+                import pygame
+                pygame.mixer.init()
+                self._mixer = pygame.mixer
+            except Exception as e:
+                self._failed = True
+                logging.error(f"Audio playback unavailable, speaking through the TTS engine: {str(e)}")
+        return self._mixer
+
+    def play(self, path, cancel_event=None):
+        """Play a file to the end; returns False if cancel_event stopped it"""
+        self.start(path)
+        return self.wait(cancel_event)
+
+    def start(self, path):
+        """Start playing a file and return at once"""
+        self._channel = self._load().Sound(path).play()
+
+    def wait(self, cancel_event=None):
+        """Block until playback ends; returns False if cancel_event stopped it"""
+        while self._channel is not None and self._channel.get_busy():
+            if cancel_event is not None and cancel_event.is_set():
+                self.stop()
+                return False
+            time.sleep(self.poll_s)
+        return True
+
+    def stop(self):
+        channel = self._channel
+        if channel is not None:
+            channel.stop()
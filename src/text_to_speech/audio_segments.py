@@ -0,0 +1,67 @@
+import wave
+import numpy as np
+
+
+def read_wav(path):
+    """Return (params, int16 samples shaped (frames, channels))"""
+    with wave.open(path, 'rb') as f:
+        params = f.getparams()
+        if params.sampwidth != 2:
+            raise ValueError(f"{path}: only 16-bit PCM can be joined, got {params.sampwidth * 8}-bit")
+        samples = np.frombuffer(f.readframes(params.nframes), dtype=np.int16)
+    return params, samples.reshape(-1, params.nchannels)
+
+
+def write_wav(path, params, samples):
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(params.nchannels)
+        f.setsampwidth(params.sampwidth)
+        f.setframerate(params.framerate)
+        f.writeframes(np.ascontiguousarray(samples, dtype=np.int16).tobytes())
+
+
+def trim_silence(samples, threshold, keep_frames=0):
+    """Drop leading and trailing frames quieter than threshold, keeping a little padding"""
+    loud = np.flatnonzero(np.abs(samples).max(axis=1) > threshold)
+    if not len(loud):
+        return samples[:0]
+    start = max(loud[0] - keep_frames, 0)
+    end = min(loud[-1] + 1 + keep_frames, len(samples))
+    return samples[start:end]
+
+
+def crossfade_concat(segments, fade_frames):
+    """Join segments end to end, overlapping each seam by fade_frames with a linear crossfade"""
+    segments = [segment for segment in segments if len(segment)]
+    if not segments:
+        return np.zeros((0, 1), dtype=np.int16)
+    out = segments[0].astype(np.float32)
+    for segment in segments[1:]:
+        segment = segment.astype(np.float32)
+        fade = min(fade_frames, len(out), len(segment))
+        if fade:
+            ramp = np.linspace(0.0, 1.0, fade, dtype=np.float32)[:, None]
+            seam = out[-fade:] * (1.0 - ramp) + segment[:fade] * ramp
+            out = np.concatenate([out[:-fade], seam, segment[fade:]])
+        else:
+            out = np.concatenate([out, segment])
+    return np.clip(out, -32768, 32767).astype(np.int16)
+
+
+def join_wavs(paths, output_path, crossfade_ms=15, silence_threshold=300, padding_ms=20):
+    """
+    Concatenate rendered segments into one WAV: trim each segment's
+    silence, then crossfade the seams. All inputs must share one format.
+    """
+    params, parts = None, []
+    for path in paths:
+        segment_params, samples = read_wav(path)
+        if params is None:
+            params = segment_params
+        elif (segment_params.nchannels, segment_params.framerate) != (params.nchannels, params.framerate):
+            raise ValueError(f"{path}: format differs from the other segments")
+        padding = int(params.framerate * padding_ms / 1000)
+        parts.append(trim_silence(samples, silence_threshold, keep_frames=padding))
+    fade_frames = int(params.framerate * crossfade_ms / 1000)
+    write_wav(output_path, params, crossfade_concat(parts, fade_frames))
+    return output_path
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from config.config import TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES
+
+INDEX_FILE = "index.json"
+
+
+def speech_key(text, voice, rate, volume):
+    """Content address of one rendered phrase; any voice setting change is a new key"""
+    payload = json.dumps([" ".join(text.split()), voice, rate, volume])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class SpeechCache:
+    """
+    Rendered speech on disk, one WAV per (text, voice, rate, volume),
+    bounded by total size with least-recently-played eviction. index.json
+    records each entry's size and last use so the LRU order survives
+    restarts; files missing from disk are dropped when it is loaded. Only
+    the hashed key is stored, never the text, and callers only put fixed
+    wording in here, never customer data.
+    """
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES, extension=".wav"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self._entries = OrderedDict()   # key -> {"bytes", "last_used"}, least recent first
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def path(self, key):
+        return os.path.join(self.directory, key + self.extension)
+
+    def _load_index(self):
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        try:
+            with open(index_path) as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.error(f"Ignoring unreadable speech cache index: {str(e)}")
+            return
+        for key, entry in sorted(entries.items(), key=lambda item: item[1].get("last_used", 0)):
+            if os.path.exists(self.path(key)):
+                entry.pop("text", None)     # Written by older versions
+                self._entries[key] = entry
+                self._dirty = True
+                self.total_bytes += entry.get("bytes", 0)
+
+    def _save_index(self):
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        tmp_path = f"{index_path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, index_path)
+        self._dirty = False
+
+    def get(self, key):
+        """Path of the cached audio, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not os.path.exists(self.path(key)):
+                if entry is not None:
+                    self._forget(key)
+                self.misses += 1
+                return None
+            entry["last_used"] = time.time()
+            self._entries.move_to_end(key)
+            self._dirty = True
+            self.hits += 1
+            return self.path(key)
+
+    def put(self, key, render):
+        """
+        render(path) writes the audio for `key` to path; the result is
+        moved into the cache atomically. Returns the cached path or None.
+        """
+        tmp_path = os.path.join(self.directory, f"{key}.{uuid.uuid4().hex[:8]}.tmp{self.extension}")
+        try:
+            render(tmp_path)
+            if not os.path.exists(tmp_path) or os.path.getsize(tmp_path) == 0:
+                return None
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, self.path(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)["bytes"]
+            self._entries[key] = {"bytes": size, "last_used": time.time()}
+            self.total_bytes += size
+            self._evict(keep=key)
+            self._save_index()
+        return self.path(key)
+
+    def _evict(self, keep=None):
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep:
+                break
+            self._forget(key)
+            self.evictions += 1
+
+    def _forget(self, key):
+        entry = self._entries.pop(key)
+        self.total_bytes -= entry["bytes"]
+        self._dirty = True
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def flush(self):
+        """Write out LRU order changed by hits since the last put"""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._forget(key)
+            self._save_index()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+            }
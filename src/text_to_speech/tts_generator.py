@@ -1,13 +1,86 @@
 import pyttsx3
+import logging
 import os
+import re
+import shutil
+import tempfile
+import threading
 import time
-from config.config import AUDIO_OUTPUT_DIR
+import uuid
+from config.config import (AUDIO_OUTPUT_DIR, TTS_CACHE_ENABLED, TTS_SEGMENTED, TTS_CROSSFADE_MS,
+                           TTS_SILENCE_THRESHOLD, TTS_SLOT_PATTERNS)
+from src.text_to_speech.audio_player import AudioPlayer
+from src.text_to_speech.speech_cache import SpeechCache, speech_key
+
+# Sentence ends and line breaks, so list-style replies are spoken line by line
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\s*\n\s*")
+# Numbers and amounts ("$1,250.00", "3") are slots in any reply
+_NUMBER_SLOT = re.compile(r"\$?\d[\d,]*(?:\.\d+)?")
+_SLOT_PATTERNS = [re.compile(pattern) for pattern in TTS_SLOT_PATTERNS]
+# More slots than this and joining costs more than it saves
+MAX_SLOTS = 2
+
+
+def split_sentences(text):
+    """The units speech is rendered, cached and interrupted in"""
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text) if sentence.strip()]
+
+
+def segment_sentence(sentence, max_slots=MAX_SLOTS):
+    """
+    Split a sentence into [(is_slot, text)]: fixed wording, which is
+    cached and reused, and slots (amounts, counts, names) rendered per
+    reply. "Your current balance is $42.10" ->
+    [(False, "Your current balance is"), (True, "$42.10")].
+    Sentences without slots, or with too many, come back whole.
+    """
+    spans = [match.span() for match in _NUMBER_SLOT.finditer(sentence)]
+    for pattern in _SLOT_PATTERNS:
+        spans += [match.span('slot') for match in pattern.finditer(sentence)]
+    spans = sorted(set(spans))
+    if not spans or len(spans) > max_slots or any(a[1] > b[0] for a, b in zip(spans, spans[1:])):
+        return [(False, sentence)]
+    segments = []
+    position = 0
+    for start, end in spans + [(len(sentence), len(sentence))]:
+        fixed = sentence[position:start].strip()
+        if fixed and not any(char.isalnum() for char in fixed) and segments:
+            # Stray punctuation such as ")" rides along with the slot before it
+            segments[-1] = (True, segments[-1][1] + fixed)
+        elif fixed:
+            segments.append((False, fixed))
+        if start < end:
+            segments.append((True, sentence[start:end]))
+        position = end
+    return segments
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
 
 class TTSGenerator:
-    def __init__(self):
-        self.engine = pyttsx3.init()
+    def __init__(self, engine=None, cache=None, player=None, segmented=TTS_SEGMENTED):
+        """
+        cache: a SpeechCache of fixed phrases, filled by prerender(); those
+        play straight from disk, everything else is spoken directly and
+        never written out.
+        player: plays cached files; without a working one, speech goes
+        through the engine as before.
+        segmented: speak templated replies as their cached fixed segments
+        joined with slots rendered for the occasion.
+        """
+        self.engine = engine or pyttsx3.init()
+        # pyttsx3 is not thread-safe: warm-up pre-renders while turns are spoken
+        self._engine_lock = threading.RLock()
         self.setup_voice_settings()
         self.setup_output_directory()
+        self.cache = cache if cache is not None else (SpeechCache() if TTS_CACHE_ENABLED else None)
+        self.player = player or AudioPlayer()
+        self.segmented = segmented
 
     def setup_voice_settings(self):
         """Configure voice settings"""
@@ -34,29 +107,187 @@ class TTSGenerator:
         try:
             # Generate unique filename if not provided
             if output_filename is None:
-                output_filename = f"speech_{int(time.time())}.mp3"
+                output_filename = f"speech_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.mp3"
 
             # The full path where we'll save the audio file
             output_path = os.path.join(AUDIO_OUTPUT_DIR, output_filename)
 
-            # Speak and save to file
-            self.engine.save_to_file(text, output_path)
-            self.engine.runAndWait()
+            # Copy fixed phrases from the cache
+            cached = self.cached(text)
+            if cached:
+                shutil.copyfile(cached, output_path)
+                return output_path
 
+            # Speak and save to file
+            self._synthesize(text, output_path)
             return output_path
 
         except Exception as e:
             print(f"Error generating speech: {str(e)}")
             return None
 
-    def speak_text(self, text):
+    def cache_key(self, text):
+        return speech_key(text, self.engine.getProperty('voice'), self.engine.getProperty('rate'),
+                          self.engine.getProperty('volume'))
+
+    def _synthesize(self, text, path):
+        with self._engine_lock:
+            self.engine.save_to_file(text, path)
+            self.engine.runAndWait()
+
+    def _say(self, text):
+        with self._engine_lock:
+            self.engine.say(text)
+            self.engine.runAndWait()
+
+    def cached(self, text):
+        """Path of the cached audio for `text`, or None"""
+        if self.cache is None:
+            return None
+        return self.cache.get(self.cache_key(text))
+
+    def render(self, text):
+        """Render a fixed phrase into the cache (if not there yet); returns its path"""
+        if self.cache is None:
+            return None
+        key = self.cache_key(text)
+        path = self.cache.get(key)
+        if path is None:
+            path = self.cache.put(key, lambda tmp_path: self._synthesize(text, tmp_path))
+        return path
+
+    def prerender(self, texts):
         """
-        Speak the text directly without saving
+        Render fixed phrases ahead of time, split as they will be spoken;
+        for templates such as "Successfully deposited $0.00" only the fixed
+        wording is rendered.
         """
+        if self.cache is None:
+            return 0
+        rendered = 0
+        for text in texts:
+            for sentence in split_sentences(text):
+                segments = segment_sentence(sentence)
+                if len(segments) > 1 and not self.segmented:
+                    # Templates are spoken directly, their examples are of no use
+                    continue
+                for is_slot, part in segments:
+                    if not is_slot and self.cache_key(part) not in self.cache:
+                        rendered += self.render(part) is not None
+        return rendered
+
+    def render_utterance(self, sentence):
+        """
+        Audio for one sentence as (path, temporary): a cached fixed phrase,
+        or a template whose fixed wording was pre-rendered, joined with its
+        slots (amounts, names) into a temporary file with crossfades. The
+        caller deletes temporary files once played; slots never reach the
+        cache. (None, False) when the sentence should be spoken directly.
+        """
+        if self.cache is None:
+            return None, False
+        path = self.cache.get(self.cache_key(sentence))
+        if path:
+            return path, False
+        if not self.segmented:
+            return None, False
+        segments = segment_sentence(sentence)
+        if len(segments) < 2:
+            return None, False
+        fixed = {part: self.cached(part) for is_slot, part in segments if not is_slot}
+        if not all(fixed.values()):
+            # Only wording that prerender() put in the cache is reused
+            return None, False
+        from src.text_to_speech.audio_segments import join_wavs
+        slot_paths = []
+        output_path = None
         try:
-            self.engine.say(text)
-            self.engine.runAndWait()
-            return True
+            parts = []
+            for is_slot, part in segments:
+                if is_slot:
+                    slot_paths.append(self._temporary_wav())
+                    self._synthesize(part, slot_paths[-1])
+                    parts.append(slot_paths[-1])
+                else:
+                    parts.append(fixed[part])
+            output_path = self._temporary_wav()
+            join_wavs(parts, output_path, crossfade_ms=TTS_CROSSFADE_MS, silence_threshold=TTS_SILENCE_THRESHOLD)
+            return output_path, True
+        except Exception as e:
+            logging.error(f"Speaking a templated sentence whole instead of in segments: {str(e)}")
+            if output_path:
+                _remove(output_path)
+            return None, False
+        finally:
+            for slot_path in slot_paths:
+                _remove(slot_path)
+
+    @staticmethod
+    def _temporary_wav():
+        handle, path = tempfile.mkstemp(prefix="tts_", suffix=".wav")
+        os.close(handle)
+        return path
+
+    def speak_text(self, text, cancel_event=None):
+        """
+        Speak the text without saving it, one sentence at a time; cached
+        fixed phrases play from disk. Stops early once cancel_event is set
+        (barge-in). Returns False if cut short.
+        """
+        try:
+            return self.speak_sentences(split_sentences(text), cancel_event)
         except Exception as e:
             print(f"Error speaking text: {str(e)}")
             return False
+
+    def speak_sentences(self, sentences, cancel_event=None):
+        """
+        Speak each sentence as soon as the iterable yields it, e.g. a reply
+        still streaming in from the LLM. Items holding several sentences (a
+        whole command result) are split, so fixed phrases play from the
+        cache. While one sentence plays from disk the next is rendered, so
+        long replies start at once and play without gaps. Returns False if
+        cancelled.
+        """
+        temporaries = []
+        try:
+            playing = False
+            for sentence in (part for item in sentences for part in split_sentences(item)):
+                if cancel_event is not None and cancel_event.is_set():
+                    return False
+                path, temporary = self.render_utterance(sentence) if self.player.available else (None, False)
+                if temporary:
+                    temporaries.append(path)
+                if playing and not self.player.wait(cancel_event):
+                    return False
+                playing = False
+                if path:
+                    self.player.start(path)
+                    playing = True
+                else:
+                    self._say(sentence)
+            if playing and not self.player.wait(cancel_event):
+                return False
+            return cancel_event is None or not cancel_event.is_set()
+        except Exception as e:
+            print(f"Error speaking text: {str(e)}")
+            return False
+        finally:
+            # Joined sentences hold amounts and names; they are played once and deleted
+            for path in temporaries:
+                _remove(path)
+
+    def stop(self):
+        """
+        Cut off audio playing from the cache. Safe from any thread: the
+        engine is left alone (pyttsx3 is not thread-safe), so a sentence it
+        is speaking runs to its end and cancel_event stops the next one.
+        """
+        try:
+            self.player.stop()
+        except Exception as e:
+            print(f"Error stopping speech: {str(e)}")
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.flush()
@@ -26,10 +26,8 @@ class CommandHandler:
             if not transactions:
                 return "No recent transactions found."
             
-            response = "Recent transactions:\n"
-            for trans in transactions:
-                response += f"- {trans[0]}: ${trans[1]:.2f} on {trans[2]}\n"
-            return response
+            lines = [f"- {trans[0]}: ${trans[1]:.2f} on {trans[2]}" for trans in transactions]
+            return "Recent transactions:\n" + "\n".join(lines) + "\n"
         
         elif cmd == 'exit':
             raise KeyboardInterrupt
@@ -0,0 +1,195 @@
+"""
+Local stand-in for the OpenAI chat completions endpoint, for tests and
+benchmarks that must not touch the network.
+
+Serves POST /v1/chat/completions on a background thread. Non-streaming
+requests get one chat.completion after the whole reply's delay; with
+"stream": true the reply is sent as server-sent chat.completion.chunk
+events, one word each, ending with "data: [DONE]".
+POST /v1/audio/transcriptions answers every upload with `transcript`.
+Failures and slow responses can be scripted to exercise client timeouts,
+retries and hedging.
+"""
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = ("Sure, I can help with that. Your account is in good standing. "
+                 "Is there anything else you would like to know today?")
+
+
+class FakeLLMServer:
+    """
+    reply: text or callable(messages) -> text
+    first_token_s: delay before the first token (model time-to-first-token)
+    token_s: delay between tokens
+    prompt_token_s: extra first-token delay per prompt token (~4 characters),
+    so longer prompts answer more slowly
+    failures: HTTP status codes returned, in order, by the next requests
+    extra_delay: callable(request_number) -> seconds added to that request,
+    e.g. to make every tenth request a slow outlier
+    """
+    def __init__(self, reply=DEFAULT_REPLY, first_token_s=0.0, token_s=0.0, prompt_token_s=0.0,
+                 failures=(), extra_delay=None, transcript="hello", host="127.0.0.1", port=0):
+        self.reply = reply
+        self.first_token_s = first_token_s
+        self.token_s = token_s
+        self.prompt_token_s = prompt_token_s
+        self.failures = list(failures)
+        self.extra_delay = extra_delay
+        self.transcript = transcript
+        self.requests = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def client(self, **kwargs):
+        """An LLMClient pointed at this server; kwargs override its limits"""
+        from src.llm.client import LLMClient
+        return LLMClient(base_url=self.base_url, api_key="test", **kwargs)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reply_for(self, messages):
+        return self.reply(messages) if callable(self.reply) else self.reply
+
+    def prefill_s(self, messages, number=0):
+        characters = sum(len(message.get("content") or "") for message in messages)
+        extra = self.extra_delay(number) if self.extra_delay else 0.0
+        return self.first_token_s + self.prompt_token_s * characters / 4 + extra
+
+    def _begin(self, body):
+        """Register a request; returns (request number, scripted failure status or None)"""
+        with self._lock:
+            self.requests.append(body)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return len(self.requests) - 1, (self.failures.pop(0) if self.failures else None)
+
+    def _end(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def tokens(self, text):
+        """Word-sized tokens that join back to `text`"""
+        return re.findall(r"\S+\s*", text)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                path = self.path.rstrip("/")
+                if not path.endswith(("/chat/completions", "/audio/transcriptions")):
+                    self.send_error(404)
+                    return
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                transcription = path.endswith("/audio/transcriptions")
+                body = {"upload_bytes": len(raw)} if transcription else json.loads(raw or b"{}")
+                number, failure = server._begin(body)
+                try:
+                    if failure:
+                        self._send_json({"error": {"message": f"scripted failure {failure}", "type": "server_error"}},
+                                        status=failure)
+                    elif transcription:
+                        time.sleep(server.prefill_s([], number))
+                        self._send_text(server.transcript)
+                    elif body.get("stream"):
+                        self._stream(body, number)
+                    else:
+                        tokens = server.tokens(server.reply_for(body.get("messages", [])))
+                        delay = server.prefill_s(body.get("messages", []), number)
+                        time.sleep(delay + server.token_s * max(len(tokens) - 1, 0))
+                        self._send_json(self._completion(body, "".join(tokens)))
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    server._end()
+
+            def _completion(self, body, text):
+                return {
+                    "id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion",
+                    "created": int(time.time()), "model": body.get("model", "fake"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": text}}],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                }
+
+            def _send_text(self, text):
+                data = text.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_json(self, payload, status=200):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, body, number):
+                tokens = server.tokens(server.reply_for(body.get("messages", [])))
+                chunk_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+
+                def event(delta, finish_reason=None):
+                    chunk = {"id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                             "model": body.get("model", "fake"),
+                             "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+
+                try:
+                    time.sleep(server.prefill_s(body.get("messages", []), number))
+                    event({"role": "assistant", "content": ""})
+                    for i, token in enumerate(tokens):
+                        if i:
+                            time.sleep(server.token_s)
+                        event({"content": token})
+                    event({}, "stop")
+                    self.wfile.write(b"data: [DONE]\n\n")
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                self.close_connection = True
+
+        return Handler
@@ -0,0 +1,122 @@
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from config.config import PIPELINE_QUEUE_SIZE
+
+_STOP = object()
+
+
+class PipelineStage:
+    """One worker thread draining a bounded queue into `handler`"""
+    def __init__(self, name, handler, downstream=(), maxsize=PIPELINE_QUEUE_SIZE):
+        self.name = name
+        self.handler = handler
+        self.downstream = list(downstream)
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.thread = None
+        self.busy = False
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.last_s = 0.0
+
+
+class TurnPipeline:
+    """
+    Runs a conversation turn through named stages, each on its own thread,
+    connected by bounded queues so a slow stage pushes back on the ones
+    before it instead of piling up work. A stage may feed several others
+    (e.g. speech output and logging run side by side).
+    A handler returns the item to pass on, or None to stop it there.
+    """
+    def __init__(self, maxsize=PIPELINE_QUEUE_SIZE):
+        self.maxsize = maxsize
+        self.stages = OrderedDict()
+        self._lock = threading.Lock()
+        self._started = False
+
+    def add_stage(self, name, handler, downstream=()):
+        self.stages[name] = PipelineStage(name, handler, downstream, self.maxsize)
+        return self
+
+    def start(self):
+        for stage in self.stages.values():
+            for name in stage.downstream:
+                if name not in self.stages:
+                    raise ValueError(f"Stage {stage.name!r} feeds unknown stage {name!r}")
+            stage.thread = threading.Thread(target=self._work, args=(stage,), name=f"pipeline-{stage.name}",
+                                            daemon=True)
+            stage.thread.start()
+        self._started = True
+        return self
+
+    def submit(self, item, stage=None, timeout=None):
+        """Hand an item to a stage (the first by default); blocks while that queue is full"""
+        target = self.stages[stage] if stage else next(iter(self.stages.values()))
+        target.queue.put(item, timeout=timeout)
+
+    def stop(self, timeout=5.0):
+        """Let queued items finish, then stop every worker, upstream stages first"""
+        if not self._started:
+            return
+        for stage in self.stages.values():
+            stage.queue.put(_STOP)
+            stage.thread.join(timeout)
+        self._started = False
+
+    def _work(self, stage):
+        while True:
+            item = stage.queue.get()
+            if item is _STOP:
+                return
+            stage.busy = True
+            start = time.perf_counter()
+            try:
+                result = stage.handler(item)
+            except Exception as e:
+                result = None
+                with self._lock:
+                    stage.errors += 1
+                logging.error(f"Pipeline stage {stage.name} failed: {str(e)}")
+            finally:
+                elapsed = time.perf_counter() - start
+                stage.busy = False
+                with self._lock:
+                    stage.processed += 1
+                    stage.total_s += elapsed
+                    stage.last_s = elapsed
+                    stage.max_s = max(stage.max_s, elapsed)
+            if result is None:
+                with self._lock:
+                    stage.dropped += 1
+                continue
+            for name in stage.downstream:
+                self.stages[name].queue.put(result)
+
+    def stats(self):
+        with self._lock:
+            return OrderedDict(
+                (stage.name, {
+                    'depth': stage.queue.qsize(),
+                    'busy': stage.busy,
+                    'processed': stage.processed,
+                    'dropped': stage.dropped,
+                    'errors': stage.errors,
+                    'mean_ms': round(stage.total_s / stage.processed * 1000, 2) if stage.processed else 0.0,
+                    'max_ms': round(stage.max_s * 1000, 2),
+                    'last_ms': round(stage.last_s * 1000, 2),
+                })
+                for stage in self.stages.values()
+            )
+
+    def report(self):
+        """Return the per-stage counters as a printable table"""
+        lines = [f"{'stage':<12}{'depth':>7}{'done':>7}{'dropped':>9}{'errors':>8}{'mean ms':>10}{'max ms':>10}"]
+        for name, stats in self.stats().items():
+            lines.append(f"{name:<12}{stats['depth']:>7}{stats['processed']:>7}{stats['dropped']:>9}"
+                         f"{stats['errors']:>8}{stats['mean_ms']:>10.1f}{stats['max_ms']:>10.1f}")
+        return "\n".join(lines)
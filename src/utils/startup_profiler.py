@@ -0,0 +1,51 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Collects import/init/warm-up timings per component for the startup report"""
+    PHASES = ("import", "init", "warm-up")
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.started_at = time.perf_counter()
+        self.timings = OrderedDict()
+        self.errors = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, component, phase):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                phases = self.timings.setdefault(component, {})
+                phases[phase] = phases.get(phase, 0.0) + elapsed
+
+    def record_error(self, component, error):
+        with self._lock:
+            self.errors[component] = str(error)
+
+    def report(self):
+        """Return the timings as a printable table"""
+        lines = ["Startup profile (seconds)",
+                 f"{'component':<22}" + "".join(f"{phase:>10}" for phase in self.PHASES) + f"{'total':>10}"]
+        with self._lock:
+            items = list(self.timings.items())
+        for component, phases in items:
+            row = f"{component:<22}"
+            for phase in self.PHASES:
+                row += f"{phases[phase]:>10.3f}" if phase in phases else f"{'-':>10}"
+            row += f"{sum(phases.values()):>10.3f}"
+            lines.append(row)
+        lines.append(f"{'wall clock':<22}{time.perf_counter() - self.started_at:>{10 * (len(self.PHASES) + 1)}.3f}")
+        for component, error in self.errors.items():
+            lines.append(f"FAILED {component}: {error}")
+        return "\n".join(lines)
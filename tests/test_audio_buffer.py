@@ -0,0 +1,57 @@
+import os
+import wave
+from src.speech_to_text.audio_buffer import AudioBuffer
+
+RECORDING = os.path.join(os.path.dirname(os.path.dirname(__file__)), "test_recording.wav")
+
+
+def load_frames(chunk=1024):
+    with wave.open(RECORDING, 'rb') as wf:
+        rate = wf.getframerate()
+        data = wf.readframes(wf.getnframes())
+    step = chunk * 4
+    return rate, [data[i:i + step] for i in range(0, len(data), step)]
+
+
+def test_wav_round_trip_in_memory():
+    rate, frames = load_frames()
+    buffer = AudioBuffer(sample_rate=rate, sample_width=4, capacity_s=5)
+    buffer.extend(frames)
+
+    wav_file = buffer.to_wav()
+    assert wav_file.name.endswith(".wav")
+    with wave.open(wav_file, 'rb') as wf:
+        assert wf.getframerate() == rate
+        assert wf.getsampwidth() == 4
+        assert wf.readframes(wf.getnframes()) == b''.join(frames)
+
+
+def test_append_does_not_reallocate_within_capacity():
+    rate, frames = load_frames()
+    buffer = AudioBuffer(sample_rate=rate, sample_width=4, capacity_s=5)
+    capacity = buffer.capacity
+    buffer.extend(frames)
+    assert buffer.capacity == capacity
+    assert abs(buffer.duration - len(frames) * 1024 / float(rate)) < 1e-9
+
+    buffer.clear()
+    assert len(buffer) == 0
+    assert bytes(buffer.view()) == b''
+    assert buffer.capacity == capacity
+
+
+def test_grows_past_capacity():
+    buffer = AudioBuffer(sample_rate=100, sample_width=1, capacity_s=1)
+    buffer.append(b'\x01' * 80)
+    buffer.append(b'\x02' * 80)
+    assert len(buffer) == 160
+    assert bytes(buffer.view()) == b'\x01' * 80 + b'\x02' * 80
+
+
+def test_save_matches_source_recording(tmp_path):
+    rate, frames = load_frames()
+    buffer = AudioBuffer(sample_rate=rate, sample_width=4)
+    buffer.extend(frames)
+    path = buffer.save(str(tmp_path / "audit.wav"))
+    with wave.open(path, 'rb') as saved, wave.open(RECORDING, 'rb') as original:
+        assert saved.readframes(saved.getnframes()) == original.readframes(len(frames) * 1024)
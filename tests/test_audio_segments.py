@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from src.text_to_speech.audio_segments import crossfade_concat, join_wavs, read_wav, trim_silence, write_wav
+
+PARAMS = SimpleNamespace(nchannels=1, sampwidth=2, framerate=8000)
+
+
+def tone(frames, level=10000):
+    return np.full((frames, 1), level, dtype=np.int16)
+
+
+def silence(frames):
+    return np.zeros((frames, 1), dtype=np.int16)
+
+
+def test_trim_silence_keeps_padding():
+    samples = np.concatenate([silence(100), tone(50), silence(100)])
+    assert len(trim_silence(samples, threshold=300)) == 50
+    assert len(trim_silence(samples, threshold=300, keep_frames=10)) == 70
+    assert len(trim_silence(silence(100), threshold=300)) == 0
+
+
+def test_crossfade_overlaps_each_seam():
+    joined = crossfade_concat([tone(100), tone(80, level=-10000), tone(60)], fade_frames=20)
+    assert len(joined) == 100 + 80 + 60 - 2 * 20
+    # The seam ramps from one segment's level to the next
+    seam = joined[80:100, 0]
+    assert seam[0] > 9000 and seam[-1] < -9000
+    assert np.all(np.diff(seam.astype(int)) <= 0)
+
+
+def test_join_wavs_round_trip(tmp_path):
+    paths = []
+    for i, frames in enumerate([200, 120]):
+        path = str(tmp_path / f"{i}.wav")
+        write_wav(path, PARAMS, np.concatenate([silence(300), tone(frames), silence(300)]))
+        paths.append(path)
+    output = join_wavs(paths, str(tmp_path / "joined.wav"), crossfade_ms=5, padding_ms=0)
+    params, samples = read_wav(output)
+    assert params.framerate == 8000
+    assert len(samples) == 200 + 120 - 40
+
+
+def test_join_wavs_rejects_mixed_formats(tmp_path):
+    write_wav(str(tmp_path / "a.wav"), PARAMS, tone(10))
+    write_wav(str(tmp_path / "b.wav"), SimpleNamespace(nchannels=1, sampwidth=2, framerate=16000), tone(10))
+    with pytest.raises(ValueError):
+        join_wavs([str(tmp_path / "a.wav"), str(tmp_path / "b.wav")], str(tmp_path / "out.wav"))
@@ -0,0 +1,130 @@
+import io
+import json
+import pytest
+from src.database.bulk_io import chunked, detect_format, read_rows
+from src.database.db_manager import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "bank.db"))
+    yield manager
+    manager.close()
+
+
+def test_detect_format():
+    assert detect_format("users.csv") == 'csv'
+    assert detect_format("ledger.ndjson") == 'jsonl'
+    assert detect_format(io.StringIO(), 'JSONL') == 'jsonl'
+    with pytest.raises(ValueError):
+        detect_format("ledger.xlsx")
+
+
+def test_chunked_is_lazy():
+    def numbers():
+        for i in range(10):
+            yield i
+            assert i < 4, "read past the first chunk"
+
+    assert next(chunked(numbers(), 4)) == [0, 1, 2, 3]
+
+
+def test_read_rows_reports_bad_json():
+    with pytest.raises(ValueError, match="line 2"):
+        list(read_rows(io.StringIO('{"a": 1}\n{oops\n'), 'jsonl'))
+
+
+def test_import_users_from_csv(db, tmp_path):
+    path = tmp_path / "users.csv"
+    path.write_text("username,balance\njohn,10.50\npriya,0\ndemo_user,5\n,3\n")
+    report = db.bulk_import_users(str(path), chunk_size=2)
+    assert (report['rows'], report['skipped']) == (2, 2)
+    assert report['rows_per_sec'] > 0
+    assert db.get_user_by_username('john')['account_balance'] == 10.5
+    assert db.get_balance(1) == 1000.0
+
+
+def test_import_users_skips_negative_and_non_finite_balances(db):
+    source = io.StringIO("username,balance\nneg,-5\nhuge,1e309\nnan,nan\nkiran,12\n")
+    report = db.bulk_import_users(source, fmt='csv', chunk_size=2)
+    assert (report['rows'], report['skipped']) == (1, 3)
+    assert not db.username_exists('neg')
+    assert db.get_user_by_username('kiran')['account_balance'] == 12.0
+
+
+def test_import_transactions_updates_balances(db):
+    db.create_user('john', 100.0)
+    lines = [
+        {"username": "john", "transaction_type": "deposit", "amount": "25.10", "timestamp": "2024-01-02 10:00:00"},
+        {"username": "john", "transaction_type": "withdrawal", "amount": 5},
+        {"user_id": 1, "transaction_type": "Deposit", "amount": 0.3},
+        {"username": "ghost", "transaction_type": "deposit", "amount": 1},
+        {"username": "john", "transaction_type": "deposit", "amount": "lots"},
+    ]
+    source = io.StringIO("".join(json.dumps(line) + "\n" for line in lines))
+    report = db.bulk_import_transactions(source, fmt='jsonl', chunk_size=2)
+    assert (report['rows'], report['skipped']) == (3, 2)
+    assert db.get_user_by_username('john')['account_balance'] == 120.1
+    assert db.get_balance(1) == 1000.3
+    assert ('deposit', 25.1, '2024-01-02 10:00:00') in db.get_transactions(db.get_user_id('john'))
+
+
+def test_import_skips_unknown_users_types_overdrafts_and_non_objects(db):
+    db.create_user('john', 10.0)
+    source = io.StringIO(
+        '{"user_id": 999, "transaction_type": "deposit", "amount": 5}\n'
+        '{"user_id": 1, "transaction_type": "refund", "amount": 5}\n'
+        '{"username": "john", "transaction_type": "withdrawal", "amount": 8}\n'
+        '{"username": "john", "transaction_type": "withdrawal", "amount": 8}\n'
+        '{"username": "john", "transaction_type": "transfer_to_bob", "amount": -2}\n'
+        '[1]\n"x"\n')
+    report = db.bulk_import_transactions(source, fmt='jsonl', chunk_size=3)
+    assert (report['rows'], report['skipped']) == (2, 5)
+    assert db.get_user_by_username('john')['account_balance'] == 0.0
+    assert db.get_balance(1) == 1000.0
+    assert db.get_transactions(999) == []
+
+
+def test_non_finite_amounts_are_skipped_without_aborting_the_import(db):
+    source = io.StringIO("user_id,transaction_type,amount\n1,deposit,5\n1,deposit,inf\n1,deposit,1e309\n1,deposit,7\n")
+    report = db.bulk_import_transactions(source, fmt='csv', chunk_size=1)
+    assert (report['rows'], report['skipped']) == (2, 2)
+    assert db.get_balance(1) == 1012.0
+
+
+def test_import_without_applying_balances(db):
+    source = io.StringIO("user_id,transaction_type,amount\n1,deposit,50\n")
+    db.bulk_import_transactions(source, fmt='csv', apply_to_balances=False)
+    assert db.get_balance(1) == 1000.0
+    assert len(db.get_transactions(1)) == 1
+
+
+@pytest.mark.parametrize("fmt", ['csv', 'jsonl'])
+def test_export_round_trip(db, tmp_path, fmt):
+    db.create_user('john', 40.0)
+    db.add_transaction(1, 'deposit', 12.34)
+    db.add_transaction(1, 'withdrawal', 2.0)
+    db.transfer_money('demo_user', 'john', 7.5)
+    users_file, ledger_file = tmp_path / f"users.{fmt}", tmp_path / f"ledger.{fmt}"
+    assert db.export_users(str(users_file), chunk_size=1) == 2
+    assert db.export_transactions(str(ledger_file), chunk_size=1) == 4
+
+    copy = DatabaseManager(str(tmp_path / "copy.db"))
+    try:
+        copy.bulk_import_users(str(users_file))
+        copy.bulk_import_transactions(str(ledger_file), apply_to_balances=False)
+        # demo_user is seeded in every database, so only john's balance comes from the file
+        assert copy.get_user_by_username('john')['account_balance'] == 47.5
+        for username in ('demo_user', 'john'):
+            original, restored = db.get_user_by_username(username), copy.get_user_by_username(username)
+            assert db.get_transactions(original['user_id']) == copy.get_transactions(restored['user_id'])
+    finally:
+        copy.close()
+
+
+def test_export_one_user(db, tmp_path):
+    db.create_user('john', 40.0)
+    db.transfer_money('demo_user', 'john', 7.5)
+    out = io.StringIO()
+    assert db.export_transactions(out, fmt='jsonl', user_id=db.get_user_id('john')) == 1
+    assert json.loads(out.getvalue())['transaction_type'] == 'transfer_from_demo_user'
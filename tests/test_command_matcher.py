@@ -0,0 +1,85 @@
+import pytest
+from src.nlp_processing.command_matcher import CommandMatcher
+
+# Same keywords as VoiceBot.commands
+COMMANDS = ['change user', 'this is', 'balance', 'transaction', 'help', 'deposit',
+            'withdraw', 'create', 'transfer', 'send', 'spend', 'spent', 'total deposit']
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return CommandMatcher.from_sources(COMMANDS)
+
+
+@pytest.mark.parametrize("text, command, intent", [
+    # Plain commands
+    ("What's my balance?", 'balance', 'balance_inquiry'),
+    ("Show my transactions", 'transaction', 'transaction_history'),
+    ("Show help", 'help', 'help'),
+    ("Deposit $100", 'deposit', 'deposit'),
+    ("Withdraw $50", 'withdraw', 'withdraw'),
+    ("I'd like to make a withdrawal of 20 dollars", 'withdraw', 'withdraw'),
+    ("How many withdrawals did I make", 'withdraw', 'withdraw'),
+    ("List the deposits made today", 'deposit', 'deposit'),
+    ("Create user John", 'create', 'create'),
+    ("Transfer $100 to John", 'transfer', 'transfer'),
+    ("Send $100 to John", 'send', 'send'),
+    ("Change user to Priya", 'change user', 'current_user'),
+    ("This is Rahul", 'this is', 'current_user'),
+    ("Hi, this is Rahul", 'this is', 'current_user'),
+    ("um, this is John", 'this is', 'current_user'),
+    ("Uh, hi, this is John", 'this is', 'current_user'),
+    ("I transferred 5 to Bob", 'transfer', 'transfer'),
+    ("Transferring 20 to Ana", 'transfer', 'transfer'),
+    ("Sending 10 to John", 'send', 'send'),
+    # Conflicts resolved by priority, not dictionary order
+    ("Transfer my whole balance to John", 'transfer', 'transfer'),
+    ("Send the transaction receipt and my balance", 'send', 'send'),
+    ("Can you help me transfer 20 to Ana", 'transfer', 'transfer'),
+    ("Create a user called Dev and deposit 50", 'create', 'create'),
+    ("Change user, this is Meera", 'change user', 'current_user'),
+    ("Deposit 100, I want to spend it later", 'deposit', 'deposit'),
+    ("Withdraw 40, I spent too much", 'withdraw', 'withdraw'),
+    # Statement questions
+    ("How much did I spend this month", 'spend', 'transaction_history'),
+    ("Total deposits last week", 'total deposit', 'transaction_history'),
+    ("What's my balance and what did I spend", 'spend', 'transaction_history'),
+    # Ties go to the earliest keyword
+    ("Show my transactions and my balance", 'transaction', 'transaction_history'),
+    ("Balance and transactions please", 'balance', 'balance_inquiry'),
+    # Intent-only patterns from IntentClassifier.command_patterns
+    ("Show all users", None, 'show_users'),
+    ("please list users", None, 'show_users'),
+    ("show all users with their balance", None, 'show_users'),
+])
+def test_resolves_command(matcher, text, command, intent):
+    match = matcher.match(text)
+    assert match is not None
+    assert (match.command, match.intent) == (command, intent)
+
+
+@pytest.mark.parametrize("text", [
+    "Hello there",
+    "Good morning, how are you?",
+    "What is this about",           # "this is" only counts at the start
+    "I was wondering whether this is right",
+    "Um, what is this",
+    "Tell me a joke about a sender",  # no inflection match for "send"
+    "A creative writing prompt",      # "create" needs a whole word
+    "Unhelpful answer",               # keywords must start on a word boundary
+    "",
+])
+def test_no_command(matcher, text):
+    assert matcher.match(text) is None
+
+
+def test_find_all_reports_every_keyword_in_order(matcher):
+    found = matcher.find_all("Deposit 10, then check my balance and send 5 to Ana")
+    assert [m.command for m in found] == ['deposit', 'balance', 'send']
+    assert [m.start for m in found] == sorted(m.start for m in found)
+
+
+def test_custom_priorities():
+    matcher = CommandMatcher.from_sources(['balance', 'help'], command_patterns={},
+                                          priorities={'help': 5, 'balance': 1})
+    assert matcher.match("balance help").command == 'help'
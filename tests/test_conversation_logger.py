@@ -0,0 +1,137 @@
+import threading
+import pytest
+from src.database.conversation_logger import ConversationLogger
+from src.database.db_manager import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "bank.db"))
+    yield manager
+    manager.close()
+
+
+def count_rows(db):
+    return db.pool.connection().execute('SELECT COUNT(*) FROM conversation_history').fetchone()[0]
+
+
+def test_rows_are_written_on_flush(db):
+    for i in range(10):
+        db.log_conversation(1, f"hello {i}", "hi", "greeting", 0.9)
+    assert db.flush_conversations(timeout=5)
+    assert count_rows(db) == 10
+    assert db.conversation_logger.stats()['written'] == 10
+
+
+def test_rows_are_grouped_into_batches(db):
+    logger = ConversationLogger(db.pool, batch_size=25, flush_interval_s=60)
+    try:
+        for i in range(100):
+            logger.log(1, "hello", "hi", "greeting", 0.9)
+        logger.flush(timeout=5)
+        stats = logger.stats()
+        assert stats['written'] == 100
+        assert stats['batches'] <= 5
+    finally:
+        logger.close()
+
+
+def test_interval_commits_partial_batch(db):
+    logger = ConversationLogger(db.pool, batch_size=1000, flush_interval_s=0.05)
+    try:
+        logger.log(1, "hello", "hi", "greeting", 0.9)
+        for _ in range(100):
+            if logger.stats()['written']:
+                break
+            threading.Event().wait(0.02)
+        assert logger.stats()['written'] == 1
+    finally:
+        logger.close()
+
+
+def test_close_writes_pending_rows(tmp_path):
+    db = DatabaseManager(str(tmp_path / "bank.db"))
+    for i in range(5):
+        db.log_conversation(1, "hello", "hi", "greeting", 0.9)
+    db.close()
+    reopened = DatabaseManager(str(tmp_path / "bank.db"))
+    try:
+        assert count_rows(reopened) == 5
+    finally:
+        reopened.close()
+
+
+def test_full_queue_drops_and_counts(db):
+    logger = ConversationLogger(db.pool, max_queue=2, batch_size=1, enqueue_timeout_s=0.01)
+    # Hold the write lock so the writer thread stalls on its first batch
+    release = threading.Event()
+    locked = threading.Event()
+
+    def hold_lock():
+        with db.pool.transaction():
+            locked.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    locked.wait(5)
+    try:
+        results = [logger.log(1, "hello", "hi", "greeting", 0.9) for _ in range(20)]
+        assert not all(results)
+        assert logger.stats()['dropped'] == results.count(False)
+    finally:
+        release.set()
+        holder.join()
+        logger.close()
+
+
+def test_logging_after_close_is_dropped(db):
+    logger = ConversationLogger(db.pool)
+    logger.close()
+    assert not logger.log(1, "hello", "hi", "greeting", 0.9)
+    assert logger.stats()['dropped'] == 1
+
+
+def test_rows_logged_while_closing_are_written_or_counted(db):
+    logger = ConversationLogger(db.pool, batch_size=7)
+    start = threading.Event()
+    results = []
+
+    def log_rows():
+        start.wait(5)
+        for _ in range(200):
+            results.append(logger.log(1, "hello", "hi", "greeting", 0.9))
+
+    threads = [threading.Thread(target=log_rows) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    start.set()
+    assert logger.close()
+    for thread in threads:
+        thread.join()
+    stats = logger.stats()
+    assert stats['written'] == results.count(True) == count_rows(db)
+    assert stats['dropped'] == results.count(False)
+
+
+def test_close_reports_a_writer_that_is_still_committing(db):
+    logger = ConversationLogger(db.pool, batch_size=1)
+    release = threading.Event()
+    locked = threading.Event()
+
+    def hold_lock():
+        with db.pool.transaction():
+            locked.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    locked.wait(5)
+    logger.log(1, "hello", "hi", "greeting", 0.9)
+    try:
+        assert logger.close(timeout=0.05) is False
+    finally:
+        release.set()
+        holder.join()
+    assert logger.close() is True
+    assert count_rows(db) == 1
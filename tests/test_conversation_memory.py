@@ -0,0 +1,75 @@
+from src.response_gen.conversation_memory import ConversationMemory, fold_summary, SUMMARY_PREFIX
+
+
+def words(text):
+    """One token per word keeps the arithmetic readable"""
+    return len(text.split())
+
+
+def message(role, text):
+    return {"role": role, "content": text}
+
+
+def test_keeps_messages_within_the_token_budget():
+    memory = ConversationMemory(max_tokens=20, summary_tokens=0, counter=words)
+    for i in range(5):
+        memory.append(message("user", f"short turn {i}"))      # 3 words + 4 overhead
+
+    assert len(memory) == 2
+    assert memory.tokens == 14
+    assert [m["content"] for m in memory] == ["short turn 3", "short turn 4"]
+    assert memory.evicted == 3
+
+
+def test_one_long_reply_pushes_out_several_short_turns():
+    memory = ConversationMemory(max_tokens=60, summary_tokens=0, counter=words)
+    for i in range(4):
+        memory.append(message("user", f"hi {i}"))
+    memory.append(message("assistant", " ".join(["word"] * 50)))
+    assert len(memory) == 2
+    assert memory[0] == message("user", "hi 3")
+
+
+def test_newest_message_is_kept_even_over_budget():
+    memory = ConversationMemory(max_tokens=5, summary_tokens=0, counter=words)
+    memory.append(message("user", "this one message is longer than the whole budget"))
+    assert len(memory) == 1
+
+
+def test_message_cap_applies_to_short_messages():
+    memory = ConversationMemory(max_tokens=1000, max_messages=3, summary_tokens=0, counter=words)
+    for i in range(5):
+        memory.append(message("user", str(i)))
+    assert [m["content"] for m in memory[:]] == ["2", "3", "4"]
+
+
+def test_evicted_turns_are_folded_into_the_summary():
+    memory = ConversationMemory(max_tokens=20, summary_tokens=50, counter=words)
+    memory.append(message("user", "My name is Ann. I have two accounts."))
+    memory.append(message("assistant", "Nice to meet you, Ann! How can I help?"))
+    memory.append(message("user", "What is a wire transfer?"))
+
+    prompt = list(memory)
+    assert prompt[0]["role"] == "system"
+    assert prompt[0]["content"].startswith(SUMMARY_PREFIX)
+    assert "User: My name is Ann." in memory.summary
+    assert "Assistant: Nice to meet you, Ann!" in memory.summary
+    assert prompt[-1] == message("user", "What is a wire transfer?")
+    assert memory.prompt_tokens() > memory.tokens
+
+
+def test_summary_is_bounded_and_drops_its_oldest_lines():
+    summary = ""
+    for i in range(20):
+        summary = fold_summary(summary, [message("user", f"question number {i} about fees.")], 30, counter=words)
+    assert words(summary) <= 30
+    assert summary.splitlines()[-1] == "User: question number 19 about fees."
+
+
+def test_clear_forgets_messages_and_summary():
+    memory = ConversationMemory(max_tokens=10, counter=words)
+    for i in range(4):
+        memory.append(message("user", f"turn {i}"))
+    memory.clear()
+    assert list(memory) == []
+    assert memory.prompt_tokens() == 0
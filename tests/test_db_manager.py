@@ -0,0 +1,273 @@
+import sqlite3
+import threading
+import pytest
+from src.database.db_manager import DatabaseManager
+from src.database.user_cache import UserCache
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "bank.db"))
+    yield manager
+    manager.close()
+
+
+def test_uses_wal_journal(db):
+    assert db.pool.connection().execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+
+def test_deposit_and_withdrawal(db):
+    assert db.add_transaction(1, 'deposit', 50.0)
+    assert db.add_transaction(1, 'withdrawal', 25.0)
+    assert db.get_balance(1) == 1025.0
+    assert not db.add_transaction(1, 'withdrawal', 5000.0)
+    assert sorted(row[0] for row in db.get_transactions(1)) == ['deposit', 'withdrawal']
+
+
+def test_transfer_between_users(db):
+    db.create_user('john', 10.0)
+    assert db.transfer_money('demo_user', 'john', 100.0) == "Transfer successful"
+    assert db.get_user_by_username('john')['account_balance'] == 110.0
+    assert db.get_balance(1) == 900.0
+    assert db.transfer_money('demo_user', 'nobody', 1.0) == "One or both users not found"
+    assert db.transfer_money('john', 'demo_user', 500.0) == "Insufficient balance for transfer"
+
+
+def test_duplicate_user_is_rejected(db):
+    assert db.create_user('john') is not None
+    assert db.create_user('john') is None
+    assert sorted(db.get_all_usernames()) == ['demo_user', 'john']
+
+
+def test_failed_transaction_rolls_back(db):
+    with pytest.raises(RuntimeError):
+        with db.pool.transaction() as conn:
+            conn.execute("UPDATE users SET balance_cents = 0 WHERE user_id = 1")
+            raise RuntimeError("boom")
+    assert db.get_balance(1) == 1000.0
+
+
+def test_reader_is_not_blocked_by_open_writer(db):
+    started, release = threading.Event(), threading.Event()
+
+    def writer():
+        with db.pool.transaction() as conn:
+            conn.execute("UPDATE users SET balance_cents = 0 WHERE user_id = 1")
+            started.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    started.wait(5)
+    try:
+        # WAL readers see the last committed state while the write is in flight
+        assert db.get_balance(1) == 1000.0
+    finally:
+        release.set()
+        thread.join()
+    # The raw UPDATE bypassed the manager, so its cache doesn't know about it
+    db.user_cache.clear()
+    assert db.get_balance(1) == 0.0
+
+
+def test_concurrent_deposits_from_many_threads(db):
+    errors = []
+
+    def deposit():
+        try:
+            for _ in range(25):
+                assert db.add_transaction(1, 'deposit', 1.0)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=deposit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert db.get_balance(1) == 1200.0
+    assert len(db.pool._connections) == 9
+
+
+def test_closed_pool_refuses_new_connections(db):
+    db.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        db.pool.connection()
+
+
+def test_balances_are_stored_as_integer_cents(db):
+    db.create_user('john')
+    for _ in range(10):
+        assert db.add_transaction(1, 'deposit', 0.1)
+    assert db.get_balance(1) == 1001.0
+    row = db.pool.connection().execute('SELECT balance_cents, typeof(balance_cents) FROM users WHERE user_id = 1').fetchone()
+    assert row == (100100, 'integer')
+    assert db.transfer_money('demo_user', 'john', 0.29) == "Transfer successful"
+    assert db.get_user_by_username('john')['account_balance'] == 0.29
+
+
+def test_rejects_non_positive_amounts(db):
+    assert not db.add_transaction(1, 'withdrawal', -50.0)
+    assert not db.add_transaction(1, 'deposit', 0)
+    db.create_user('john')
+    assert db.transfer_money('demo_user', 'john', -5.0) == "Invalid transfer amount"
+    assert db.get_balance(1) == 1000.0
+
+
+def test_migrates_real_dollar_schema(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE users (user_id INTEGER PRIMARY KEY, username TEXT UNIQUE NOT NULL, account_balance REAL DEFAULT 0.0);
+        CREATE TABLE transactions (transaction_id INTEGER PRIMARY KEY, user_id INTEGER, transaction_type TEXT NOT NULL,
+                                   amount REAL NOT NULL, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP);
+        INSERT INTO users VALUES (1, 'demo_user', 1000.0), (2, 'john', 12.345000001);
+        INSERT INTO transactions (user_id, transaction_type, amount) VALUES (2, 'deposit', 0.1), (2, 'deposit', 0.2);
+    ''')
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(path)
+    try:
+        assert db.get_user_by_username('john') == {"user_id": 2, "username": 'john', "account_balance": 12.35}
+        assert sorted(row[1] for row in db.get_transactions(2)) == [0.1, 0.2]
+        assert db.add_transaction(2, 'withdrawal', 12.35)
+        assert db.get_balance(2) == 0.0
+    finally:
+        db.close()
+
+
+def test_concurrent_withdrawals_and_transfers_lose_no_updates(tmp_path):
+    path = str(tmp_path / "stress.db")
+    # Two managers stand in for two processes sharing the ledger
+    managers = [DatabaseManager(path, user_cache=UserCache(enabled=False)) for _ in range(2)]
+    users = ['alice', 'bob', 'carol']
+    for username in users:
+        managers[0].create_user(username, 100.0)
+    successes = []
+    lock = threading.Lock()
+
+    def worker(index):
+        db = managers[index % 2]
+        ok = 0
+        for step in range(40):
+            if step % 2:
+                ok += db.add_transaction(1, 'withdrawal', 7.0)
+            else:
+                sender, receiver = users[(index + step) % 3], users[(index + step + 1) % 3]
+                db.transfer_money(sender, receiver, 13.0)
+        with lock:
+            successes.append(ok)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    db = managers[0]
+    withdrawn = sum(successes)
+    # demo_user can only fund 142 withdrawals of $7; the guard must stop the rest
+    assert withdrawn == 142
+    assert db.get_balance(1) == 1000.0 - 7.0 * withdrawn
+    balances = [db.get_user_by_username(username)['account_balance'] for username in users]
+    assert sum(balances) == 300.0
+    assert min(balances) >= 0
+    # Every balance change has exactly one matching ledger row
+    ledger = db.pool.connection().execute('''
+        SELECT u.balance_cents, COALESCE(SUM(t.amount_cents), 0) FROM users u
+        LEFT JOIN transactions t ON t.user_id = u.user_id WHERE u.username != 'demo_user' GROUP BY u.user_id
+    ''').fetchall()
+    assert all(balance == 10000 + total for balance, total in ledger)
+    for manager in managers:
+        manager.close()
+
+
+@pytest.fixture
+def history(db):
+    rows = [(1, 'deposit' if i % 3 else 'withdrawal', 100 + i, f"2024-01-{1 + i // 10:02d} 12:00:00")
+            for i in range(95)]
+    with db.pool.transaction() as conn:
+        conn.executemany('INSERT INTO transactions (user_id, transaction_type, amount_cents, timestamp) '
+                         'VALUES (?, ?, ?, ?)', rows)
+    return db
+
+
+def test_iter_transactions_walks_every_row_in_stable_order(history):
+    rows = list(history.iter_transactions(1, page_size=7))
+    assert len(rows) == 95
+    keys = [(row.timestamp, row.transaction_id) for row in rows]
+    assert keys == sorted(keys, reverse=True)
+    assert len(set(keys)) == 95
+
+
+def test_iter_transactions_is_lazy_and_resumable(history):
+    walker = history.iter_transactions(1, page_size=10)
+    first_page = [next(walker) for _ in range(10)]
+    # Resume from the last row seen, as a paging client would
+    rest = list(history.iter_transactions(1, before=first_page[-1], page_size=10))
+    assert first_page + rest == list(history.iter_transactions(1, page_size=50))
+    resumed = list(history.iter_transactions(1, before=(first_page[-1].timestamp, first_page[-1].transaction_id)))
+    assert resumed == rest
+
+
+def test_iter_transactions_filters_by_type_and_time(history):
+    withdrawals = list(history.iter_transactions(1, transaction_type='withdrawal', page_size=4))
+    assert len(withdrawals) == 32
+    assert {row.transaction_type for row in withdrawals} == {'withdrawal'}
+    older = list(history.iter_transactions(1, before="2024-01-02 00:00:00"))
+    assert len(older) == 10
+
+
+def test_get_transactions_keeps_tuple_shape(history):
+    recent = history.get_transactions(1, limit=3)
+    assert len(recent) == 3
+    assert recent[0] == ('deposit', 1.94, '2024-01-10 12:00:00')
+
+
+def test_keyset_page_uses_index_without_sorting(db):
+    plan = " ".join(row[-1] for row in db.pool.connection().execute('''
+        EXPLAIN QUERY PLAN SELECT transaction_type, amount_cents, timestamp, transaction_id FROM transactions
+        WHERE user_id = ? AND (timestamp, transaction_id) < (?, ?)
+        ORDER BY timestamp DESC, transaction_id DESC LIMIT ?''', (1, '2024', 5, 10)))
+    assert "idx_transactions_user_time" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_user_lookups_are_cached_and_invalidated_by_writes(db):
+    db.create_user('john', 5.0)
+    assert db.get_user_by_username('john')['account_balance'] == 5.0
+    hits = db.user_cache.hits
+    assert db.get_user_by_username('john')['account_balance'] == 5.0
+    assert db.get_balance(db.get_user_id('john')) == 5.0
+    assert db.user_cache.hits > hits
+
+    db.transfer_money('demo_user', 'john', 2.0)
+    assert db.get_user_by_username('john')['account_balance'] == 7.0
+    assert db.get_balance(1) == 998.0
+    db.add_transaction(1, 'deposit', 1.0)
+    assert db.get_balance(1) == 999.0
+    assert db.user_cache.stats()['invalidations'] >= 2
+
+
+def test_username_exists(db):
+    assert db.username_exists('demo_user')
+    assert not db.username_exists('ghost')
+    db.create_user('ghost')
+    assert db.username_exists('ghost')
+
+
+def test_disabled_cache_always_reads_the_database(tmp_path):
+    path = str(tmp_path / "bank.db")
+    first = DatabaseManager(path, user_cache=UserCache(enabled=False))
+    second = DatabaseManager(path, user_cache=UserCache(enabled=False))
+    try:
+        assert first.get_balance(1) == 1000.0
+        second.add_transaction(1, 'deposit', 1.0)
+        assert first.get_balance(1) == 1001.0
+        assert first.user_cache.stats()['hits'] == 0
+    finally:
+        first.close()
+        second.close()
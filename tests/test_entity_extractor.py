@@ -0,0 +1,101 @@
+from datetime import date
+import pytest
+from src.nlp_processing.entity_extractor import EntityExtractor, UserIndex, parse_amount, parse_period, soundex
+
+USERS = ['john', 'priya', 'rahul', 'meera', 'demo_user', 'arjun', 'anand', 'ana']
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return EntityExtractor(UserIndex(USERS))
+
+
+@pytest.mark.parametrize("text, amount", [
+    ("Deposit $100", 100.0),
+    ("Transfer $1,200.50 to John", 1200.5),
+    ("send fifty dollars to priya", 50.0),
+    ("send two hundred and fifty rupees to rahul", 250.0),
+    ("give meera twenty dollars and fifty cents", 20.5),
+    ("transfer 2.5k to arjun", 2500.0),
+    ("pay 1.5 lakh to arjun", 150000.0),
+    ("send a hundred bucks to john", 100.0),
+    ("transfer seventy five cents to ana", 0.75),
+    ("send one thousand two hundred to john", 1200.0),
+    ("withdraw twelve point five dollars", 12.5),
+    ("Rs. 500 to rahul", 500.0),
+    ("₹750 to priya", 750.0),
+])
+def test_parse_amount(text, amount):
+    parsed, confidence = parse_amount(text)
+    assert parsed == amount
+    assert confidence >= 0.7
+
+
+def test_parse_amount_without_number():
+    assert parse_amount("send money to john") == (None, 0.0)
+
+
+def test_ambiguous_amounts_have_low_confidence():
+    _, confidence = parse_amount("send 2 payments of 50 to john")
+    assert confidence < 0.7
+
+
+def test_soundex():
+    assert soundex("Rahul") == soundex("Raahul") == "R400"
+    assert soundex("Priya") == soundex("Preeya")
+    assert soundex("Robert") == "R163"
+
+
+@pytest.mark.parametrize("text, username", [
+    ("this is john", 'john'),
+    ("Hi, this is Meera", 'meera'),
+    ("this is demo user", 'demo_user'),
+    ("change user to priya", 'priya'),
+    ("this is raahul", 'rahul'),       # phonetic
+    ("this is preeya", 'priya'),       # phonetic
+    ("this is jon", 'john'),           # fuzzy
+    ("this is arj", 'arjun'),          # unique prefix
+])
+def test_extract_username(extractor, text, username):
+    result = extractor.extract_username(text)
+    assert result['username'] == username
+    assert result['confidence'] >= 0.7
+
+
+def test_ambiguous_prefix_is_not_guessed(extractor):
+    # Two-letter fragments like "an" (ana? anand?) are never trusted
+    result = extractor.extract_username("this is an")
+    assert result['confidence'] < 0.7
+
+
+def test_unknown_user_has_no_confidence(extractor):
+    assert extractor.extract_username("send 10 to zebedee") == {'username': None, 'confidence': 0.0, 'exact': False}
+
+
+def test_extract_transfer(extractor):
+    assert extractor.extract_transfer("Send $100 to John") == {
+        'username': 'john', 'amount': 100.0, 'confidence': 0.95, 'exact': True}
+    result = extractor.extract_transfer("give meara ten dollars")
+    assert (result['username'], result['amount'], result['exact']) == ('meera', 10.0, False)
+
+
+def test_index_add():
+    index = UserIndex(['john'])
+    assert 'kiran' not in index
+    index.add('kiran')
+    assert 'kiran' in index
+    assert index.resolve('Kiran') == ('kiran', 1.0)
+    assert len(index) == 2
+
+
+@pytest.mark.parametrize("text, start, end", [
+    ("how much did I spend this month", date(2024, 3, 1), date(2024, 3, 13)),
+    ("what did I spend last month", date(2024, 2, 1), date(2024, 2, 29)),
+    ("total deposits last week", date(2024, 3, 4), date(2024, 3, 10)),
+    ("spent this week", date(2024, 3, 11), date(2024, 3, 13)),
+    ("spending in the past thirty days", date(2024, 2, 13), date(2024, 3, 13)),
+    ("spent yesterday", date(2024, 3, 12), date(2024, 3, 12)),
+    ("how much did I spend", date(2024, 3, 1), date(2024, 3, 13)),
+])
+def test_parse_period(text, start, end):
+    assert parse_period(text, today=date(2024, 3, 13))[:2] == (start, end)
@@ -0,0 +1,106 @@
+import threading
+import pytest
+from src.nlp_processing.intent_cache import IntentCache, normalize_text, labels_fingerprint
+
+RESULT = {'intent': 'balance_inquiry', 'confidence': 0.9, 'all_intents': {'balance_inquiry': 0.9}}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("What's my balance?", "whats my balance"),
+    ("  um,  WHAT'S   my balance ", "whats my balance"),
+    ("Please show my transactions.", "show my transactions"),
+    ("Deposit $12.50 please", "deposit $12.50"),
+    ("uh... okay", ""),
+])
+def test_normalize_text(text, expected):
+    assert normalize_text(text) == expected
+
+
+def test_hit_and_miss_on_normalized_key():
+    cache = IntentCache(max_size=10, ttl_seconds=60)
+    assert cache.get("what's my balance") is None
+    cache.put("what's my balance", RESULT)
+
+    assert cache.get("Um, What's my balance?") == RESULT
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+    assert stats['hit_rate'] == 0.5
+
+
+def test_returned_results_are_copies():
+    cache = IntentCache()
+    cache.put("help", RESULT)
+    cache.get("help")['all_intents']['help'] = 1.0
+    assert cache.get("help") == RESULT
+
+
+def test_lru_eviction():
+    cache = IntentCache(max_size=2, ttl_seconds=None)
+    cache.put("one", RESULT)
+    cache.put("two", RESULT)
+    cache.get("one")
+    cache.put("three", RESULT)
+
+    assert cache.get("two") is None
+    assert cache.get("one") is not None
+    assert cache.get("three") is not None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = IntentCache(ttl_seconds=10, clock=clock)
+    cache.put("help", RESULT)
+    clock.now = 9.9
+    assert cache.get("help") is not None
+    clock.now = 10.0
+    assert cache.get("help") is None
+    assert cache.stats()['expirations'] == 1
+    assert len(cache) == 0
+
+
+def test_label_change_invalidates():
+    intents = ["greeting", "help"]
+    descriptions = {"greeting": "say hello", "help": "request assistance"}
+    cache = IntentCache()
+    old = labels_fingerprint(intents, descriptions)
+    cache.set_fingerprint(old)
+    cache.put("hello", RESULT, old)
+
+    descriptions["help"] = "ask for help"
+    new = labels_fingerprint(intents, descriptions)
+    assert new != old
+    cache.set_fingerprint(new)
+    assert cache.get("hello") is None
+
+    # Results computed against the old labels are not stored
+    cache.put("hello", RESULT, old)
+    assert len(cache) == 0
+
+
+def test_concurrent_access():
+    cache = IntentCache(max_size=50)
+
+    def worker(offset):
+        for i in range(500):
+            key = f"phrase {(i + offset) % 80}"
+            if cache.get(key) is None:
+                cache.put(key, RESULT)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert stats['size'] <= 50
+    assert stats['hits'] + stats['misses'] == 8 * 500
@@ -0,0 +1,117 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from config.config import CANDIDATE_INTENTS
+from src.nlp_processing.intent_classifier import IntentClassifier
+
+BOS, PAD, EOS = 0, 1, 2
+
+
+class FakeTokenizer:
+    """Word-level tokenizer with BART style pair encoding"""
+    pad_token_id = PAD
+    model_max_length = 1024
+
+    def __init__(self):
+        self.vocab = {}
+
+    def encode(self, text, add_special_tokens=True):
+        words = text.lower().replace(".", " ").replace("'", " ").split()
+        return [self.vocab.setdefault(word, len(self.vocab) + 10) for word in words]
+
+    def build_inputs_with_special_tokens(self, first, second):
+        return [BOS] + first + [EOS, EOS] + second + [EOS]
+
+
+class FakeConfig:
+    label2id = {"contradiction": 0, "neutral": 1, "entailment": 2}
+
+
+class FakeOutput:
+    def __init__(self, logits):
+        self.logits = logits
+
+
+class FakeNLIModel:
+    """Entailment logit = number of words shared by premise and hypothesis"""
+    config = FakeConfig()
+
+    def __init__(self):
+        self.calls = []
+
+    def eval(self):
+        return self
+
+    def __call__(self, input_ids, attention_mask):
+        self.calls.append(tuple(input_ids.shape))
+        logits = torch.zeros((input_ids.shape[0], 3))
+        for i, row in enumerate(input_ids.tolist()):
+            row = row[:int(attention_mask[i].sum())]
+            split = row.index(EOS)
+            premise, hypothesis = set(row[1:split]), set(row[split + 2:-1])
+            logits[i, 2] = float(len(premise & hypothesis))
+        return FakeOutput(logits)
+
+
+class FakeIntentClassifier(IntentClassifier):
+    def _load_model(self, model_name):
+        return FakeTokenizer(), FakeNLIModel()
+
+
+@pytest.fixture
+def classifier():
+    return FakeIntentClassifier()
+
+
+def test_returns_best_scoring_intent_not_declaration_order(classifier):
+    result = classifier.classify_intent("please check my account balance")
+    assert result['intent'] == "balance_inquiry"
+    assert result['confidence'] == max(result['all_intents'].values())
+    assert set(result['all_intents']) == set(CANDIDATE_INTENTS)
+
+
+def test_scores_all_labels_in_one_padded_forward_pass(classifier):
+    classifier.classify_intent("view my transaction history")
+    assert len(classifier.model.calls) == 1
+    rows, width = classifier.model.calls[0]
+    assert rows == len(CANDIDATE_INTENTS)
+    assert width % IntentClassifier.PAD_MULTIPLE == 0
+
+
+def test_hypotheses_are_tokenized_once(classifier):
+    cached = classifier.hypothesis_ids
+    classifier.classify_intent("hello")
+    classifier.classify_intent("goodbye")
+    assert classifier.hypothesis_ids is cached
+    assert classifier.hypotheses[0] == "This is a request to display current user."
+
+
+def test_scores_are_a_distribution(classifier):
+    scores = classifier.score_intents("end conversation")
+    assert abs(sum(scores.values()) - 1.0) < 1e-6
+    assert max(scores, key=scores.get) == "goodbye"
+
+
+def test_exact_command_pattern_skips_model(classifier):
+    result = classifier.classify_intent("Show all users")
+    assert result == {'intent': 'show_users', 'confidence': 1.0, 'all_intents': {'show_users': 1.0}}
+    assert classifier.model.calls == []
+
+
+def test_repeated_phrases_skip_the_model(classifier):
+    first = classifier.classify_intent("What's my balance?")
+    second = classifier.classify_intent("um, what's my balance")
+    assert second == first
+    assert len(classifier.model.calls) == 1
+    assert classifier.cache.stats()['hits'] == 1
+
+
+def test_changed_intent_descriptions_invalidate_cache(classifier, monkeypatch):
+    from config.config import INTENT_DESCRIPTIONS
+    classifier.classify_intent("end the conversation")
+    monkeypatch.setitem(INTENT_DESCRIPTIONS, "goodbye", "say bye")
+
+    classifier.classify_intent("end the conversation")
+    assert len(classifier.model.calls) == 2
+    assert "This is a request to say bye." in classifier.hypotheses
@@ -0,0 +1,138 @@
+import io
+import threading
+import time
+import openai
+import pytest
+from src.llm.client import LatencyHistogram, LLMDeadlineExceeded
+from src.utils.fake_llm_server import FakeLLMServer
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+@pytest.fixture
+def server():
+    with FakeLLMServer("Hello there.") as server:
+        yield server
+
+
+def fast_retries(server, **kwargs):
+    kwargs.setdefault("backoff_s", 0.01)
+    return server.client(**kwargs)
+
+
+def test_chat_returns_the_completion(server):
+    client = server.client()
+    assert client.complete_text(MESSAGES) == "Hello there."
+    assert server.requests[-1]["model"] == client.model
+    stats = client.stats()
+    assert (stats['calls'], stats['errors'], stats['in_flight']) == (1, 0, 0)
+    assert stats['latency']['chat']['count'] == 1
+
+
+def test_server_errors_are_retried(server):
+    server.failures = [500, 429]
+    client = fast_retries(server, max_retries=2)
+    assert client.complete_text(MESSAGES) == "Hello there."
+    assert len(server.requests) == 3
+    assert client.stats()['retries'] == 2
+
+
+def test_client_errors_are_not_retried(server):
+    server.failures = [400]
+    client = fast_retries(server)
+    with pytest.raises(openai.BadRequestError):
+        client.chat(MESSAGES)
+    assert len(server.requests) == 1
+    assert client.stats()['errors'] == 1
+
+
+def test_slow_attempt_times_out_and_is_retried(server):
+    server.extra_delay = lambda number: 2.0 if number == 0 else 0.0
+    client = fast_retries(server, timeout_s=0.3)
+    started = time.perf_counter()
+    assert client.complete_text(MESSAGES) == "Hello there."
+    assert time.perf_counter() - started < 1.5
+    assert client.stats()['timeouts'] == 1
+
+
+def test_deadline_bounds_the_whole_call(server):
+    server.extra_delay = lambda number: 2.0
+    client = fast_retries(server, timeout_s=0.3, max_retries=10)
+    started = time.perf_counter()
+    with pytest.raises((openai.APITimeoutError, LLMDeadlineExceeded)):
+        client.chat(MESSAGES, deadline_s=0.8)
+    assert time.perf_counter() - started < 1.5
+
+
+def test_concurrency_is_capped(server):
+    server.first_token_s = 0.1
+    client = server.client(max_concurrency=2)
+    threads = [threading.Thread(target=client.chat, args=(MESSAGES,)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert server.peak_in_flight == 2
+    assert client.stats()['peak_in_flight'] == 2
+    assert client.stats()['calls'] == 6
+
+
+def test_waiting_for_a_slot_respects_the_deadline(server):
+    server.first_token_s = 0.5
+    client = server.client(max_concurrency=1)
+    thread = threading.Thread(target=client.chat, args=(MESSAGES,))
+    thread.start()
+    time.sleep(0.1)
+    with pytest.raises(LLMDeadlineExceeded):
+        client.chat(MESSAGES, deadline_s=0.1)
+    thread.join()
+
+
+def test_hedged_request_wins_over_a_slow_attempt(server):
+    server.extra_delay = lambda number: 2.0 if number == 0 else 0.0
+    client = server.client(hedge_after_s=0.1)
+    started = time.perf_counter()
+    assert client.complete_text(MESSAGES) == "Hello there."
+    assert time.perf_counter() - started < 1.0
+    stats = client.stats()
+    assert (stats['hedges'], stats['hedge_wins']) == (1, 1)
+
+
+def test_fast_calls_are_not_hedged(server):
+    client = server.client(hedge_after_s=0.5)
+    client.chat(MESSAGES)
+    assert client.stats()['hedges'] == 0
+    assert len(server.requests) == 1
+
+
+def test_stream_is_retried_until_the_first_chunk(server):
+    server.failures = [503]
+    client = fast_retries(server)
+    chunks = list(client.stream_chat(MESSAGES))
+    text = "".join(chunk.choices[0].delta.content or "" for chunk in chunks if chunk.choices)
+    assert text == "Hello there."
+    stats = client.stats()
+    assert stats['retries'] == 1 and stats['in_flight'] == 0
+    assert set(stats['latency']) == {'stream_first_token', 'stream'}
+
+
+def test_transcribe_rewinds_the_file_between_attempts(server):
+    server.failures = [500]
+    server.transcript = "what's my balance"
+    client = fast_retries(server)
+    audio = io.BytesIO(b"RIFF fake wav")
+    audio.name = "speech.wav"
+    assert client.transcribe(audio, model="whisper-1", response_format="text").strip() == "what's my balance"
+    assert server.requests[0]["upload_bytes"] == server.requests[1]["upload_bytes"]
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for ms in [3] * 90 + [40] * 9 + [700]:
+        histogram.record(ms / 1000)
+    summary = histogram.summary()
+    assert summary['count'] == 100
+    assert summary['p50_ms'] == 5
+    assert summary['p95_ms'] == 50
+    assert summary['p99_ms'] == 50
+    assert summary['max_ms'] == 700
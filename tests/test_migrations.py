@@ -0,0 +1,62 @@
+import pytest
+from src.database import migrations
+from src.database.connection_pool import ConnectionPool
+from src.database.db_manager import DatabaseManager
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "schema.db"))
+    yield pool
+    pool.close()
+
+
+def test_fresh_database_reaches_latest_version(pool):
+    assert migrations.migrate(pool) == migrations.SCHEMA_VERSION
+    conn = pool.connection()
+    assert migrations.schema_version(conn) == migrations.SCHEMA_VERSION
+    assert 'balance_cents' in migrations._columns(conn, 'users')
+
+
+def test_migrate_is_idempotent(pool):
+    migrations.migrate(pool)
+    pool.connection().execute("INSERT INTO users (username, balance_cents) VALUES ('john', 500)")
+    assert migrations.migrate(pool) == migrations.SCHEMA_VERSION
+    assert pool.connection().execute("SELECT balance_cents FROM users").fetchall() == [(500,)]
+
+
+def test_unversioned_database_is_upgraded(pool):
+    # Databases created before versioning have tables but user_version 0
+    migrations._create_base_schema(pool.connection())
+    pool.connection().execute("INSERT INTO users (username, account_balance) VALUES ('john', 2.5)")
+    migrations.migrate(pool)
+    assert pool.connection().execute("SELECT balance_cents FROM users").fetchall() == [(250,)]
+
+
+def test_failed_step_rolls_back_everything(pool, monkeypatch):
+    def broken(conn):
+        conn.execute("CREATE TABLE half_done (id INTEGER)")
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', migrations.MIGRATIONS + [(99, "broken", broken)])
+    with pytest.raises(RuntimeError):
+        migrations.migrate(pool)
+    conn = pool.connection()
+    assert migrations.schema_version(conn) == 0
+    assert conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall() == []
+
+
+@pytest.mark.parametrize("query, index", [
+    ('''SELECT transaction_type, amount_cents / 100.0, timestamp FROM transactions
+        WHERE user_id = ? ORDER BY timestamp DESC, transaction_id DESC LIMIT ?''', 'idx_transactions_user_time'),
+    ('''SELECT user_input, bot_response FROM conversation_history
+        WHERE user_id = ? ORDER BY timestamp DESC LIMIT ?''', 'idx_conversation_user_time'),
+])
+def test_history_queries_use_indexes_without_sorting(tmp_path, query, index):
+    db = DatabaseManager(str(tmp_path / "bank.db"))
+    try:
+        plan = " ".join(row[-1] for row in db.pool.connection().execute("EXPLAIN QUERY PLAN " + query, (1, 5)))
+        assert index in plan
+        assert "TEMP B-TREE" not in plan
+    finally:
+        db.close()
@@ -0,0 +1,84 @@
+import queue
+import threading
+import time
+import pytest
+from src.utils.pipeline import TurnPipeline
+
+
+def test_items_flow_through_stages_in_order():
+    seen = []
+    pipeline = TurnPipeline()
+    pipeline.add_stage('double', lambda x: x * 2, ['collect'])
+    pipeline.add_stage('collect', seen.append)
+    pipeline.start()
+    for i in range(10):
+        pipeline.submit(i)
+    pipeline.stop()
+    assert seen == [i * 2 for i in range(10)]
+    stats = pipeline.stats()
+    assert stats['double']['processed'] == 10
+    assert stats['collect']['dropped'] == 10     # terminal stage returns None
+
+
+def test_fan_out_runs_branches_concurrently():
+    started = {name: threading.Event() for name in ('slow', 'fast')}
+
+    def slow(item):
+        started['slow'].set()
+        assert started['fast'].wait(2), "fast branch waited for the slow one"
+        return None
+
+    def fast(item):
+        started['fast'].set()
+        return None
+
+    pipeline = TurnPipeline()
+    pipeline.add_stage('source', lambda item: item, ['slow', 'fast'])
+    pipeline.add_stage('slow', slow)
+    pipeline.add_stage('fast', fast)
+    pipeline.start()
+    pipeline.submit('turn')
+    pipeline.stop()
+    assert pipeline.stats()['slow']['errors'] == 0
+
+
+def test_bounded_queue_pushes_back():
+    release = threading.Event()
+    pipeline = TurnPipeline(maxsize=1)
+    pipeline.add_stage('blocked', lambda item: release.wait(5) and None)
+    pipeline.start()
+    pipeline.submit(1)              # taken by the worker
+    time.sleep(0.05)
+    pipeline.submit(2)              # fills the queue
+    with pytest.raises(queue.Full):
+        pipeline.submit(3, timeout=0.05)
+    assert pipeline.stats()['blocked']['depth'] == 1
+    release.set()
+    pipeline.stop()
+
+
+def test_errors_are_counted_and_do_not_kill_the_stage():
+    seen = []
+
+    def flaky(item):
+        if item == 2:
+            raise ValueError("bad item")
+        return item
+
+    pipeline = TurnPipeline()
+    pipeline.add_stage('flaky', flaky, ['collect'])
+    pipeline.add_stage('collect', seen.append)
+    pipeline.start()
+    for i in range(4):
+        pipeline.submit(i)
+    pipeline.stop()
+    assert seen == [0, 1, 3]
+    assert pipeline.stats()['flaky']['errors'] == 1
+    assert "flaky" in pipeline.report()
+
+
+def test_unknown_downstream_is_rejected():
+    pipeline = TurnPipeline()
+    pipeline.add_stage('a', lambda item: item, ['missing'])
+    with pytest.raises(ValueError):
+        pipeline.start()
@@ -0,0 +1,79 @@
+from src.response_gen.response_cache import ResponseCache, sentence_vector, cosine
+
+TEMPLATES = {"greeting": "Hello!", "help": "I can help.", "goodbye": "Bye!"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_templates_answer_deterministic_intents():
+    cache = ResponseCache(templates=TEMPLATES)
+    assert cache.get("hi there", "greeting", 0.9) == "Hello!"
+    # A low-confidence guess goes to the LLM instead
+    assert cache.get("hi there", "greeting", 0.3) is None
+    cache.put("hi there", "greeting", 0.9, "Hey, nice to see you")
+    assert len(cache) == 0
+
+
+def test_exact_hit_on_normalized_input_and_intent():
+    cache = ResponseCache(templates=TEMPLATES)
+    cache.put("How are you?", "unknown", 0.4, "Doing well, thanks!")
+
+    assert cache.get("um, how are you", "unknown", 0.4) == "Doing well, thanks!"
+    assert cache.get("how are you", "balance_inquiry", 0.4) is None
+    stats = cache.stats()
+    assert (stats['exact_hits'], stats['misses']) == (1, 1)
+    assert stats['hit_rate'] == 0.5
+
+
+def test_long_turns_are_not_cached():
+    cache = ResponseCache(templates=TEMPLATES, max_words=4)
+    text = "can you explain how interest on my savings works"
+    cache.put(text, "unknown", 0.4, "Sure.")
+    assert cache.get(text, "unknown", 0.4) is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction_and_ttl():
+    clock = FakeClock()
+    cache = ResponseCache(max_size=2, ttl_seconds=10, templates=TEMPLATES, clock=clock)
+    cache.put("one", "unknown", 0.4, "1")
+    cache.put("two", "unknown", 0.4, "2")
+    cache.get("one", "unknown", 0.4)
+    cache.put("three", "unknown", 0.4, "3")
+    assert cache.get("two", "unknown", 0.4) is None
+    assert cache.stats()['evictions'] == 1
+
+    clock.now = 10
+    assert cache.get("one", "unknown", 0.4) is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_semantic_match_reuses_replies_to_similar_wording():
+    cache = ResponseCache(templates=TEMPLATES, semantic=True, similarity=0.8)
+    cache.put("what can you do", "unknown", 0.4, "Banking things.")
+
+    assert cache.get("what can you do for me", "unknown", 0.4) == "Banking things."
+    assert cache.get("what is the weather", "unknown", 0.4) is None
+    assert cache.get("what can you do for me", "greeting", 0.4) is None
+    assert cache.stats()['semantic_hits'] == 1
+
+
+def test_entries_stored_before_semantic_lookup_was_enabled_still_match():
+    cache = ResponseCache(templates=TEMPLATES, semantic=False, similarity=0.8)
+    cache.put("what can you do", "unknown", 0.4, "Banking things.")
+    cache.semantic = True
+
+    assert cache.get("what can you do for me", "unknown", 0.4) == "Banking things."
+    assert cache.stats()['semantic_hits'] == 1
+
+
+def test_sentence_vectors_are_unit_length():
+    vector = sentence_vector("what can you do")
+    assert abs(cosine(vector, vector) - 1.0) < 1e-9
+    assert sentence_vector("") == {}
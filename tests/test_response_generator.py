@@ -0,0 +1,156 @@
+import time
+import pytest
+from src.response_gen.response_cache import ResponseCache
+from src.response_gen.response_generator import ResponseGenerator, StreamingReply, FALLBACK_RESPONSE
+from src.response_gen.sentence_splitter import SentenceSplitter, split_stream
+from src.utils.fake_llm_server import FakeLLMServer
+
+
+def test_splitter_emits_sentences_as_they_complete():
+    splitter = SentenceSplitter()
+    assert splitter.feed("Hello there") == []
+    assert splitter.feed(". How are") == ["Hello there."]
+    assert splitter.feed(" you? I'm") == ["How are you?"]
+    assert splitter.flush() == ["I'm"]
+    assert splitter.flush() == []
+
+
+def test_splitter_keeps_abbreviations_and_decimals_together():
+    text = "Dr. Smith sent $12.50 to Mr. J. Doe, e.g. rent. Done!"
+    assert list(split_stream(text)) == ["Dr. Smith sent $12.50 to Mr. J. Doe, e.g. rent.", "Done!"]
+
+
+def test_splitter_breaks_on_newlines_and_long_clauses():
+    assert list(split_stream(["1. Deposit\n2. Withdraw"])) == ["1. Deposit", "2. Withdraw"]
+    parts = list(split_stream(["word " * 30], max_chars=40))
+    assert all(len(part) <= 40 for part in parts)
+    assert " ".join(parts) == ("word " * 30).strip()
+
+
+def uncached(client):
+    return ResponseGenerator(client=client, cache=ResponseCache(max_size=0, template_intents=()))
+
+
+@pytest.fixture
+def llm_server():
+    server = FakeLLMServer("You have three accounts. The savings account earns interest. Anything else?",
+                           first_token_s=0.1, token_s=0.02)
+    with server:
+        yield server
+
+
+def test_generate_response_reads_from_the_endpoint(llm_server):
+    generator = uncached(llm_server.client())
+    history = []
+    assert generator.generate_response("hi", "greeting", 0.9, history=history) == llm_server.reply
+    assert history[-1] == {"role": "assistant", "content": llm_server.reply}
+    assert llm_server.requests[-1]["max_tokens"] == 150
+
+
+def test_stream_response_yields_sentences_and_records_the_full_reply(llm_server):
+    generator = uncached(llm_server.client())
+    history = []
+    sentences = list(generator.stream_response("accounts?", "unknown", 0.5, history=history))
+
+    assert sentences == ["You have three accounts.", "The savings account earns interest.", "Anything else?"]
+    assert llm_server.requests[-1]["stream"] is True
+    assert history == [{"role": "user", "content": "accounts?"},
+                       {"role": "assistant", "content": llm_server.reply}]
+
+
+def test_first_sentence_arrives_before_the_full_reply(llm_server):
+    generator = uncached(llm_server.client())
+    started = time.perf_counter()
+    generator.generate_response("accounts?", "unknown", 0.5, history=[])
+    blocking = time.perf_counter() - started
+
+    started = time.perf_counter()
+    stream = generator.stream_response("accounts?", "unknown", 0.5, history=[])
+    next(stream)
+    first = time.perf_counter() - started
+    list(stream)
+    total = time.perf_counter() - started
+    assert first < total
+    assert first < blocking - 0.1
+
+
+def test_stream_stopped_early_still_records_what_was_said(llm_server):
+    generator = uncached(llm_server.client())
+    history = []
+    stream = generator.stream_response("accounts?", "unknown", 0.5, history=history)
+    assert next(stream) == "You have three accounts."
+    stream.close()
+    assert history[-1]["role"] == "assistant"
+    assert history[-1]["content"].startswith("You have three accounts.")
+
+
+def test_stream_failure_falls_back_to_the_apology():
+    server = FakeLLMServer().start()
+    client = server.client(max_retries=0, timeout_s=1)
+    server.stop()
+    history = []
+    sentences = list(uncached(client).stream_response("hi", "greeting", 0.9, history=history))
+    assert sentences == [FALLBACK_RESPONSE]
+    assert history[-1]["content"] == FALLBACK_RESPONSE
+
+
+def test_streaming_reply_serves_speech_and_logging(llm_server):
+    generator = uncached(llm_server.client())
+    reply = StreamingReply(generator.stream_response("accounts?", "unknown", 0.5, history=[]))
+    assert list(reply) == ["You have three accounts.", "The savings account earns interest.", "Anything else?"]
+    assert reply.text(timeout=5) == llm_server.reply
+    assert list(reply) == []
+
+
+def test_cached_turns_skip_the_endpoint(llm_server):
+    generator = ResponseGenerator(client=llm_server.client(), cache=ResponseCache(semantic=False))
+    history = []
+    assert generator.generate_response("hello", "greeting", 0.95, history=history) == \
+        generator.cache.templates["greeting"]
+    assert llm_server.requests == []
+
+    # Opening turns of two conversations
+    first = generator.generate_response("tell me a joke", "unknown", 0.4, history=[])
+    other = []
+    assert list(generator.stream_response("Um, tell me a joke!", "unknown", 0.4, history=other)) == \
+        list(split_stream([first]))
+    assert len(llm_server.requests) == 1
+    assert other[-1] == {"role": "assistant", "content": first}
+    stats = generator.cache.stats()
+    assert (stats['template_hits'], stats['exact_hits'], stats['misses']) == (1, 1, 1)
+
+
+def test_cached_reply_streamed_without_remembering_is_left_to_the_caller(llm_server):
+    generator = ResponseGenerator(client=llm_server.client(), cache=ResponseCache(semantic=False))
+    history = []
+    assert list(generator.stream_response("hello", "greeting", 0.95, history=history, remember=False)) == \
+        list(split_stream([generator.cache.templates["greeting"]]))
+    assert history == [{"role": "user", "content": "hello"}]
+
+
+def test_replies_built_from_history_are_not_shared():
+    with FakeLLMServer(lambda messages: " / ".join(m["content"] for m in messages[1:] if m["role"] == "user")) \
+            as server:
+        generator = ResponseGenerator(client=server.client(), cache=ResponseCache(semantic=True))
+        alice, bob = [], []
+        generator.generate_response("my name is alice", "unknown", 0.5, history=alice)
+        generator.generate_response("my name is bob", "unknown", 0.5, history=bob)
+        assert generator.generate_response("what is my name", "unknown", 0.5, history=alice) == \
+            "my name is alice / what is my name"
+        assert generator.generate_response("what is my name", "unknown", 0.5, history=bob) == \
+            "my name is bob / what is my name"
+        assert "".join(generator.stream_response("what is my name", "unknown", 0.5, history=bob)) == \
+            "my name is bob / what is my name / what is my name"
+        # Only the two opening turns were stored
+        assert len(generator.cache) == 2
+
+
+def test_streamed_reply_is_cached_only_when_complete(llm_server):
+    generator = ResponseGenerator(client=llm_server.client(), cache=ResponseCache(semantic=False))
+    stream = generator.stream_response("which accounts", "unknown", 0.5, history=[])
+    next(stream)
+    stream.close()
+    assert len(generator.cache) == 0
+
+    list(generator.stream_response("which accounts", "unknown", 0.5, history=[]))
+    assert generator.cache.get("which accounts", "unknown", 0.5) == llm_server.reply
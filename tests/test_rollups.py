@@ -0,0 +1,79 @@
+import io
+import json
+from datetime import date
+import pytest
+from src.database import rollups
+from src.database.db_manager import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "bank.db"))
+    manager.create_user('john', 50.0)
+    yield manager
+    manager.close()
+
+
+def import_ledger(db, rows):
+    source = io.StringIO("".join(json.dumps(row) + "\n" for row in rows))
+    db.bulk_import_transactions(source, fmt='jsonl', apply_to_balances=False)
+
+
+@pytest.mark.parametrize("start, end, days, months", [
+    (date(2024, 3, 5), date(2024, 3, 20), [(date(2024, 3, 5), date(2024, 3, 20))], None),
+    (date(2024, 3, 1), date(2024, 3, 31), [], ('2024-03', '2024-03')),
+    (date(2024, 1, 15), date(2024, 4, 10),
+     [(date(2024, 1, 15), date(2024, 1, 31)), (date(2024, 4, 1), date(2024, 4, 10))], ('2024-02', '2024-03')),
+    # No whole month inside the range: one daily query
+    (date(2023, 12, 31), date(2024, 1, 30), [(date(2023, 12, 31), date(2024, 1, 30))], None),
+])
+def test_split_period(start, end, days, months):
+    assert rollups.split_period(start, end) == (days, months)
+
+
+def test_rollups_follow_every_write_path(db):
+    db.add_transaction(1, 'deposit', 10.0)
+    db.add_transaction(1, 'withdrawal', 3.25)
+    db.transfer_money('demo_user', 'john', 2.0)
+    db.transfer_money('john', 'demo_user', 1.0)
+    import_ledger(db, [{"user_id": 1, "transaction_type": "withdrawal", "amount": 4, "timestamp": "2024-02-10 09:00:00"}])
+    assert db.verify_rollups() == []
+
+    summary = db.summarize_period(1, date(2000, 1, 1), date(2100, 1, 1))
+    assert summary['deposit'] == {'count': 1, 'in': 10.0, 'out': 0.0}
+    assert summary['withdrawal'] == {'count': 2, 'in': 0.0, 'out': 7.25}
+    assert summary['transfer_out'] == {'count': 1, 'in': 0.0, 'out': 2.0}
+    assert summary['transfer_in'] == {'count': 1, 'in': 1.0, 'out': 0.0}
+    assert db.get_spending(1, date(2000, 1, 1), date(2100, 1, 1)) == (9.25, 3)
+
+
+def test_failed_withdrawal_leaves_rollups_alone(db):
+    assert not db.add_transaction(1, 'withdrawal', 5000.0)
+    assert db.transfer_money('john', 'demo_user', 5000.0) == "Insufficient balance for transfer"
+    count = db.pool.connection().execute('SELECT COUNT(*) FROM daily_rollups').fetchone()[0]
+    assert count == 0
+
+
+def test_period_queries_mix_daily_and_monthly_rollups(db):
+    import_ledger(db, [
+        {"user_id": 1, "transaction_type": "withdrawal", "amount": 1, "timestamp": "2024-01-31 23:00:00"},
+        {"user_id": 1, "transaction_type": "withdrawal", "amount": 2, "timestamp": "2024-02-01 08:00:00"},
+        {"user_id": 1, "transaction_type": "withdrawal", "amount": 4, "timestamp": "2024-02-29 08:00:00"},
+        {"user_id": 1, "transaction_type": "deposit", "amount": 8, "timestamp": "2024-03-02 08:00:00"},
+        {"user_id": 1, "transaction_type": "withdrawal", "amount": 16, "timestamp": "2024-03-03 08:00:00"},
+    ])
+    assert db.get_spending(1, date(2024, 2, 1), date(2024, 2, 29)) == (6.0, 2)
+    assert db.get_spending(1, date(2024, 1, 31), date(2024, 3, 2)) == (7.0, 3)
+    assert db.summarize_period(1, date(2024, 3, 1), date(2024, 3, 31))['deposit']['in'] == 8.0
+    assert db.get_monthly_statement(1, months=2) == [('2024-03', 8.0, 16.0), ('2024-02', 0.0, 6.0)]
+
+
+def test_verify_detects_drift_and_rebuild_repairs_it(db):
+    db.add_transaction(1, 'deposit', 10.0)
+    with db.pool.transaction() as conn:
+        conn.execute("UPDATE daily_rollups SET cents_in = cents_in + 1")
+        conn.execute("INSERT INTO transactions (user_id, transaction_type, amount_cents) VALUES (1, 'deposit', 5)")
+    labels = sorted(label for table, label, row in db.verify_rollups() if table == 'daily_rollups')
+    assert labels == ['missing', 'stale']
+    db.rebuild_rollups()
+    assert db.verify_rollups() == []
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+from main import VoiceBot
+from src.database.db_manager import DatabaseManager
+from src.server.client import ConversationClient
+from src.server.session_server import ConversationServer, StageLimiter
+
+
+class FakeClassifier:
+    def classify_intent(self, text):
+        return {'intent': 'greeting', 'confidence': 0.9}
+
+
+class FakeResponder:
+    """Echoes the caller's history length, sleeping like a network call"""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.concurrent = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def generate_response(self, user_input, intent, confidence, history=None):
+        with self._lock:
+            self.concurrent += 1
+            self.peak = max(self.peak, self.concurrent)
+        time.sleep(self.delay)
+        with self._lock:
+            self.concurrent -= 1
+        history.append({"role": "user", "content": user_input})
+        return f"reply {len(history)}"
+
+
+class FakeTranscriber:
+    def transcribe_audio(self, audio):
+        return audio.decode()
+
+
+def make_bot(tmp_path, responder=None):
+    db = DatabaseManager(str(tmp_path / "bank.db"))
+    bot = VoiceBot(components={'db': db, 'intent_classifier': FakeClassifier(),
+                               'response_generator': responder or FakeResponder(),
+                               'transcriber': FakeTranscriber()})
+    return bot
+
+
+def run_with_server(bot, scenario, **options):
+    async def runner():
+        server = await ConversationServer(bot, host='127.0.0.1', port=0, **options).start()
+        try:
+            return await scenario(server)
+        finally:
+            await server.close()
+    try:
+        return asyncio.run(runner())
+    finally:
+        bot.cleanup()
+
+
+def test_sessions_keep_their_own_user_and_history(tmp_path):
+    async def scenario(server):
+        alice = await ConversationClient.connect(port=server.port)
+        guest = await ConversationClient.connect(port=server.port)
+        assert (await alice.say("this is demo user"))['text'].startswith("Current user: demo_user")
+        balance = await alice.say("what's my balance")
+        assert balance['text'] == "Your current balance is $1000.00"
+        assert balance['intent'] == 'balance_inquiry'
+        assert "Please tell the name of user" in (await guest.say("what's my balance"))['text']
+
+        # Chat history is per session
+        assert (await alice.say("hello there"))['text'] == "reply 1"
+        assert (await alice.say("hello again"))['text'] == "reply 2"
+        assert (await guest.say("hello there"))['text'] == "reply 1"
+        await alice.request({"type": "reset"})
+        assert (await alice.say("hello there"))['text'] == "reply 1"
+        await alice.close()
+        await guest.close()
+
+    run_with_server(make_bot(tmp_path), scenario)
+
+
+def test_audio_turns_are_transcribed(tmp_path):
+    async def scenario(server):
+        client = await ConversationClient.connect(port=server.port)
+        reply = await client.send_audio(b"help")
+        assert reply['transcript'] == "help"
+        assert "Available commands" in reply['text']
+        await client.close()
+
+    run_with_server(make_bot(tmp_path), scenario)
+
+
+def test_stage_limits_cap_concurrent_llm_calls(tmp_path):
+    responder = FakeResponder(delay=0.05)
+
+    async def scenario(server):
+        clients = [await ConversationClient.connect(port=server.port) for _ in range(6)]
+        replies = await asyncio.gather(*(client.say("hello there") for client in clients))
+        assert all(reply['type'] == 'reply' for reply in replies)
+        stats = (await clients[0].request({"type": "stats"}))
+        for client in clients:
+            await client.close()
+        return stats
+
+    stats = run_with_server(make_bot(tmp_path, responder), scenario,
+                            stage_limits={'asr': 1, 'nlu': 2, 'db': 2, 'llm': 2, 'tts': 1})
+    assert responder.peak == 2
+    assert stats['turns'] == 6
+    assert stats['stages']['llm']['peak'] == 2
+    assert stats['sessions_opened'] == 6
+    assert stats['p99_ms'] >= stats['p50_ms'] > 0
+
+
+def test_bad_messages_get_errors_not_disconnects(tmp_path):
+    async def scenario(server):
+        client = await ConversationClient.connect(port=server.port)
+        client.writer.write(b"not json\n")
+        assert b"invalid JSON" in await client.reader.readline()
+        client.writer.write(b"[1]\n")
+        assert b"JSON object" in await client.reader.readline()
+        assert (await client.request({"type": "dance"}))['type'] == 'error'
+        assert (await client.say("help"))['type'] == 'reply'
+        await client.close()
+
+    run_with_server(make_bot(tmp_path), scenario)
+
+
+def test_stage_limiter_runs_off_the_event_loop():
+    async def scenario():
+        limiter = StageLimiter({'db': 1})
+        loop_thread = threading.get_ident()
+        try:
+            worker_thread = await limiter.run('db', threading.get_ident)
+        finally:
+            limiter.shutdown()
+        return loop_thread, worker_thread, limiter.stats()
+
+    loop_thread, worker_thread, stats = asyncio.run(scenario())
+    assert loop_thread != worker_thread
+    assert stats['db']['calls'] == 1
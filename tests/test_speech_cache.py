@@ -0,0 +1,79 @@
+import json
+import os
+from src.text_to_speech.speech_cache import SpeechCache, speech_key, INDEX_FILE
+
+
+def writer(data):
+    def render(path):
+        with open(path, 'wb') as f:
+            f.write(data)
+    return render
+
+
+def test_key_depends_on_text_and_voice_settings():
+    key = speech_key("Hello there.", "voice-a", 150, 1.0)
+    assert key == speech_key("Hello   there.", "voice-a", 150, 1.0)
+    assert key != speech_key("Hello there!", "voice-a", 150, 1.0)
+    assert key != speech_key("Hello there.", "voice-b", 150, 1.0)
+    assert key != speech_key("Hello there.", "voice-a", 180, 1.0)
+    assert key != speech_key("Hello there.", "voice-a", 150, 0.5)
+
+
+def test_put_then_get(tmp_path):
+    cache = SpeechCache(str(tmp_path), max_bytes=1000)
+    assert cache.get("k1") is None
+    path = cache.put("k1", writer(b"x" * 10))
+
+    assert cache.get("k1") == path
+    with open(path, 'rb') as f:
+        assert f.read() == b"x" * 10
+    assert not [name for name in os.listdir(tmp_path) if ".tmp" in name]
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_failed_render_is_not_cached(tmp_path):
+    cache = SpeechCache(str(tmp_path))
+    assert cache.put("k1", lambda path: None) is None
+    assert len(cache) == 0
+
+
+def test_least_recently_played_is_evicted_past_the_size_bound(tmp_path):
+    cache = SpeechCache(str(tmp_path), max_bytes=25)
+    first = cache.put("a", writer(b"x" * 10))
+    cache.put("b", writer(b"x" * 10))
+    cache.get("a")
+    cache.put("c", writer(b"x" * 10))
+
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert os.path.exists(first)
+    assert cache.total_bytes == 20
+    assert cache.stats()['evictions'] == 1
+
+
+def test_index_survives_a_restart(tmp_path):
+    cache = SpeechCache(str(tmp_path), max_bytes=25)
+    cache.put("a", writer(b"x" * 10))
+    cache.put("b", writer(b"x" * 10))
+    cache.get("a")
+    cache.flush()
+    os.remove(cache.path("b"))
+
+    reopened = SpeechCache(str(tmp_path), max_bytes=25)
+    assert "a" in reopened and "b" not in reopened
+    assert reopened.total_bytes == 10
+    with open(tmp_path / INDEX_FILE) as f:
+        assert set(json.load(f)["a"]) == {"bytes", "last_used"}
+
+
+def test_old_index_entries_lose_their_text(tmp_path):
+    cache = SpeechCache(str(tmp_path))
+    cache.put("a", writer(b"x" * 10))
+    (tmp_path / INDEX_FILE).write_text(json.dumps({"a": {"text": "Your balance is $5", "bytes": 10, "last_used": 1}}))
+    SpeechCache(str(tmp_path)).flush()
+    with open(tmp_path / INDEX_FILE) as f:
+        assert "text" not in json.load(f)["a"]
+
+
+def test_unreadable_index_starts_empty(tmp_path):
+    (tmp_path / INDEX_FILE).write_text("{not json")
+    assert len(SpeechCache(str(tmp_path))) == 0
@@ -0,0 +1,70 @@
+import os
+import shutil
+import pytest
+from src.speech_to_text.asr_backends import OpenAIWhisperBackend, StubBackend, create_backend
+from src.speech_to_text.transcriber import Transcriber
+from src.utils.fake_llm_server import FakeLLMServer
+
+RECORDING = os.path.join(os.path.dirname(os.path.dirname(__file__)), "test_recording.wav")
+
+
+@pytest.fixture
+def recordings(tmp_path):
+    """Three copies of the fixture recording, each with a sidecar transcript"""
+    paths = []
+    for index, text in enumerate(["check my balance", "show my transactions", "deposit 100 dollars"]):
+        path = tmp_path / f"call_{index}.wav"
+        shutil.copy(RECORDING, path)
+        (tmp_path / f"call_{index}.txt").write_text(text)
+        paths.append(str(path))
+    return paths
+
+
+def test_stub_backend_is_deterministic():
+    with open(RECORDING, "rb") as f:
+        data = f.read()
+    transcriber = Transcriber(StubBackend(transcripts={StubBackend.audio_key(data): " hello there "}))
+
+    assert transcriber.transcribe_audio(data) == "hello there"
+    assert transcriber.transcribe_audio(RECORDING) == "hello there"
+    assert transcriber.last_latency >= 0
+
+
+def test_stub_backend_falls_back_to_default_text():
+    transcriber = Transcriber(StubBackend(default_text="help"))
+    assert transcriber.transcribe_audio(b"not really audio") == "help"
+
+
+def test_unknown_backend_name():
+    with pytest.raises(ValueError):
+        create_backend("nope")
+
+
+def test_transcribe_many_inline(recordings):
+    transcriber = Transcriber("stub")
+    assert transcriber.transcribe_many(recordings, max_workers=1) == [
+        "check my balance", "show my transactions", "deposit 100 dollars"
+    ]
+    assert len(transcriber.batch_latencies) == 3
+
+
+def test_transcribe_many_process_pool_keeps_order(recordings):
+    with open(RECORDING, "rb") as f:
+        data = f.read()
+    transcriber = Transcriber(StubBackend(default_text="from buffer"))
+    items = recordings + [data, memoryview(data)]
+
+    transcripts = transcriber.transcribe_many(items, max_workers=2, chunksize=1)
+
+    assert transcripts == [
+        "check my balance", "show my transactions", "deposit 100 dollars", "from buffer", "from buffer"
+    ]
+    assert len(transcriber.batch_latencies) == len(items)
+
+
+def test_openai_backend_against_the_audio_endpoint():
+    with FakeLLMServer(transcript="what's my balance\n") as server:
+        transcriber = Transcriber(OpenAIWhisperBackend(client=server.client()))
+        assert transcriber.transcribe_audio(RECORDING) == "what's my balance"
+        with open(RECORDING, "rb") as f:
+            assert server.requests[-1]["upload_bytes"] > len(f.read())
@@ -0,0 +1,272 @@
+import io
+import os
+import threading
+import time
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from src.text_to_speech import tts_generator
+from src.text_to_speech.speech_cache import SpeechCache
+from src.text_to_speech.audio_segments import read_wav, write_wav
+from src.text_to_speech.tts_generator import TTSGenerator, segment_sentence, split_sentences
+
+
+class FakeEngine:
+    """pyttsx3 stand-in: save_to_file writes the text itself as the 'audio'"""
+    def __init__(self):
+        self.properties = {'voice': 'voice-a', 'rate': 200, 'volume': 1.0, 'voices': []}
+        self.pending = []
+        self.synthesized = []
+        self.said = []
+
+    def getProperty(self, name):
+        return self.properties[name]
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def save_to_file(self, text, path):
+        self.pending.append((text, path))
+
+    def say(self, text):
+        self.said.append(text)
+
+    def runAndWait(self):
+        for text, path in self.pending:
+            self.synthesized.append(text)
+            with open(path, 'w') as f:
+                f.write(text)
+        self.pending = []
+
+    def stop(self):
+        pass
+
+
+class WavEngine(FakeEngine):
+    """Renders 100 frames of tone per character, framed by silence"""
+    def runAndWait(self):
+        for text, path in self.pending:
+            self.synthesized.append(text)
+            silence = np.zeros((400, 1), dtype=np.int16)
+            tone = np.full((100 * len(text), 1), 8000, dtype=np.int16)
+            write_wav(path, wave_params(), np.concatenate([silence, tone, silence]))
+        self.pending = []
+
+
+def wave_params():
+    return SimpleNamespace(nchannels=1, sampwidth=2, framerate=16000)
+
+
+class FakePlayer:
+    def __init__(self, available=True):
+        self.available = available
+        self.played = []
+        self.paths = []
+        self.events = []
+
+    def play(self, path, cancel_event=None):
+        self.start(path)
+        return self.wait(cancel_event)
+
+    def start(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        self.played.append(data.decode() if not data.startswith(b'RIFF') else data)
+        self.paths.append(path)
+        self.events.append('start')
+
+    def wait(self, cancel_event=None):
+        self.events.append('wait')
+        return True
+
+    def stop(self):
+        pass
+
+
+@pytest.fixture
+def tts(tmp_path, monkeypatch):
+    monkeypatch.setattr(tts_generator, 'AUDIO_OUTPUT_DIR', str(tmp_path / "audio"))
+    engine, player = FakeEngine(), FakePlayer()
+    generator = TTSGenerator(engine=engine, cache=SpeechCache(str(tmp_path / "cache")), player=player)
+    return generator, engine, player
+
+
+def test_fixed_phrases_play_from_disk_and_the_rest_is_spoken_directly(tts):
+    generator, engine, player = tts
+    generator.prerender(["Hello there."])
+    generator.speak_text("Hello there. Your card was declined.")
+    generator.speak_text("Hello there.")
+
+    assert engine.synthesized == ["Hello there."]
+    assert player.played == ["Hello there.", "Hello there."]
+    assert engine.said == ["Your card was declined."]
+    assert len(generator.cache) == 1
+
+
+def test_voice_change_renders_again(tts):
+    generator, engine, player = tts
+    generator.prerender(["Hello there."])
+    engine.setProperty('rate', 180)
+    generator.prerender(["Hello there."])
+    assert engine.synthesized == ["Hello there.", "Hello there."]
+
+
+def test_prerender_fills_the_cache_ahead_of_time(tts):
+    generator, engine, player = tts
+    assert generator.prerender(["Please log in. Then ask away.", "Goodbye!"]) == 3
+    assert generator.prerender(["Goodbye!"]) == 0
+    engine.synthesized.clear()
+
+    generator.speak_text("Then ask away.")
+    assert engine.synthesized == []
+    assert player.played == ["Then ask away."]
+
+
+def test_without_a_player_speech_goes_through_the_engine(tts, tmp_path):
+    _, engine, _ = tts
+    generator = TTSGenerator(engine=engine, cache=SpeechCache(str(tmp_path / "other")),
+                             player=FakePlayer(available=False))
+    assert generator.speak_text("Hi. Bye.") is True
+    assert engine.said == ["Hi.", "Bye."]
+
+
+def test_cancel_stops_between_sentences(tts):
+    generator, engine, player = tts
+    cancel = threading.Event()
+    cancel.set()
+    assert generator.speak_text("One. Two.", cancel_event=cancel) is False
+    assert player.played == []
+
+
+def test_generated_files_never_collide(tts):
+    generator, engine, player = tts
+    paths = {generator.generate_speech("Same second.") for _ in range(3)}
+    assert len(paths) == 3
+    assert engine.synthesized == ["Same second."] * 3
+    assert len(generator.cache) == 0
+    for path in paths:
+        with open(path) as f:
+            assert f.read() == "Same second."
+
+
+def test_slots_are_separated_from_fixed_wording():
+    assert segment_sentence("Your current balance is $1,250.00") == [
+        (False, "Your current balance is"), (True, "$1,250.00")]
+    assert segment_sentence("An account for bob already exists") == [
+        (False, "An account for"), (True, "bob"), (False, "already exists")]
+    assert segment_sentence("Hello there.") == [(False, "Hello there.")]
+    # Too many slots to be worth joining
+    assert segment_sentence("- deposit: $5.00 on 2024-01-02") == [(False, "- deposit: $5.00 on 2024-01-02")]
+
+
+def test_multi_line_replies_are_spoken_line_by_line():
+    text = "Here are your recent transactions:\n- deposit: $5.00 on 2024-01-02\n- withdraw: $2.00 on 2024-01-03\n"
+    assert split_sentences(text) == [
+        "Here are your recent transactions:", "- deposit: $5.00 on 2024-01-02", "- withdraw: $2.00 on 2024-01-03"]
+
+
+@pytest.fixture
+def wav_tts(tmp_path, monkeypatch):
+    monkeypatch.setattr(tts_generator, 'AUDIO_OUTPUT_DIR', str(tmp_path / "audio"))
+    engine, player = WavEngine(), FakePlayer()
+    generator = TTSGenerator(engine=engine, cache=SpeechCache(str(tmp_path / "cache")), player=player,
+                             segmented=True)
+    return generator, engine, player
+
+
+def test_templates_reuse_the_fixed_segment(wav_tts):
+    generator, engine, player = wav_tts
+    generator.prerender(["Successfully deposited $0.00"])
+    assert engine.synthesized == ["Successfully deposited"]
+
+    generator.speak_text("Successfully deposited $25.00")
+    generator.speak_text("Successfully deposited $7.50")
+    assert engine.synthesized == ["Successfully deposited", "$25.00", "$7.50"]
+
+    _, samples = read_wav(io.BytesIO(player.played[0]))
+    fade = 16000 * 15 // 1000
+    padding = 16000 * 20 // 1000
+    tone = [100 * len(part) + 2 * padding for part in ("Successfully deposited", "$25.00")]
+    assert len(samples) == sum(tone) - fade
+
+
+def test_slots_and_joined_sentences_never_reach_the_disk_cache(wav_tts):
+    generator, engine, player = wav_tts
+    generator.prerender(["Your current balance is $0.00"])
+    generator.speak_text("Your current balance is $3.00")
+    generator.speak_text("Your current balance is $3.00")
+    assert engine.synthesized == ["Your current balance is", "$3.00", "$3.00"]
+    assert len(generator.cache) == 1
+    assert not any(os.path.exists(path) for path in player.paths)
+
+
+def test_templates_without_prerendered_wording_are_spoken_directly(wav_tts):
+    generator, engine, player = wav_tts
+    generator.speak_text("You have 3 new messages")
+    assert engine.said == ["You have 3 new messages"]
+    assert engine.synthesized == [] and len(generator.cache) == 0
+
+
+def test_templates_are_not_prerendered_when_segmenting_is_off(tts):
+    generator, engine, player = tts
+    assert generator.prerender(["Successfully deposited $0.00", "Goodbye!"]) == 1
+    generator.speak_text("Successfully deposited $5.00")
+    assert engine.said == ["Successfully deposited $5.00"]
+
+
+def test_next_sentence_renders_while_the_previous_one_plays(tts):
+    generator, engine, player = tts
+    generator.prerender(["One. Two."])
+    rendered_while_playing = []
+
+    def sentences():
+        yield "One."
+        rendered_while_playing.append(player.events[-1])
+        yield "Two."
+
+    assert generator.speak_sentences(sentences()) is True
+    # "Two." was rendered after "One." started but before waiting on it
+    assert rendered_while_playing == ['start']
+    assert player.events == ['start', 'wait', 'start', 'wait']
+
+
+def test_whole_replies_handed_over_as_one_item_play_sentence_by_sentence(tts):
+    generator, engine, player = tts
+    generator.prerender(["Hello! How can I assist you today?"])
+    engine.synthesized.clear()
+
+    assert generator.speak_sentences(["Hello! How can I assist you today?"]) is True
+    assert engine.synthesized == [] and engine.said == []
+    assert player.played == ["Hello!", "How can I assist you today?"]
+
+
+def test_engine_is_used_by_one_thread_at_a_time(tts):
+    generator, engine, player = tts
+    generator.player = FakePlayer(available=False)
+    inside, overlaps = [], []
+    run_and_wait = engine.runAndWait
+
+    def exclusive_run_and_wait():
+        if inside:
+            overlaps.append(True)
+        inside.append(True)
+        time.sleep(0.002)
+        run_and_wait()
+        inside.pop()
+    engine.runAndWait = exclusive_run_and_wait
+
+    warm_up = threading.Thread(target=generator.prerender, args=([f"Phrase {i}." for i in range(30)],))
+    warm_up.start()
+    for i in range(30):
+        generator.speak_text(f"Reply {i}.")
+    warm_up.join()
+    assert overlaps == []
+
+
+def test_stop_leaves_the_engine_alone(tts):
+    generator, engine, player = tts
+    stopped = []
+    engine.stop = lambda: stopped.append('engine')
+    player.stop = lambda: stopped.append('player')
+    generator.stop()
+    assert stopped == ['player']
@@ -0,0 +1,46 @@
+from src.database.user_cache import UserCache
+
+
+def test_lru_eviction():
+    cache = UserCache(max_size=2)
+    cache.put(1, 'a', 100)
+    cache.put(2, 'b', 200)
+    assert cache.get_row(1) == ('a', 100)
+    cache.put(3, 'c', 300)
+    assert cache.get_row(2) is None
+    assert cache.get_row(1) == ('a', 100)
+    assert cache.stats()['evictions'] >= 1
+
+
+def test_invalidate_keeps_the_id_mapping():
+    cache = UserCache()
+    cache.put(1, 'a', 100)
+    cache.invalidate(1)
+    assert cache.get_row(1) is None
+    assert cache.get_user_id('a') == 1
+
+
+def test_read_that_raced_a_write_is_not_cached():
+    cache = UserCache()
+    token = cache.token()
+    cache.invalidate(1)          # a write lands while the read is in flight
+    cache.put(1, 'a', 100, token)
+    assert cache.get_row(1) is None
+    cache.put(1, 'a', 150, cache.token())
+    assert cache.get_row(1) == ('a', 150)
+
+
+def test_hit_rate():
+    cache = UserCache()
+    cache.put(1, 'a', 100)
+    cache.get_row(1)
+    cache.get_row(2)
+    assert cache.stats()['hit_rate'] == 0.5
+
+
+def test_disabled_cache_stores_nothing():
+    cache = UserCache(enabled=False)
+    cache.put(1, 'a', 100)
+    assert cache.get_row(1) is None
+    assert cache.get_user_id('a') is None
+    assert cache.stats()['misses'] == 0
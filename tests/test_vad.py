@@ -0,0 +1,78 @@
+import os
+import wave
+from src.speech_to_text.vad import VoiceActivityDetector, frame_energy, SPEECH_START, SPEECH_END, MAX_DURATION, NO_SPEECH
+
+RECORDING = os.path.join(os.path.dirname(os.path.dirname(__file__)), "test_recording.wav")
+CHUNK = 1024
+SILENT_FRAME = b'\x00' * 4 * CHUNK
+
+
+def load_frames(path=RECORDING, chunk=CHUNK):
+    with wave.open(path, 'rb') as wf:
+        rate = wf.getframerate()
+        width = wf.getsampwidth()
+        data = wf.readframes(wf.getnframes())
+    step = chunk * width
+    return rate, [data[i:i + step] for i in range(0, len(data) - step + 1, step)]
+
+
+def run_detector(detector, frames):
+    events = []
+    for index, frame in enumerate(frames):
+        event = detector.process(frame)
+        if event:
+            events.append((index, event))
+    return events
+
+
+def test_frame_energy_of_silence_is_zero():
+    assert frame_energy(SILENT_FRAME) == 0.0
+
+
+def test_detects_speech_in_recording():
+    rate, frames = load_frames()
+    detector = VoiceActivityDetector(sample_rate=rate, frame_size=CHUNK,
+                                     trailing_silence_ms=500, max_duration_s=None)
+    events = run_detector(detector, frames)
+
+    assert [event for _, event in events] == [SPEECH_START, SPEECH_END]
+    start_frame, end_frame = detector.speech_start_frame, detector.speech_end_frame
+    # The recording contains roughly 1.5s of leading silence and speech until ~3.1s
+    assert 1.3 < start_frame * CHUNK / rate < 1.8
+    assert 2.8 < end_frame * CHUNK / rate < 3.5
+    # The turn ends well before the 4.8s recording would have
+    assert events[-1][0] < len(frames) - 1
+
+
+def test_trailing_silence_window_controls_end_of_turn():
+    rate, frames = load_frames()
+    short = VoiceActivityDetector(sample_rate=rate, frame_size=CHUNK, trailing_silence_ms=300, max_duration_s=None)
+    long = VoiceActivityDetector(sample_rate=rate, frame_size=CHUNK, trailing_silence_ms=900, max_duration_s=None)
+    short_end = run_detector(short, frames)[-1][0]
+    long_end = run_detector(long, frames)[-1][0]
+    assert short_end < long_end
+
+
+def test_max_duration_cuts_long_speech():
+    rate, frames = load_frames()
+    detector = VoiceActivityDetector(sample_rate=rate, frame_size=CHUNK, max_duration_s=2)
+    events = run_detector(detector, frames)
+    assert events[-1][1] == MAX_DURATION
+    assert events[-1][0] == detector.ms_to_frames(2000) - 1
+
+
+def test_no_speech_timeout():
+    detector = VoiceActivityDetector(frame_size=CHUNK, no_speech_timeout_s=1)
+    events = run_detector(detector, [SILENT_FRAME] * 100)
+    assert events == [(detector.ms_to_frames(1000) - 1, NO_SPEECH)]
+    assert not detector.triggered
+
+
+def test_detector_ignores_frames_after_end():
+    rate, frames = load_frames()
+    detector = VoiceActivityDetector(sample_rate=rate, frame_size=CHUNK, max_duration_s=None)
+    run_detector(detector, frames)
+    assert detector.ended
+    assert detector.process(frames[30]) is None
+    detector.reset()
+    assert not detector.ended and not detector.triggered
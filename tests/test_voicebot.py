@@ -0,0 +1,316 @@
+import threading
+import time
+import main
+from main import VoiceBot
+from src.utils.startup_profiler import StartupProfiler
+
+
+class FakeClassifier:
+    def __init__(self):
+        self.scored = []
+
+    def score_intents(self, text):
+        self.scored.append(text)
+        return {'greeting': 1.0}
+
+
+def test_components_are_built_lazily(monkeypatch):
+    monkeypatch.setitem(main.COMPONENTS, 'db', ('collections', 'OrderedDict'))
+    profiler = StartupProfiler()
+    bot = VoiceBot(profiler=profiler)
+
+    assert 'db' not in bot._components
+    db = bot.db
+    assert bot.db is db
+    assert set(profiler.timings['db']) == {'import', 'init'}
+
+
+def test_injected_components_are_used_as_is():
+    classifier = FakeClassifier()
+    bot = VoiceBot(components={'intent_classifier': classifier})
+    assert bot.intent_classifier is classifier
+
+
+def test_sessions_share_components_built_after_they_were_spawned(monkeypatch):
+    monkeypatch.setitem(main.COMPONENTS, 'recorder', ('collections', 'OrderedDict'))
+    bot = VoiceBot()
+    first, second = bot.spawn_session(), bot.spawn_session()
+
+    recorder = first.recorder
+    assert second.recorder is recorder
+    assert bot.recorder is recorder
+
+
+def test_background_warm_up_runs_dummy_inference():
+    classifier = FakeClassifier()
+    profiler = StartupProfiler()
+    bot = VoiceBot(components={'intent_classifier': classifier}, profiler=profiler)
+
+    thread = bot.warm_up(components=['intent_classifier'])
+    thread.join(timeout=5)
+
+    assert len(classifier.scored) == 1
+    assert 'warm-up' in profiler.timings['intent_classifier']
+
+
+def test_warm_up_failures_are_reported(monkeypatch):
+    monkeypatch.setitem(main.COMPONENTS, 'recorder', ('no_such_module_for_tests', 'AudioRecorder'))
+    profiler = StartupProfiler()
+    bot = VoiceBot(profiler=profiler)
+
+    bot.warm_up(background=False, components=['recorder'])
+
+    assert 'recorder' in profiler.errors
+    assert "FAILED recorder" in profiler.report()
+
+
+def test_spending_question_is_answered_from_rollups(tmp_path):
+    from src.database.db_manager import DatabaseManager
+    db = DatabaseManager(str(tmp_path / "bank.db"))
+    try:
+        db.create_user('john', 0.0)
+        db.transfer_money('demo_user', 'john', 40.0)
+        db.add_transaction(1, 'withdrawal', 2.5)
+        bot = VoiceBot(components={'db': db})
+        bot.user_id = 1
+
+        match = bot.command_matcher.match("how much did I spend this month")
+        assert bot.commands[match.command]("how much did I spend this month") == \
+            "You spent $42.50 this month across 2 transactions."
+        assert bot.check_spending("total deposits this week").startswith("You deposited $0.00")
+    finally:
+        db.close()
+
+
+def test_only_exact_recipients_receive_money(tmp_path):
+    from src.database.db_manager import DatabaseManager
+    db = DatabaseManager(str(tmp_path / "bank.db"))
+    try:
+        db.create_user('john', 0.0)
+        bot = VoiceBot(components={'db': db})
+        bot.user_id, bot.username = 1, 'demo_user'
+
+        assert bot.transfer_money("send $5 to jon") == 'Did you mean john? Say "send $5.00 to john" to confirm.'
+        assert db.get_balance(db.get_user_id('john')) == 0.0
+        assert bot.transfer_money("send $5.00 to john") == "Transfer successful"
+        assert db.get_balance(db.get_user_id('john')) == 5.0
+    finally:
+        db.close()
+
+
+def test_only_exact_names_switch_user(tmp_path):
+    from src.database.db_manager import DatabaseManager
+    db = DatabaseManager(str(tmp_path / "bank.db"))
+    try:
+        db.create_user('john', 0.0)
+        bot = VoiceBot(components={'db': db})
+        bot.user_id, bot.username = 1, 'demo_user'
+
+        assert bot.find_current_user("this is jon") == 'Did you mean john? Say "this is john" to confirm.'
+        assert (bot.user_id, bot.username) == (1, 'demo_user')
+        assert bot.find_current_user("this is john").startswith("Current user: john")
+        assert bot.username == 'john'
+    finally:
+        db.close()
+
+
+class FakeRecorder:
+    """Hands out scripted utterances; `before_next` runs while 'listening' for the next one"""
+    def __init__(self, utterances, before_next=None):
+        self.utterances = list(utterances)
+        self.before_next = before_next
+        self.current = None
+
+    def record_utterance(self, on_speech_start=None):
+        if self.before_next and self.current is not None:
+            self.before_next()
+        self.current = self.utterances.pop(0)
+        if on_speech_start:
+            on_speech_start()
+        return True
+
+    def get_audio(self):
+        import io
+        return io.BytesIO(self.current.encode())
+
+
+class FakeTranscriber:
+    def transcribe_audio(self, audio):
+        return audio.getvalue().decode()
+
+
+class FakeSpeaker:
+    def __init__(self, seconds=0.0, sentence_seconds=0.0):
+        self.seconds = seconds
+        self.sentence_seconds = sentence_seconds
+        self.speaking = threading.Event()
+        self.spoken = []
+
+    def speak_text(self, text, cancel_event=None):
+        self.speaking.set()
+        deadline = time.monotonic() + self.seconds
+        while time.monotonic() < deadline:
+            if cancel_event is not None and cancel_event.is_set():
+                self.spoken.append((text, False))
+                return False
+            time.sleep(0.005)
+        self.spoken.append((text, True))
+        return True
+
+    def speak_sentences(self, sentences, cancel_event=None):
+        self.speaking.set()
+        for sentence in sentences:
+            if cancel_event is not None and cancel_event.is_set():
+                return False
+            self.spoken.append((sentence, True))
+            time.sleep(self.sentence_seconds)
+        return True
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeDB:
+    def __init__(self):
+        self.logged = []
+        self.user_ids = []
+
+    def log_conversation(self, user_id, text, response, intent, confidence):
+        self.logged.append((text, response))
+        self.user_ids.append(user_id)
+
+    def close(self):
+        pass
+
+
+def test_pipelined_turns_are_spoken_and_logged():
+    db, speaker = FakeDB(), FakeSpeaker()
+    bot = VoiceBot(components={'db': db, 'recorder': FakeRecorder(["show help", "what's my balance"]),
+                               'transcriber': FakeTranscriber(), 'tts_generator': speaker})
+    bot.run_pipelined(max_turns=2)
+
+    assert [text for text, _ in db.logged] == ["show help", "what's my balance"]
+    assert len(speaker.spoken) == 2 and all(done for _, done in speaker.spoken)
+    stats = bot.pipeline.stats()
+    assert stats['respond']['processed'] == 2
+    assert stats['bookkeeping']['processed'] == 2
+
+
+def test_barge_in_cancels_the_reply_being_spoken(monkeypatch):
+    monkeypatch.setattr(main, 'BARGE_IN_ENABLED', True)
+    speaker = FakeSpeaker(seconds=2.0)
+    recorder = FakeRecorder(["show help", "what's my balance"],
+                            before_next=lambda: speaker.speaking.wait(2))
+    bot = VoiceBot(components={'db': FakeDB(), 'recorder': recorder,
+                               'transcriber': FakeTranscriber(), 'tts_generator': speaker})
+    started = time.monotonic()
+    bot.run_pipelined(max_turns=2)
+
+    # First reply was cut off by the caller; the second one wasn't
+    assert speaker.spoken[0] == (bot.show_help(""), False)
+    assert speaker.spoken[1][1] is True
+    assert time.monotonic() - started < 3.5
+
+
+class FakeIntents:
+    def classify_intent(self, text):
+        return {'intent': 'unknown', 'confidence': 0.5}
+
+
+def _streaming_bot(server, db, speaker, utterances):
+    from src.response_gen.response_generator import ResponseGenerator
+    bot = VoiceBot(components={'db': db, 'recorder': FakeRecorder(utterances), 'transcriber': FakeTranscriber(),
+                              'tts_generator': speaker, 'intent_classifier': FakeIntents(),
+                              'response_generator': ResponseGenerator(client=server.client())})
+    bot.warm_up(background=False, components=['response_generator'])
+    return bot
+
+
+def test_streamed_reply_is_spoken_before_it_finishes(monkeypatch):
+    from src.utils.fake_llm_server import FakeLLMServer
+    monkeypatch.setattr(main, 'LLM_STREAMING', True)
+    reply = "First sentence here. Second one follows. And a third to finish."
+    db, speaker = FakeDB(), FakeSpeaker()
+    with FakeLLMServer(reply, first_token_s=0.05, token_s=0.05) as server:
+        bot = _streaming_bot(server, db, speaker, ["tell me a joke"])
+        started = time.perf_counter()
+        assert bot.process_user_input() == reply
+        total = time.perf_counter() - started
+
+    assert [text for text, _ in speaker.spoken] == ["First sentence here.", "Second one follows.",
+                                                   "And a third to finish."]
+    assert bot.last_turn_metrics['time_to_first_audio_s'] < total / 2
+    assert db.logged == [("tell me a joke", reply)]
+    assert bot.conversation_history[-1] == {"role": "assistant", "content": reply}
+
+
+def test_pipelined_streamed_reply_is_logged_in_full(monkeypatch):
+    from src.utils.fake_llm_server import FakeLLMServer
+    monkeypatch.setattr(main, 'LLM_STREAMING', True)
+    reply = "Happy to help. What else can I do?"
+    db, speaker = FakeDB(), FakeSpeaker()
+    with FakeLLMServer(reply, token_s=0.01) as server:
+        bot = _streaming_bot(server, db, speaker, ["tell me a joke"])
+        bot.run_pipelined(max_turns=1)
+
+    assert [text for text, _ in speaker.spoken] == ["Happy to help.", "What else can I do?"]
+    assert db.logged == [("tell me a joke", reply)]
+    assert 'time_to_first_audio_s' in bot.last_turn_metrics
+
+
+def test_pipelined_streamed_replies_keep_history_in_order(monkeypatch):
+    from src.utils.fake_llm_server import FakeLLMServer
+    monkeypatch.setattr(main, 'LLM_STREAMING', True)
+    db, speaker = FakeDB(), FakeSpeaker()
+    with FakeLLMServer(lambda messages: f"Reply to {messages[-1]['content']}.", token_s=0.02) as server:
+        bot = _streaming_bot(server, db, speaker, ["first question", "second question"])
+        bot.run_pipelined(max_turns=2)
+        second_prompt = [m["content"] for m in server.requests[1]["messages"][1:]]
+
+    assert second_prompt == ["first question", "Reply to first question.", "second question"]
+    assert [m["role"] for m in bot.conversation_history] == ["user", "assistant", "user", "assistant"]
+
+
+def test_barge_in_stops_the_stream_and_keeps_only_what_was_heard(monkeypatch):
+    from src.utils.fake_llm_server import FakeLLMServer
+    monkeypatch.setattr(main, 'LLM_STREAMING', True)
+    monkeypatch.setattr(main, 'BARGE_IN_ENABLED', True)
+    reply = "One is here. Two is here. Three is here. Four is here. Five is here. Six is here."
+    db, speaker = FakeDB(), FakeSpeaker(sentence_seconds=0.05)
+
+    def barge_in_after_first_sentence():
+        while not speaker.spoken:
+            time.sleep(0.005)
+
+    with FakeLLMServer(reply, token_s=0.03) as server:
+        bot = _streaming_bot(server, db, speaker, ["tell me a story", "stop"])
+        bot.recorder.before_next = barge_in_after_first_sentence
+        bot.run_pipelined(max_turns=2)
+
+    heard = db.logged[0][1]
+    assert heard and heard != reply and reply.startswith(heard)
+    assert bot.conversation_history[1] == {"role": "assistant", "content": heard}
+    assert bot.conversation_history[2] == {"role": "user", "content": "stop"}
+    assert db.logged[1] == ("stop", reply)
+
+
+def test_barge_in_is_off_by_default():
+    speaker = FakeSpeaker(seconds=0.3)
+    recorder = FakeRecorder(["show help", "what's my balance"], before_next=lambda: speaker.speaking.wait(2))
+    bot = VoiceBot(components={'db': FakeDB(), 'recorder': recorder,
+                               'transcriber': FakeTranscriber(), 'tts_generator': speaker})
+    bot.run_pipelined(max_turns=2)
+    assert [done for _, done in speaker.spoken] == [True, True]
+
+
+def test_pipelined_turn_is_logged_for_the_user_it_was_answered_for():
+    db = FakeDB()
+    bot = VoiceBot(components={'db': db, 'tts_generator': FakeSpeaker()})
+    bot.user_id = 1
+    turn = bot._respond_stage({'id': 1, 'text': "show help"})
+    bot.user_id = 2     # A later "this is ..." turn switched user before bookkeeping ran
+    bot._bookkeeping_stage(turn)
+    assert db.user_ids == [1]